@@ -0,0 +1,166 @@
+"""
+===============================================================================
+ Description: Benchmark of Incremental Repair (LPAStar.update) against Full
+                Replanning (AStar_Flat from scratch) on a changing Map.
+===============================================================================
+ Usage:
+-------------------------------------------------------------------------------
+    python benchmark_replan.py ost000a.map [--queries 20] [--rounds 10]
+        [--changes 8] [--radius 3] [--octile] [--seed 1]
+        [--report report_replan.json]
+===============================================================================
+ Notes:
+-------------------------------------------------------------------------------
+    1. Every Query (Start and Goal drawn from one Component) is planned
+        once, then every Round blocks a Batch of Cells around a random Cell
+        of the current Path (a Door closing) and frees them in the next
+        Round, so the Map returns to its original State.
+    2. Full Replanning pays for the Grid's Tables too (Neighbors and
+        Components are cached by the Grid's Digest, which every Edit
+        changes). Their Time is reported apart (time_tables).
+    3. Both Paths are checked to have the same Cost.
+===============================================================================
+"""
+import argparse
+import json
+import random
+import time
+
+from c_astar_flat import AStar_Flat
+from c_components import Components
+from c_lpastar import LPAStar
+from c_neighbors import Neighbors
+import c_components
+import u_grid_fast
+import u_movingai
+
+
+TOLERANCE = 1e-9
+
+
+def get_changes(grid, path, changes, radius, rand):
+    """
+    ===========================================================================
+     Description: Return passable Cells around a random inner Cell of the
+                    Path (never Start or Goal).
+    ===========================================================================
+     Return: list of int (Cells' Idds).
+    ===========================================================================
+    """
+    if len(path) < 3:
+        return list()
+    rows, cols = grid.shape
+    row, col = divmod(rand.choice(path[1:-1]), cols)
+    cells = [r * cols + c
+             for r in range(max(row - radius, 0), min(row + radius + 1, rows))
+             for c in range(max(col - radius, 0), min(col + radius + 1, cols))
+             if grid[r][c] >= 0]
+    cells = [idd for idd in cells if idd not in (path[0], path[-1])]
+    return rand.sample(cells, min(changes, len(cells)))
+
+
+def run_round(grid, lpastar, octile):
+    """
+    ===========================================================================
+     Description: Replan from scratch on the edited Grid.
+    ===========================================================================
+     Return: tuple (list of int (Path), float (Tables' Time), float (Search
+                    Time)).
+    ===========================================================================
+    """
+    t_start = time.perf_counter()
+    neighbors = Neighbors(grid, octile)
+    components = Components(grid)
+    t_tables = time.perf_counter() - t_start
+    t_start = time.perf_counter()
+    path = AStar_Flat(grid, lpastar.start, lpastar.goal, neighbors=neighbors,
+                      octile=octile, components=components).get_path()
+    return path, t_tables, time.perf_counter() - t_start
+
+
+def run(path_map, queries=20, rounds=10, changes=8, radius=3, octile=False,
+        seed=1, verbose=True):
+    """
+    ===========================================================================
+     Description: Run the Benchmark.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to .map File).
+        2. queries : int (Number of (Start, Goal) Queries).
+        3. rounds : int (Edits per Query).
+        4. changes : int (Cells per Edit).
+        5. radius : int (Edit's Window around the Path's Cell).
+        6. octile : bool (8-Connected Moves, 4-Connected otherwise).
+        7. seed : int (Random Seed).
+        8. verbose : bool (Print the Progress).
+    ===========================================================================
+     Return: dict (Report).
+    ===========================================================================
+    """
+    grid = u_movingai.load_grid(path_map, '.')
+    components = c_components.get_components(grid, path_map)
+    rand = random.Random(seed)
+    record = {'queries': 0, 'rounds': 0, 'optimal': 0, 'time_init': 0.0,
+              'time_repair': 0.0, 'time_tables': 0.0, 'time_replan': 0.0,
+              'expanded_init': 0, 'expanded_repair': 0}
+    for query in range(queries):
+        start, goal = components.sample(2, rand)
+        t_start = time.perf_counter()
+        lpastar = LPAStar(grid, start, goal, octile=octile)
+        record['time_init'] += time.perf_counter() - t_start
+        record['expanded_init'] += lpastar.expanded
+        record['queries'] += 1
+        path = lpastar.get_path()
+        blocked = list()
+        for i in range(rounds):
+            if blocked:
+                cells, value = blocked, 0
+                blocked = list()
+            else:
+                cells = blocked = get_changes(grid, path, changes, radius,
+                                              rand)
+                value = -1
+            for idd in cells:
+                grid.flat[idd] = value
+            t_start = time.perf_counter()
+            path = lpastar.update(cells)
+            record['time_repair'] += time.perf_counter() - t_start
+            record['expanded_repair'] += lpastar.expanded
+            path_true, t_tables, t_replan = run_round(grid, lpastar, octile)
+            record['time_tables'] += t_tables
+            record['time_replan'] += t_replan
+            record['rounds'] += 1
+            cost = u_grid_fast.get_path_cost(grid, path, octile)
+            cost_true = u_grid_fast.get_path_cost(grid, path_true, octile)
+            if bool(path) == bool(path_true) and \
+               (not path or abs(cost - cost_true) < TOLERANCE):
+                record['optimal'] += 1
+        for idd in blocked:
+            grid.flat[idd] = 0
+        if verbose:
+            print('query {0}, repair {1:.3f}s, replan {2:.3f}s (+{3:.3f}s '
+                  'tables)'.format(query, record['time_repair'],
+                                   record['time_replan'],
+                                   record['time_tables']))
+    return {'map': path_map, 'octile': octile, 'changes': changes,
+            'radius': radius, 'seed': seed, 'record': record}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark incremental '
+                                     'repair against full replanning.')
+    parser.add_argument('map', help='path to the .map file')
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--changes', type=int, default=8)
+    parser.add_argument('--radius', type=int, default=3)
+    parser.add_argument('--octile', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--report', default='report_replan.json',
+                        help='path to the JSON report')
+    args = parser.parse_args()
+    report = run(args.map, args.queries, args.rounds, args.changes,
+                 args.radius, args.octile, args.seed)
+    with open(args.report, 'w') as file:
+        json.dump(report, file, indent=1, sort_keys=True)
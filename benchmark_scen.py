@@ -0,0 +1,213 @@
+"""
+===============================================================================
+ Description: Benchmark of the Engines on MovingAI Scenarios (.scen).
+===============================================================================
+ Usage:
+-------------------------------------------------------------------------------
+    python benchmark_scen.py ost000a.map [--scen ost000a.map.scen]
+        [--engines AStar AStar_H AStar_Bi KAStar KAStar_H] [--buckets 10]
+        [--strategy auto] [--report report.json]
+===============================================================================
+ Notes:
+-------------------------------------------------------------------------------
+    1. Single-Goal Engines (AStar, AStar_H, AStar_Bi) run every Scenario.
+        Multi-Goal Engines (KAStar, KAStar_H) run every Scenario's Start
+        toward all the Goals of its Bucket.
+    2. Optimality is checked on the Scenario's own Goal against its
+        Optimal Length (octile Costs, as in the .scen Files). With
+        4-Connected Moves the Optimal Cost comes from a reference
+        AStar_Flat Search instead.
+    3. KAStar runs with the given Strategy ('auto', the default, chooses
+        per Query between KA* and the Uniform-Cost Sweep), the Bucket's
+        Record counts the chosen ones (strategies). Both are optimal, but
+        may return different Paths among the equal-cost ones.
+    4. The Report is JSON with sorted Keys (one Record per Engine and
+        Bucket), so two Versions can be diffed.
+===============================================================================
+"""
+import argparse
+import json
+import time
+
+from c_astar import AStar
+from c_astar_h import AStar_H
+from c_astar_bi import AStar_Bi
+from c_astar_flat import AStar_Flat
+from c_kastar import KAStar
+from c_kastar import STRATEGIES
+from c_kastar_h import KAStar_H
+from c_stats import Stats
+import u_grid_fast
+import u_movingai
+import u_scen
+
+
+ENGINES = ['AStar', 'AStar_H', 'AStar_Bi', 'KAStar', 'KAStar_H']
+TOLERANCE = 1e-4
+
+
+def get_reference(grid, scenario):
+    """
+    ===========================================================================
+     Description: Return the Scenario with its 4-Connected Optimal Cost
+                    (the .scen File holds the Octile one).
+    ===========================================================================
+     Return: Scenario (optimal is Infinity on No-Solution).
+    ===========================================================================
+    """
+    path = AStar_Flat(grid, scenario.start, scenario.goal).get_path()
+    return scenario._replace(optimal=u_grid_fast.get_path_cost(grid, path))
+
+
+def run_query(name, grid, scenario, goals, octile, strategy='auto'):
+    """
+    ===========================================================================
+     Description: Run the Engine on the Scenario.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. name : str (Engine's Name).
+        2. grid : Grid.
+        3. scenario : Scenario.
+        4. goals : list of int (Bucket's Goals, for Multi-Goal Engines).
+        5. octile : bool (8-Connected Moves with Octile Heuristic).
+        6. strategy : str (KAStar's Strategy).
+    ===========================================================================
+     Return: dict (Query's Record).
+    ===========================================================================
+    """
+    start, goal = scenario.start, scenario.goal
+    stats = Stats()
+    t_start = time.perf_counter()
+    if name == 'AStar':
+        engine = AStar(grid, start, goal, octile=octile, stats=stats)
+        path = engine.get_path()
+    elif name == 'AStar_H':
+        engine = AStar_H(grid, start, goal, octile=octile, stats=stats)
+        path = engine.get_path()
+    elif name == 'AStar_Bi':
+        engine = AStar_Bi(grid, start, goal, octile=octile, stats=stats)
+        path = engine.get_path()
+    elif name == 'KAStar':
+        engine = KAStar(grid, start, goals, octile=octile, stats=stats,
+                        strategy=strategy)
+        engine.run()
+        path = engine.get_path(goal)
+    elif name == 'KAStar_H':
+        engine = KAStar_H(grid, start, goals, octile=octile, stats=stats)
+        engine.run()
+        path = engine.paths.get(goal, list())
+    else:
+        raise ValueError('unknown engine {0}'.format(name))
+    t_query = time.perf_counter() - t_start
+
+    cost = u_grid_fast.get_path_cost(grid, path, octile)
+    return {'time': t_query,
+            'expanded': stats.expanded,
+            'generated': stats.generated,
+            'reopened': stats.reopened,
+            'counter_h': stats.counter_h,
+            'peak_opened': stats.peak_opened,
+            'strategies': stats.strategies,
+            'solved': bool(path),
+            'error': abs(cost - scenario.optimal) if path else None}
+
+
+def run_bucket(name, grid, scenarios, octile, strategy='auto'):
+    """
+    ===========================================================================
+     Description: Run the Engine on the Bucket's Scenarios.
+    ===========================================================================
+     Return: dict (Bucket's Record, Sums of the Queries' Records).
+    ===========================================================================
+    """
+    goals = list(dict.fromkeys(scenario.goal for scenario in scenarios))
+    record = {'queries': 0, 'solved': 0, 'optimal': 0, 'max_error': 0.0,
+              'time': 0.0, 'expanded': 0, 'generated': 0, 'reopened': 0,
+              'counter_h': 0, 'peak_opened': 0, 'strategies': dict()}
+    for scenario in scenarios:
+        goals_query = [goal for goal in goals if goal != scenario.start]
+        query = run_query(name, grid, scenario, goals_query, octile,
+                          strategy)
+        record['queries'] += 1
+        for key in ['time', 'expanded', 'generated', 'reopened',
+                    'counter_h']:
+            record[key] += query[key]
+        record['peak_opened'] = max(record['peak_opened'],
+                                    query['peak_opened'])
+        for name_used, count in query['strategies'].items():
+            record['strategies'][name_used] = \
+                record['strategies'].get(name_used, 0) + count
+        if query['solved']:
+            record['solved'] += 1
+            record['max_error'] = max(record['max_error'], query['error'])
+            if query['error'] <= TOLERANCE:
+                record['optimal'] += 1
+    return record
+
+
+def run(path_map, path_scen=None, engines=ENGINES, buckets=None,
+        octile=None, strategy='auto', verbose=True):
+    """
+    ===========================================================================
+     Description: Run the Engines on the Buckets of the Map's Scenarios.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to .map File).
+        2. path_scen : str (Path to .scen File, <map>.scen on None).
+        3. engines : list of str (Engines' Names).
+        4. buckets : int (Number of first Buckets to run, All on None).
+        5. octile : bool (8-Connected Moves, from the Map's Type on None).
+        6. strategy : str (KAStar's Strategy, see c_kastar.STRATEGIES).
+        7. verbose : bool (Print the Progress).
+    ===========================================================================
+     Return: dict (Report).
+    ===========================================================================
+    """
+    if path_scen is None:
+        path_scen = u_scen.get_path_scen(path_map)
+    if octile is None:
+        octile = u_movingai.read_header(path_map)['type'] == 'octile'
+    grid = u_movingai.load_grid(path_map, passable='.GS')
+    scenarios = u_scen.get_buckets(u_scen.read_scen(path_scen))
+    if buckets is not None:
+        scenarios = dict(list(scenarios.items())[:buckets])
+    if not octile:
+        scenarios = {bucket: [get_reference(grid, scenario)
+                              for scenario in bucket_scenarios]
+                     for bucket, bucket_scenarios in scenarios.items()}
+
+    report = {'map': path_map, 'scen': path_scen, 'octile': octile,
+              'strategy': strategy, 'engines': dict()}
+    for name in engines:
+        records = dict()
+        for bucket, bucket_scenarios in scenarios.items():
+            records[str(bucket)] = run_bucket(name, grid, bucket_scenarios,
+                                              octile, strategy)
+            if verbose:
+                print('{0}, bucket {1}, {2:.3f}s'.format(
+                            name, bucket, records[str(bucket)]['time']))
+        report['engines'][name] = records
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the Engines '
+                                     'on MovingAI Scenarios.')
+    parser.add_argument('map', help='path to the .map file')
+    parser.add_argument('--scen', help='path to the .scen file '
+                        '(default: <map>.scen)')
+    parser.add_argument('--engines', nargs='+', default=ENGINES,
+                        choices=ENGINES)
+    parser.add_argument('--buckets', type=int,
+                        help='run only the first N buckets')
+    parser.add_argument('--strategy', default='auto', choices=STRATEGIES,
+                        help='KAStar strategy (default: auto)')
+    parser.add_argument('--report', default='report.json',
+                        help='path to the JSON report')
+    args = parser.parse_args()
+    report = run(args.map, args.scen, args.engines, args.buckets,
+                 strategy=args.strategy)
+    with open(args.report, 'w') as file:
+        json.dump(report, file, indent=1, sort_keys=True)
@@ -1,9 +1,13 @@
 from c_node import Node
 from c_opened import Opened
+from c_closed import Closed
+import c_neighbors
+import c_components
 
 import sys
 sys.path.append('D:\\MyPy\\f_grid\\')
 import u_grid
+import u_grid_fast
 
 
 class AStar:
@@ -14,11 +18,37 @@ class AStar:
      Methods:
     ---------------------------------------------------------------------------
         1. get_path() -> list of int (List of Node'd Id, Optimal Path to Goal).
+
+        2. improve(epsilon) -> float [Search again with a lower epsilon
+                                        (reusing the State), Return bound].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. epsilon : float (Weight of h, f = g + epsilon * h).
+        2. bound : float (Path's Cost <= bound * Optimal Cost, Infinity on
+                            No-Solution).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. epsilon > 1 is Weighted A*: the Path is found with fewer
+            Expansions and costs at most epsilon times the Optimal one.
+            Closed Nodes are not re-opened, a cheaper g found for one is
+            kept aside (INCONS).
+        2. improve() is the ARA* Step: Opened and INCONS are re-keyed with
+            the lower epsilon and the Search resumes, the Nodes' g of the
+            previous Steps are kept. Calling it with decreasing epsilons
+            (e.g. 3, 2, 1.5, 1) gives a first Path quickly and better ones
+            until the Optimal one (epsilon = 1).
+        3. bound = min(epsilon, g(Goal) / min(g + h over Opened and
+            INCONS)), the min is a Lower Bound of the Optimal Cost, so
+            bound is often tighter than epsilon.
     ===========================================================================
     """
     
     
-    def __init__(self, grid, start, goal):
+    def __init__(self, grid, start, goal, neighbors=None, type_opened=Opened,
+                 octile=False, stats=None, landmarks=None, components=None,
+                 epsilon=1):
         """
         ===================================================================
          Description: A* Algorithm.
@@ -28,20 +58,61 @@ class AStar:
             1. grid : Grid.
             2. start : int (Start's Id).
             3. goal : int (Goal's Id).
+            4. neighbors : Neighbors (Grid's Table, cached one on None).
+            5. type_opened : class (Opened or Opened_Buckets).
+            6. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            7. stats : Stats (Search Statistics to populate, None to skip).
+            8. landmarks : Landmarks (ALT Heuristic, max(Manhattan / Octile,
+                            Landmark Bound), None to skip).
+            9. components : Components (Grid's Index, cached one on None).
+            10. epsilon : float (Weight of h >= 1, 1 for Optimal A*).
         ===================================================================
         """  
+        if epsilon < 1:
+            raise ValueError('epsilon must be >= 1 (got {0})'.format(epsilon))
         self.start = start
         self.goal = goal
         self.grid = grid
+        self.octile = octile
+        self.stats = stats
+        if landmarks is not None and landmarks.octile != octile:
+            raise ValueError('landmarks were built with octile={0}'.format(
+                                                        landmarks.octile))
+        self.landmarks = landmarks
+        if neighbors is None:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+        self.neighbors = neighbors
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
+        self.epsilon = epsilon
+        self.bound = float('Infinity')
+        # Closed Nodes whose g was improved (Weighted A* does not re-open)
+        self.incons = dict()
+        # Nodes closed in the previous improve() Steps, by Idd
+        self._visited = dict()
         
         self.best = Node(start)
         self.best.g = 0
         
-        self.closed = set()                     
-        self.opened = Opened()
+        if stats:
+            t = stats.clock()
+            type_opened = stats.get_type_opened(type_opened)
+        self._type_opened = type_opened
+        self.closed = Closed()                     
+        self.opened = type_opened()
         self.opened.push(self.best)   
         
-        self._run()
+        # No Path between different Components (O(1) Rejection)
+        self._is_connected = components.is_connected(start, goal)
+        if self._is_connected:
+            self._run()
+        else:
+            self.best = None
+        self.bound = self._get_bound()
+        if stats:
+            stats.time_run += stats.clock() - t
     
     
     def get_path(self):
@@ -62,19 +133,85 @@ class AStar:
         return path            
         
     
+    def improve(self, epsilon):
+        """
+        =======================================================================
+         Description: Search again with a lower epsilon, reusing the g of
+                        the previous Steps (ARA*).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. epsilon : float (New Weight of h, 1 <= epsilon <= current).
+        =======================================================================
+         Return: float (New bound of the Path, see get_path()).
+        =======================================================================
+        """
+        if not 1 <= epsilon <= self.epsilon:
+            raise ValueError('epsilon must be in [1, {0}] (got {1})'.format(
+                                                        self.epsilon, epsilon))
+        self.epsilon = epsilon
+        if not self._is_connected:
+            return self.bound
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        for node in self.closed.get_nodes():
+            self._visited[node.idd] = node
+        nodes = self.opened.get_nodes().union(self.incons.values())
+        # The Goal is re-found once no Key is below its g
+        if self.best is not None:
+            nodes.add(self.best)
+        for node in nodes:
+            node.f = node.g + epsilon * node.h
+        self.incons = dict()
+        self.closed = Closed()
+        self.opened = self._type_opened()
+        for node in nodes:
+            self.opened.push(node)
+        self._run()
+        self.bound = self._get_bound()
+        if stats:
+            stats.time_run += stats.clock() - t
+        return self.bound
+    
+    
+    def _get_bound(self):
+        """
+        =======================================================================
+         Description: Return the Suboptimality Bound of the current Path.
+        =======================================================================
+        """
+        if self.best is None:
+            return float('Infinity')
+        if self.epsilon == 1:
+            return 1.0
+        lower = min((node.g + node.h for node in
+                     self.opened.get_nodes().union(self.incons.values())),
+                    default=self.best.g)
+        if lower <= 0:
+            return 1.0
+        return max(1.0, min(self.epsilon, self.best.g / lower))
+    
+    
     def _run(self):
         """
         =======================================================================
          Description: Run A* Algorithm.
         =======================================================================
         """
+        stats = self.stats
         while not (self.opened.is_empty()):
             self.best = self.opened.pop()
             self.closed.add(self.best)
             if (self.best.idd == self.goal):
+                if stats:
+                    stats.goal_found(self.best.idd, self.best.g)
                 return
            
             self._expand()
+            if stats:
+                stats.expand(self.best.idd, self.best.g, len(self.opened),
+                             len(self.closed))
         self.best = None
             
             
@@ -84,18 +221,60 @@ class AStar:
          Description: Expand the Best Node's Children.
         =======================================================================
         """     
-        row, col = u_grid.to_row_col(self.grid, self.best.idd)
-        idds = u_grid.get_neighbors(self.grid, row, col)
-        children = {Node(x) for x in idds} - self.closed      
-        for child in sorted(children):
-            if self.opened.contains(child):
-                child = self.opened.get(child)
-            g_new = self.best.g + child.w
+        best = self.best
+        closed, opened = self.closed, self.opened
+        neighbors = self.neighbors
+        idds, costs = neighbors.idds, neighbors.costs
+        stats = self.stats
+        w = 1
+        # Table's Order (Keys are unique, so the Push Order does not matter)
+        for i in range(neighbors.offsets[best.idd],
+                       neighbors.offsets[best.idd+1]):
+            x = idds[i]
+            if costs is not None:
+                w = costs[i]
+            if closed.contains_idd(x):
+                if self.epsilon > 1:
+                    self._update_incons(x, w)
+                continue
+            g_new = best.g + w
+            child = opened.get_idd(x)
+            if child is not None:
+                if child.g <= g_new:
+                    continue
+                self._update_node(child,best,g_new)
+                if stats:
+                    stats.reopened += 1
+                continue
+            child = self._visited.get(x) or Node(x)
             if child.g <= g_new:
                 continue
-            self._update_node(child,self.best,g_new)
-            if not self.opened.contains(child):
-                self.opened.push(child)
+            self._update_node(child,best,g_new)
+            opened.push(child)
+            if stats:
+                stats.generated += 1
+            
+            
+    def _update_incons(self, idd, w):
+        """
+        =======================================================================
+         Description: Keep a cheaper g of a Closed Node (to re-open it on
+                        the next improve()).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Closed Node's Id).
+            2. w : float (Cost of the Move from the Best Node).
+        =======================================================================
+        """
+        node = self.closed.get(Node(idd))
+        g_new = self.best.g + w
+        if node.g <= g_new:
+            return
+        node.father = self.best
+        node.g = g_new
+        node.f = g_new + self.epsilon * node.h
+        self.incons[idd] = node
             
             
     def _update_node(self, node, father, g):
@@ -112,8 +291,19 @@ class AStar:
         """
         node.father = father
         node.g = g
-        node.h = u_grid.manhattan_distance(self.grid,node.idd,self.goal)
-        node.f = node.g + node.h        
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        if self.octile:
+            node.h = u_grid_fast.octile_distance(self.grid,node.idd,self.goal)
+        else:
+            node.h = u_grid.manhattan_distance(self.grid,node.idd,self.goal)
+        if self.landmarks is not None:
+            node.h = max(node.h, self.landmarks.get_bound(node.idd,self.goal))
+        if stats:
+            stats.time_h += stats.clock() - t
+            stats.counter_h += 1
+        node.f = node.g + self.epsilon * node.h        
 
     
 """
@@ -178,9 +368,211 @@ def tester():
         
         u_tester.run([p0])
         
+    def tester_type_opened():
+        
+        from c_opened_buckets import Opened_Buckets
+        
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            path_true = AStar(grid,start,goal).get_path()
+            path_test = AStar(grid,start,goal,
+                              type_opened=Opened_Buckets).get_path()
+            p0 = path_test == path_true
+            if not p0:
+                break
+            
+        u_tester.run([p0])
+        
+    def tester_octile():
+        
+        import heapq
+        
+        def dijkstra(neighbors, start):
+            dist = {start: 0}
+            heap = [(0, start)]
+            while heap:
+                d, idd = heapq.heappop(heap)
+                if d > dist[idd]: continue
+                for child, w in neighbors.get_items(idd):
+                    if d + w < dist.get(child, float('Infinity')):
+                        dist[child] = d + w
+                        heapq.heappush(heap, (d + w, child))
+            return dist
+        
+        p0 = True
+        p1 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            neighbors = c_neighbors.get_neighbors(grid, octile=True)
+            path = AStar(grid,start,goal,octile=True).get_path()
+            cost_true = dijkstra(neighbors, start).get(goal)
+            if cost_true is None:
+                p0 = path == list()
+            else:
+                cost_test = u_grid_fast.get_path_cost(grid, path, True)
+                p0 = abs(cost_test - cost_true) < 1e-9
+            for idd_1, idd_2 in zip(path, path[1:]):
+                p1 = p1 and idd_2 in neighbors.get(idd_1)
+            if not (p0 and p1):
+                break
+            
+        u_tester.run([p0,p1])
+        
+    def tester_stats():
+        
+        from c_stats import Stats
+        
+        p0 = True
+        p1 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            expanded = list()
+            goals = list()
+            stats = Stats(timing=True,
+                          on_expand=lambda idd, g: expanded.append(idd),
+                          on_goal_found=lambda idd, g: goals.append((idd,g)))
+            astar = AStar(grid,start,goal,stats=stats)
+            p0 = astar.get_path() == AStar(grid,start,goal).get_path()
+            if astar.best:
+                p1 = goals == [(goal, astar.best.g)]
+                p1 = p1 and stats.expanded == len(astar.closed) - 1
+            else:
+                p1 = not goals and stats.expanded == len(astar.closed)
+            p1 = p1 and expanded == [x.idd for x in astar.closed if x.idd != goal]
+            p1 = p1 and stats.generated + 1 == (len(astar.closed)
+                                                 + len(astar.opened))
+            p1 = p1 and stats.counter_h == stats.generated + stats.reopened
+            p1 = p1 and 0 <= stats.time_h + stats.time_queue <= stats.time_run
+            if not (p0 and p1):
+                break
+            
+        u_tester.run([p0,p1])
+        
+    def tester_landmarks():
+        
+        from c_landmarks import Landmarks
+        
+        p0 = True
+        for i in range(300):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            for octile in (False, True):
+                landmarks = Landmarks(grid, 4, octile)
+                path_test = AStar(grid,start,goal,octile=octile,
+                                  landmarks=landmarks).get_path()
+                path_true = AStar(grid,start,goal,octile=octile).get_path()
+                cost_test = u_grid_fast.get_path_cost(grid,path_test,octile)
+                cost_true = u_grid_fast.get_path_cost(grid,path_true,octile)
+                p0 = cost_test == cost_true or \
+                     abs(cost_test - cost_true) < 1e-9
+                if not p0: break
+            if not p0: break
+            
+        u_tester.run([p0])
+        
+        
+    def tester_components():
+        
+        from c_stats import Stats
+        
+        # Wall between Left and Right Halves
+        grid = u_grid.gen_symmetric_grid(6)
+        grid[:, 3] = -1
+        stats = Stats()
+        astar = AStar(grid, 0, 5, stats=stats)
+        p0 = astar.get_path() == list() and stats.expanded == 0
+        p1 = AStar(grid, 0, 2).get_path() == [0, 1, 2]
+        
+        u_tester.run([p0,p1])
+        
+        
+    def tester_epsilon():
+        
+        p0 = True
+        for i in range(300):
+            n = u_random.get_random_int(5,20)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            octile = random.random() < 0.5
+            path_true = AStar(grid,start,goal,octile=octile).get_path()
+            cost_true = u_grid_fast.get_path_cost(grid,path_true,octile)
+            astar = AStar(grid,start,goal,octile=octile,epsilon=3)
+            for epsilon in (3, 2, 1.5, 1):
+                if epsilon < 3:
+                    astar.improve(epsilon)
+                path = astar.get_path()
+                p0 = bool(path) == bool(path_true)
+                if path:
+                    cost = u_grid_fast.get_path_cost(grid,path,octile)
+                    p0 = p0 and path[0] == start and path[-1] == goal
+                    p0 = p0 and 1 <= astar.bound <= epsilon
+                    p0 = p0 and cost <= astar.bound * cost_true + 1e-9
+                    if epsilon == 1:
+                        p0 = p0 and abs(cost - cost_true) < 1e-9
+                else:
+                    p0 = p0 and astar.bound == float('Infinity')
+                if not p0: break
+            if not p0: break
+        
+        # Open Grid: Weighted A* expands fewer Nodes
+        from c_stats import Stats
+        grid = u_grid.gen_symmetric_grid(20)
+        grid[5:15, 10] = -1
+        stats_1, stats_3 = Stats(), Stats()
+        AStar(grid, 0, 399, octile=True, stats=stats_1)
+        AStar(grid, 0, 399, octile=True, stats=stats_3, epsilon=3)
+        p1 = stats_3.expanded < stats_1.expanded
+        
+        try:
+            AStar(grid, 0, 399, epsilon=0.5)
+            p2 = False
+        except ValueError:
+            p2 = True
+        try:
+            AStar(grid, 0, 399, epsilon=2).improve(3)
+            p2 = False
+        except ValueError:
+            pass
+        
+        u_tester.run([p0,p1,p2])
+        
     u_tester.print_start(__file__)
     tester_run()
     tester_get_path()
+    tester_type_opened()
+    tester_octile()
+    tester_stats()
+    tester_landmarks()
+    tester_components()
+    tester_epsilon()
     u_tester.print_finish(__file__)
 
 
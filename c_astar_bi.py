@@ -0,0 +1,408 @@
+from c_heap import Heap
+from c_heap import Heap_Buckets
+import c_neighbors
+import c_components
+import u_grid_fast
+
+from array import array
+
+import sys
+sys.path.append('D:\\MyPy\\f_grid\\')
+import u_grid
+
+
+UNSEEN = 0
+OPENED = 1
+CLOSED = 2
+
+FORWARD = 0
+BACKWARD = 1
+
+
+class AStar_Bi:
+    """
+    ===========================================================================
+     Description: Bidirectional A* (Front-to-End, over Flat Buffers).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_path() -> list of int (List of Node'd Id, Optimal Path to Goal).
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. meet : int (Id of the Node where the Searches met, None on
+                        No-Solution).
+        2. mu : float (Cost of the best Path found, Infinity on No-Solution).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. A Forward Search from Start (h toward Goal) and a Backward Search
+            from Goal (h toward Start) on the same (undirected) Neighbors
+            Table. Each one is keyed by (f, -g, idd) as in AStar.
+        2. The Side with the larger min Key is expanded next (Forward on
+            Tie): it is the one closer to the Termination (Note 3), the
+            other Side waits at its lower f. mu is updated whenever a Node
+            gets a g from both Sides.
+        3. Termination: once the min f of either Side is >= mu no cheaper
+            Path exists (the Heuristics are consistent), so the Path
+            through meet is optimal.
+        4. BS* Pruning: a Child with f >= mu is not pushed (Trimming), and
+            a Node already closed by the other Side is not expanded
+            (Nipping, its best Path is already in mu).
+        5. Tie-Breaking: each Side pops its min (f, -g, idd) as AStar
+            (deeper Nodes first, then the lower Id), the Sides alternate by
+            Note 2 and mu keeps the first Node found at its Cost (strict <).
+            So the same Query always gives the same Path, but it is stitched
+            from two Searches and may differ from AStar's among the
+            equal-cost Paths.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, start, goal, neighbors=None, heap=Heap,
+                 octile=False, stats=None, components=None):
+        """
+        ===================================================================
+         Description: Bidirectional A* Algorithm.
+        ===================================================================
+         Arguments:
+        -------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start's Id).
+            3. goal : int (Goal's Id).
+            4. neighbors : Neighbors (Grid's Table, cached one on None).
+            5. heap : class (Priority Queue of (key, idd) Items, Heap or
+                        Heap_Buckets).
+            6. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            7. stats : Stats (Search Statistics to populate, None to skip).
+            8. components : Components (Grid's Index, cached one on None).
+        ===================================================================
+        """
+        self.start = start
+        self.goal = goal
+        self.grid = grid
+        self.octile = octile
+        self.stats = stats
+        if neighbors is None:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+        self.neighbors = neighbors
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
+
+        size = grid.shape[0] * grid.shape[1]
+        self.g = [array('d', [float('Infinity')]) * size for i in range(2)]
+        self.father = [array('l', [-1]) * size for i in range(2)]
+        self.state = [array('b', [UNSEEN]) * size for i in range(2)]
+        self.meet = None
+        self.mu = float('Infinity')
+
+        if stats:
+            t = stats.clock()
+            heap = stats.get_type_opened(heap)
+        self.opened = [heap(), heap()]
+        self._tops = [None, None]
+        self._len_closed = 0
+
+        for side, idd in ((FORWARD, start), (BACKWARD, goal)):
+            self.g[side][idd] = 0
+            self.state[side][idd] = OPENED
+            h = self._get_distance(idd, goal if side == FORWARD else start)
+            self.opened[side].push((h, 0, idd), idd)
+        if start == goal:
+            self.meet = start
+            self.mu = 0
+
+        # No Path between different Components (O(1) Rejection)
+        if components.is_connected(start, goal):
+            self._run()
+        if stats:
+            if self.meet is not None:
+                stats.goal_found(goal, self.mu)
+            stats.time_run += stats.clock() - t
+
+
+    def get_path(self):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal (the two
+                        Father Chains stitched at meet).
+        =======================================================================
+         Return: list of int (List of Nodes Idds or Empty List on No-Solution).
+        =======================================================================
+        """
+        if self.meet is None: return list()
+        path = list()
+        idd = self.meet
+        while idd != -1:
+            path.append(idd)
+            idd = self.father[FORWARD][idd]
+        path.reverse()
+        idd = self.father[BACKWARD][self.meet]
+        while idd != -1:
+            path.append(idd)
+            idd = self.father[BACKWARD][idd]
+        return path
+
+
+    def _run(self):
+        """
+        =======================================================================
+         Description: Run Bidirectional A* Algorithm.
+        =======================================================================
+        """
+        opened = self.opened
+        tops = self._tops
+        stats = self.stats
+        while True:
+            top_forward = tops[FORWARD] or self._get_top(FORWARD)
+            top_backward = tops[BACKWARD] or self._get_top(BACKWARD)
+            if top_forward is None or top_backward is None:
+                return
+            if max(top_forward[0][0], top_backward[0][0]) >= self.mu:
+                return
+            side = FORWARD
+            if top_backward[0] > top_forward[0]:
+                side = BACKWARD
+            key, idd = tops[side]
+            tops[side] = None
+            self.state[side][idd] = CLOSED
+            self._len_closed += 1
+            if self.state[1 - side][idd] == CLOSED:
+                continue
+            self._expand(side, idd)
+            if stats:
+                stats.expand(idd, self.g[side][idd],
+                             len(opened[FORWARD]) + len(opened[BACKWARD]),
+                             self._len_closed)
+
+
+    def _get_top(self, side):
+        """
+        =======================================================================
+         Description: Return the Side's Item with the Min Key (popped and
+                        kept aside until it is expanded, out-of-date Items
+                        are skipped).
+        =======================================================================
+         Return: tuple (key, idd) or None on empty Opened.
+        =======================================================================
+        """
+        top = self._tops[side]
+        if top is None:
+            opened, state = self.opened[side], self.state[side]
+            while not opened.is_empty():
+                top = opened.pop()
+                if state[top[1]] != CLOSED:
+                    break
+                top = None
+            self._tops[side] = top
+        return top
+
+
+    def _get_distance(self, idd_1, idd_2):
+        """
+        =======================================================================
+         Description: Return Heuristic Distance between the Nodes (Octile
+                        or Manhattan).
+        =======================================================================
+        """
+        width = self.grid.shape[1]
+        row_1, col_1 = divmod(idd_1, width)
+        row_2, col_2 = divmod(idd_2, width)
+        d_row = abs(row_1 - row_2)
+        d_col = abs(col_1 - col_2)
+        if self.octile:
+            return max(d_row, d_col) + (u_grid_fast.SQRT_2 - 1) * min(d_row,
+                                                                      d_col)
+        return d_row + d_col
+
+
+    def _expand(self, side, idd):
+        """
+        =======================================================================
+         Description: Expand the Node's Children on the Side.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. side : int (FORWARD or BACKWARD).
+            2. idd : int (Id of the Node to expand).
+        =======================================================================
+        """
+        g, father, state = self.g[side], self.father[side], self.state[side]
+        g_other = self.g[1 - side]
+        opened = self.opened[side]
+        stats = self.stats
+        offsets, idds = self.neighbors.offsets, self.neighbors.idds
+        costs = self.neighbors.costs
+        width = self.grid.shape[1]
+        row_target, col_target = divmod(self.goal if side == FORWARD
+                                        else self.start, width)
+        octile = self.octile
+        mu = self.mu
+        g_best = g[idd]
+        g_new = g_best + 1
+        for i in range(offsets[idd], offsets[idd+1]):
+            child = idds[i]
+            if costs is not None:
+                g_new = g_best + costs[i]
+            if state[child] == CLOSED or g[child] <= g_new:
+                continue
+            if stats:
+                if state[child] == OPENED:
+                    stats.reopened += 1
+                else:
+                    stats.generated += 1
+            g[child] = g_new
+            father[child] = idd
+            state[child] = OPENED
+            if g_new + g_other[child] < mu:
+                mu = self.mu = g_new + g_other[child]
+                self.meet = child
+            if stats:
+                t = stats.clock()
+            row, col = divmod(child, width)
+            d_row = abs(row - row_target)
+            d_col = abs(col - col_target)
+            if octile:
+                h = max(d_row, d_col) + (u_grid_fast.SQRT_2 - 1) * min(d_row,
+                                                                       d_col)
+            else:
+                h = d_row + d_col
+            if stats:
+                stats.time_h += stats.clock() - t
+                stats.counter_h += 1
+            if g_new + h < mu:
+                opened.push((g_new + h, -g_new, child), child)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+    import u_random
+
+
+    def tester_run():
+
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(3,10)
+            grid = u_grid.gen_symmetric_grid(n)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            path = AStar_Bi(grid,start,goal).get_path()
+            len_optimal = u_grid.manhattan_distance(grid,start,goal)+1
+            p0 = len(path) == len_optimal and path[0] == start \
+                 and path[-1] == goal
+            if not p0:
+                break
+
+        p1 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            neighbors = c_neighbors.get_neighbors(grid)
+            for heap in (Heap, Heap_Buckets):
+                path = AStar_Bi(grid,start,goal,heap=heap).get_path()
+                dic_g = u_grid.to_dic_g(grid,start)
+                len_optimal = dic_g.get(goal)
+                if len_optimal:
+                    p1 = len_optimal+1 == len(path)
+                    p1 = p1 and all(idd_2 in neighbors.get(idd_1)
+                                    for idd_1, idd_2 in zip(path, path[1:]))
+                else:
+                    p1 = path == list()
+                if not p1:
+                    break
+            if not p1:
+                break
+
+        grid = u_grid.gen_symmetric_grid(4)
+        p2 = AStar_Bi(grid,5,5).get_path() == [5]
+        p3 = AStar_Bi(grid,5,6).get_path() == [5,6]
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    def tester_octile():
+
+        from c_astar_flat import AStar_Flat
+
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            path_test = AStar_Bi(grid,start,goal,octile=True).get_path()
+            path_true = AStar_Flat(grid,start,goal,octile=True).get_path()
+            cost_test = u_grid_fast.get_path_cost(grid, path_test, True)
+            cost_true = u_grid_fast.get_path_cost(grid, path_true, True)
+            p0 = abs(cost_test - cost_true) < 1e-9 or cost_test == cost_true
+            p0 = p0 and bool(path_test) == bool(path_true)
+            if not p0:
+                break
+
+        u_tester.run([p0])
+
+
+    def tester_stats():
+
+        from c_stats import Stats
+
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            goals = list()
+            stats = Stats(timing=True,
+                          on_goal_found=lambda idd, g: goals.append((idd,g)))
+            astar = AStar_Bi(grid,start,goal,stats=stats)
+            if astar.meet is None:
+                p0 = not goals
+            else:
+                p0 = goals == [(goal, astar.mu)]
+            p0 = p0 and stats.counter_h == stats.generated + stats.reopened
+            p0 = p0 and stats.expanded <= astar._len_closed
+            p0 = p0 and 0 <= stats.time_h + stats.time_queue <= stats.time_run
+            if not p0:
+                break
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_run()
+    tester_octile()
+    tester_stats()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,316 @@
+from c_heap import Heap
+from c_heap import Heap_Buckets
+import c_neighbors
+import c_components
+import u_grid_fast
+
+from array import array
+
+import sys
+sys.path.append('D:\\MyPy\\f_grid\\')
+import u_grid
+
+
+UNSEEN = 0
+OPENED = 1
+CLOSED = 2
+
+
+class AStar_Flat:
+    """
+    ===========================================================================
+     Description: A* over Flat Buffers (no Node Objects).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_path() -> list of int (List of Node'd Id, Optimal Path to Goal).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. g, father and state (Unseen / Opened / Closed) are kept in
+            preallocated arrays indexed by idd (idd = row * width + col),
+            so the Memory is bounded by the Grid's size.
+        2. Expansion Order and Tie-Breaking are the same as in AStar
+            (key = (f, -g, idd)), so the Paths are the same too.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, start, goal, heap=Heap, neighbors=None,
+                 octile=False, stats=None, components=None):
+        """
+        ===================================================================
+         Description: A* Algorithm.
+        ===================================================================
+         Arguments:
+        -------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start's Id).
+            3. goal : int (Goal's Id).
+            4. heap : class (Priority Queue of (key, idd) Items, Heap or
+                        Heap_Buckets).
+            5. neighbors : Neighbors (Grid's Table, cached one on None).
+            6. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            7. stats : Stats (Search Statistics to populate, None to skip).
+            8. components : Components (Grid's Index, cached one on None).
+        ===================================================================
+        """
+        self.start = start
+        self.goal = goal
+        self.grid = grid
+        self.octile = octile
+        self.stats = stats
+        if neighbors is None:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+        self.neighbors = neighbors
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
+
+        size = grid.shape[0] * grid.shape[1]
+        self.g = array('d', [float('Infinity')]) * size
+        self.father = array('l', [-1]) * size
+        self.state = array('b', [UNSEEN]) * size
+
+        if stats:
+            t = stats.clock()
+            heap = stats.get_type_opened(heap)
+        self.best = None
+        self.opened = heap()
+
+        self.g[start] = 0
+        self.state[start] = OPENED
+        self.opened.push((0, 0, start), start)
+
+        # No Path between different Components (O(1) Rejection)
+        if components.is_connected(start, goal):
+            self._run()
+        if stats:
+            stats.time_run += stats.clock() - t
+
+
+    def get_path(self):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Return: list of int (List of Nodes Idds or Empty List on No-Solution).
+        =======================================================================
+        """
+        if self.best is None: return list()
+        idd = self.best
+        path = [idd]
+        while (idd != self.start):
+            idd = self.father[idd]
+            path.append(idd)
+        path.reverse()
+        return path
+
+
+    def _run(self):
+        """
+        =======================================================================
+         Description: Run A* Algorithm.
+        =======================================================================
+        """
+        state = self.state
+        stats = self.stats
+        len_closed = 0
+        while not (self.opened.is_empty()):
+            key, idd = self.opened.pop()
+            if state[idd] == CLOSED:
+                continue
+            state[idd] = CLOSED
+            len_closed += 1
+            if (idd == self.goal):
+                self.best = idd
+                if stats:
+                    stats.goal_found(idd, self.g[idd])
+                return
+            self._expand(idd)
+            if stats:
+                stats.expand(idd, self.g[idd], len(self.opened), len_closed)
+
+
+    def _expand(self, idd):
+        """
+        =======================================================================
+         Description: Expand the Node's Children.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Id of the Node to expand).
+        =======================================================================
+        """
+        g, father, state = self.g, self.father, self.state
+        stats = self.stats
+        offsets, idds = self.neighbors.offsets, self.neighbors.idds
+        costs = self.neighbors.costs
+        width = self.grid.shape[1]
+        row_goal, col_goal = divmod(self.goal, width)
+        g_best = g[idd]
+        g_new = g_best + 1
+        for i in range(offsets[idd], offsets[idd+1]):
+            child = idds[i]
+            if costs is not None:
+                g_new = g_best + costs[i]
+            if state[child] == CLOSED or g[child] <= g_new:
+                continue
+            if stats:
+                if state[child] == OPENED:
+                    stats.reopened += 1
+                else:
+                    stats.generated += 1
+            g[child] = g_new
+            father[child] = idd
+            state[child] = OPENED
+            if stats:
+                t = stats.clock()
+            row, col = divmod(child, width)
+            d_row = abs(row - row_goal)
+            d_col = abs(col - col_goal)
+            if self.octile:
+                h = max(d_row, d_col) + (u_grid_fast.SQRT_2 - 1) * min(d_row,
+                                                                       d_col)
+            else:
+                h = d_row + d_col
+            if stats:
+                stats.time_h += stats.clock() - t
+                stats.counter_h += 1
+            self.opened.push((g_new + h, -g_new, child), child)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+    import u_random
+
+    def tester_run():
+
+        from c_astar import AStar
+
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(3,10)
+            grid = u_grid.gen_symmetric_grid(n)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            astar = AStar_Flat(grid,start,goal)
+            len_optimal = u_grid.manhattan_distance(grid,start,goal)+1
+            if len(astar.get_path()) != len_optimal:
+                p0 = False
+
+        p1 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            astar = AStar_Flat(grid,start,goal)
+            dic_g = u_grid.to_dic_g(grid,start)
+            len_optimal = dic_g.get(goal)
+            if len_optimal:
+                p1 = len_optimal+1 == len(astar.get_path())
+            else:
+                p1 = astar.get_path() == list()
+            if not p1:
+                break
+
+        # Same Tie-Breaking as AStar -> Same Paths
+        p2 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            path_test = AStar_Flat(grid,start,goal).get_path()
+            path_true = AStar(grid,start,goal).get_path()
+            p2 = path_test == path_true
+            path_test = AStar_Flat(grid,start,goal,Heap_Buckets).get_path()
+            p2 = p2 and path_test == path_true
+            if not p2:
+                break
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_octile():
+
+        from c_astar import AStar
+
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            path_test = AStar_Flat(grid,start,goal,octile=True).get_path()
+            path_true = AStar(grid,start,goal,octile=True).get_path()
+            cost_test = u_grid_fast.get_path_cost(grid, path_test, True)
+            cost_true = u_grid_fast.get_path_cost(grid, path_true, True)
+            p0 = abs(cost_test - cost_true) < 1e-9 or cost_test == cost_true
+            if not p0:
+                break
+
+        u_tester.run([p0])
+
+
+    def tester_stats():
+
+        from c_astar import AStar
+        from c_stats import Stats
+
+        keys = ['expanded', 'generated', 'reopened', 'counter_h',
+                'goals_found']
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            stats_test = Stats(timing=True)
+            stats_true = Stats()
+            AStar_Flat(grid,start,goal,stats=stats_test)
+            AStar(grid,start,goal,stats=stats_true)
+            p0 = all(getattr(stats_test, key) == getattr(stats_true, key)
+                     for key in keys)
+            if not p0:
+                break
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_run()
+    tester_octile()
+    tester_stats()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -5,10 +5,14 @@ import sys
 sys.path.append(path_parent + '\\f_utils')
 sys.path.append(path_parent + '\\f_grid')
 import u_grid
+import u_grid_fast
 
 
 from c_node import Node
 from c_opened import Opened
+from c_closed import Closed
+import c_neighbors
+import c_components
 
 class AStar_H:
     """
@@ -22,7 +26,9 @@ class AStar_H:
     """
     
     
-    def __init__(self, grid, start, goal, opened=set(), closed=set()):
+    def __init__(self, grid, start, goal, opened=None, closed=None,
+                 neighbors=None, type_opened=Opened, octile=False,
+                 stats=None, components=None):
         """
         ===================================================================
          Description: A* Algorithm.
@@ -32,23 +38,47 @@ class AStar_H:
             1. grid : Grid.
             2. start : int (Start's Id).
             3. goal : int (Goal's Id).
+            4. opened : Opened (to resume from, updated in-place).
+            5. closed : Closed (to resume from, updated in-place).
+            6. neighbors : Neighbors (Grid's Table, cached one on None).
+            7. type_opened : class (Opened or Opened_Buckets, on new Opened).
+            8. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            9. stats : Stats (Search Statistics to populate, None to skip).
+           10. components : Components (Grid's Index, cached one on None).
         ===================================================================
         """  
         self.start = start
         self.goal = goal
         self.grid = grid
+        self.octile = octile
+        self.stats = stats
+        if neighbors is None:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+        self.neighbors = neighbors
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
         
         self.best = Node(start)
         self.best.g = 0
         self.best.f = 0
             
-        self.closed = closed.copy()                     
-        self.opened = Opened()
-        self.opened.load(opened)
+        if stats:
+            t = stats.clock()
+            type_opened = stats.get_type_opened(type_opened)
+        if closed is None:
+            closed = Closed()
+        if opened is None:
+            opened = type_opened()
+        self.closed = closed
+        self.opened = opened
         if self.opened.is_empty():
             self.opened.push(self.best)   
         
         self._run()
+        if stats:
+            stats.time_run += stats.clock() - t
     
     
     def get_path(self):
@@ -76,13 +106,30 @@ class AStar_H:
          Description: Run A* Algorithm.
         =======================================================================
         """
+        # No Path between different Components (O(1) Rejection)
+        if not self.components.is_connected(self.start, self.goal):
+            self.best = None
+            return
+        # Goal was already closed by a previous (resumed) search
+        stats = self.stats
+        node = self.closed.get(Node(self.goal))
+        if node:
+            self.best = node
+            if stats:
+                stats.goal_found(node.idd, node.g)
+            return
         while not (self.opened.is_empty() or self.best.idd == self.goal):
             self.best = self.opened.pop()
             self.closed.add(self.best)
             self._expand()
+            if stats:
+                stats.expand(self.best.idd, self.best.g, len(self.opened),
+                             len(self.closed))
             
         if self.opened.is_empty() and not self.best.idd == self.goal:
             self.best = None
+        elif stats:
+            stats.goal_found(self.best.idd, self.best.g)
             
             
     def _expand(self):   
@@ -91,17 +138,22 @@ class AStar_H:
          Description: Expand the Best Node's Children.
         =======================================================================
         """     
-        idds = u_grid.get_neighbors(self.grid, idd=self.best.idd)
-        children = {Node(x) for x in idds} - self.closed      
-        for child in sorted(children):
+        items = self.neighbors.get_items(self.best.idd)
+        children = [(Node(x), w) for x, w in items
+                    if not self.closed.contains_idd(x)]
+        for child, w in sorted(children, key=lambda item: item[0].key):
             if self.opened.contains(child):
                 child = self.opened.get(child)
-            g_new = self.best.g + child.w
+            g_new = self.best.g + w
             if child.g <= g_new:
                 continue
             self._update_node(child,self.best,g_new)
             if not self.opened.contains(child):
                 self.opened.push(child)
+                if self.stats:
+                    self.stats.generated += 1
+            elif self.stats:
+                self.stats.reopened += 1
             
             
     def _update_node(self, node, father, g):
@@ -118,7 +170,16 @@ class AStar_H:
         """
         node.father = father
         node.g = g
-        node.h = u_grid.manhattan_distance(self.grid,node.idd,self.goal)
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        if self.octile:
+            node.h = u_grid_fast.octile_distance(self.grid,node.idd,self.goal)
+        else:
+            node.h = u_grid.manhattan_distance(self.grid,node.idd,self.goal)
+        if stats:
+            stats.time_h += stats.clock() - t
+            stats.counter_h += 1
         node.f = node.g + node.h        
 
     
@@ -0,0 +1,252 @@
+from c_astar_flat import AStar_Flat
+from c_dijkstra import Dijkstra
+import c_components
+
+from array import array
+from collections import Counter
+
+
+# Groups of at least this many Pairs run as one Shared-Tree Search, by
+# Connectivity (4, 8). Break-even measured on ost000a (969x487).
+MIN_GROUP = {4: 2, 8: 3}
+
+
+class Batch:
+    """
+    ===========================================================================
+     Description: Batch of many (start, goal) Queries, grouped by shared
+                    Start (or Goal) into Multi-Goal Searches.
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_path(i) -> list of int [Optimal Path of the i-th Pair, Empty
+                                        List on No-Solution].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. pairs : list of (int, int) (Queries, in the Caller's Order).
+        2. plan : list of (str, int, list of int) (Groups as (strategy,
+                    source, Pairs' Indices)). strategy is 'start' (Shared
+                    Tree from the Start), 'goal' (Shared Tree from the
+                    Goal, Paths reversed) or 'pair' (AStar_Flat per Pair).
+        3. offsets : array of int (len(pairs) + 1). The Path of the i-th
+                        Pair is idds[offsets[i]:offsets[i+1]].
+        4. idds : array of int (all the Paths, concatenated).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. Planning is greedy: the largest Group of the remaining Pairs by
+            Start or by Goal is taken while it has at least min_group
+            Pairs, the rest run one AStar_Flat each.
+        2. A Shared-Tree Search is one Multi-Goal Dijkstra (early exit
+            on the last Goal) for the whole Group, so it pays off once the
+            Goals are many. The Moves are symmetric, so a Group by Goal
+            searches from the Goal and reverses the Paths.
+        3. Pairs in different Components get an Empty Path without any
+            Search.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, pairs, octile=False, min_group=None,
+                 stats=None):
+        """
+        =======================================================================
+         Description: Plan and Run the Batch.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. pairs : iterable of (int, int) (Start and Goal Ids).
+            3. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            4. min_group : int (min Group's Size for a Shared-Tree Search,
+                            MIN_GROUP of the Connectivity on None).
+            5. stats : Stats (Search Statistics to populate, None to skip).
+        =======================================================================
+        """
+        self.grid = grid
+        self.pairs = [(int(start), int(goal)) for start, goal in pairs]
+        self.octile = octile
+        if min_group is None:
+            min_group = MIN_GROUP[8 if octile else 4]
+        self.min_group = min_group
+        self.stats = stats
+        self.components = c_components.get_components(grid)
+        self.plan = self._get_plan()
+        self._run()
+
+
+    def get_path(self, i):
+        """
+        =======================================================================
+         Description: Return Optimal Path of the i-th Pair.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. i : int (Pair's Index).
+        =======================================================================
+         Return: list of int (Empty List on No-Solution).
+        =======================================================================
+        """
+        return self.idds[self.offsets[i]:self.offsets[i+1]].tolist()
+
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+    def _get_plan(self):
+        """
+        =======================================================================
+         Description: Return the Groups of the Pairs (see plan).
+        =======================================================================
+        """
+        remaining = {i for i, (start, goal) in enumerate(self.pairs)
+                     if self.components.is_connected(start, goal)}
+        by_start = dict()
+        by_goal = dict()
+        for i in sorted(remaining):
+            start, goal = self.pairs[i]
+            by_start.setdefault(start, list()).append(i)
+            by_goal.setdefault(goal, list()).append(i)
+        count_start = Counter({start: len(group)
+                               for start, group in by_start.items()})
+        count_goal = Counter({goal: len(group)
+                              for goal, group in by_goal.items()})
+
+        plan = list()
+        while remaining:
+            start, size_start = (count_start.most_common(1) or
+                                 [(None, 0)])[0]
+            goal, size_goal = (count_goal.most_common(1) or [(None, 0)])[0]
+            if max(size_start, size_goal) < self.min_group:
+                break
+            if size_start >= size_goal:
+                strategy, source, group = 'start', start, by_start[start]
+            else:
+                strategy, source, group = 'goal', goal, by_goal[goal]
+            group = [i for i in group if i in remaining]
+            plan.append((strategy, source, group))
+            for i in group:
+                remaining.discard(i)
+                count_start[self.pairs[i][0]] -= 1
+                count_goal[self.pairs[i][1]] -= 1
+            count_start += Counter()
+            count_goal += Counter()
+        for i in sorted(remaining):
+            plan.append(('pair', self.pairs[i][0], [i]))
+        return plan
+
+
+    def _run(self):
+        """
+        =======================================================================
+         Description: Run the Plan and fill the Path Table.
+        =======================================================================
+        """
+        paths = [list() for i in range(len(self.pairs))]
+        for strategy, source, group in self.plan:
+            if strategy == 'pair':
+                i = group[0]
+                paths[i] = AStar_Flat(self.grid, source, self.pairs[i][1],
+                                      octile=self.octile, stats=self.stats,
+                                      components=self.components).get_path()
+                continue
+            side = 1 if strategy == 'start' else 0
+            targets = list(dict.fromkeys(self.pairs[i][side] for i in group))
+            dijkstra = Dijkstra(self.grid, source, targets,
+                                octile=self.octile, stats=self.stats,
+                                components=self.components)
+            dijkstra.run()
+            for i in group:
+                path = dijkstra.get_path(self.pairs[i][side])
+                paths[i] = path if side else path[::-1]
+
+        self.offsets = array('l', [0])
+        self.idds = array('l')
+        for path in paths:
+            self.idds.extend(path)
+            self.offsets.append(len(self.idds))
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+    import u_grid_fast
+
+
+    def tester_plan():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        grid[:, 2] = -1
+        pairs = [(0, 1), (0, 5), (0, 6), (0, 10),       # by Start 0
+                 (3, 24), (4, 24), (8, 24), (9, 24),    # by Goal 24
+                 (11, 15), (16, 21),                    # per Pair
+                 (0, 4)]                                # Unreachable
+        batch = Batch(grid, pairs)
+        plan = {(strategy, source): group
+                for strategy, source, group in batch.plan}
+        p0 = plan.get(('start', 0)) == [0, 1, 2, 3]
+        p1 = plan.get(('goal', 24)) == [4, 5, 6, 7]
+        p2 = sorted(source for strategy, source, group in batch.plan
+                    if strategy == 'pair') == [11, 16]
+        p3 = batch.get_path(10) == list() and len(batch.plan) == 4
+        p3 = p3 and batch.get_path(5) == [4, 9, 14, 19, 24]
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    def tester_paths():
+
+        p0 = True
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(12,30)
+            idds = u_grid.get_valid_idds(grid)
+            if len(idds) < 4: continue
+            octile = random.random() < 0.5
+            starts = random.sample(idds, 3)
+            pairs = [(random.choice(starts), random.choice(idds))
+                     for j in range(30)]
+            pairs += [(goal, start) for start, goal in pairs[:10]]
+            batch = Batch(grid, pairs, octile)
+            for j, (start, goal) in enumerate(pairs):
+                path_test = batch.get_path(j)
+                path_true = AStar_Flat(grid, start, goal,
+                                       octile=octile).get_path()
+                p0 = bool(path_test) == bool(path_true)
+                if path_test:
+                    p0 = p0 and path_test[0] == start
+                    p0 = p0 and path_test[-1] == goal
+                    cost_test = u_grid_fast.get_path_cost(grid, path_test,
+                                                          octile)
+                    cost_true = u_grid_fast.get_path_cost(grid, path_true,
+                                                          octile)
+                    p0 = p0 and abs(cost_test - cost_true) < 1e-9
+                if not p0: break
+            p0 = p0 and len(batch.offsets) == len(pairs) + 1
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_plan()
+    tester_paths()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -1,27 +1,192 @@
-import collections
-import u_grid
+import u_grid_fast
+
+import numpy as np
+
 
 class BFS:
     """
     ===========================================================================
-     Description: Breadth-First Search for Grid.
+     Description: Breadth-First Search for Grid (Single-Source Distance
+                    Field, 4-Connected Unit Costs).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_distance(idd) -> int [Distance from Start, -1 on Unreachable].
+
+        2. is_reachable(idd) -> bool [True if the Node is reachable].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. distances : np.ndarray of int32 (rows, cols). Distance of every
+                        Cell from Start, -1 on Unreachable (or not labeled
+                        yet on Early Exit).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. Frontier-at-a-time: a whole BFS Layer is expanded at once with
+            NumPy over the Passability Mask (no Python loop per Node), so
+            the Cost is O(Cells reached).
+        2. With targets, the Search stops once all the Targets are labeled
+            (their Distances are exact, farther Cells stay -1).
     ===========================================================================
     """
-    
-    def __init__(self, grid, start, goal):
-        opened = collections.deque([start])
-        closed = set()
-        while opened:
-            idd = opened.popleft()
-            for child in u_grid.get_children(grid,idd=idd) - closed:
-                closed.add(child)
-                opened.append(child)
-
-
-
-queue = collections.deque()
-queue.append(1)
-queue.append(2)
-print(queue)   
-print(queue.popleft())
-print(queue)     
\ No newline at end of file
+
+
+    def __init__(self, grid, start, targets=None):
+        """
+        =======================================================================
+         Description: BFS from Start.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start's Id).
+            3. targets : iterable of int (Early Exit once all of them are
+                            labeled, Full Field on None).
+        =======================================================================
+        """
+        self.grid = grid
+        self.start = start
+        mask = u_grid_fast.get_mask(grid)
+        rows, cols = mask.shape
+        self._passable = mask.ravel()
+        self._distances = np.full(rows * cols, -1, dtype=np.int32)
+        self.distances = self._distances.reshape(rows, cols)
+        if targets is not None:
+            targets = np.fromiter(targets, dtype=np.int64)
+        if self._passable[start]:
+            self._run(targets)
+
+
+    def get_distance(self, idd):
+        """
+        =======================================================================
+         Description: Return Distance of the Node from Start.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: int (Distance, -1 on Unreachable).
+        =======================================================================
+        """
+        return int(self._distances[idd])
+
+
+    def is_reachable(self, idd):
+        """
+        =======================================================================
+         Description: Return True if the Node is reachable from Start.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        return bool(self._distances[idd] >= 0)
+
+
+    def _run(self, targets):
+        """
+        =======================================================================
+         Description: Label the Layers until the Frontier is empty (or the
+                        Targets are labeled).
+        =======================================================================
+        """
+        distances, passable = self._distances, self._passable
+        rows, cols = self.distances.shape
+        size_last_row = (rows - 1) * cols
+        distances[self.start] = 0
+        frontier = np.array([self.start], dtype=np.int64)
+        distance = 0
+        while frontier.size:
+            if targets is not None and (distances[targets] >= 0).all():
+                return
+            distance += 1
+            cols_frontier = frontier % cols
+            children = np.concatenate((
+                            frontier[frontier >= cols] - cols,
+                            frontier[cols_frontier < cols - 1] + 1,
+                            frontier[frontier < size_last_row] + cols,
+                            frontier[cols_frontier > 0] - 1))
+            children = children[passable[children]]
+            children = np.unique(children[distances[children] < 0])
+            distances[children] = distance
+            frontier = children
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_random
+    import u_grid
+
+
+    def tester_distances():
+
+        p0 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,10)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if not idds_valid: continue
+            start = random.choice(idds_valid)
+            bfs = BFS(grid, start)
+            dic_g = u_grid.to_dic_g(grid, start)
+            dic_test = {idd: int(d) for idd, d in
+                        enumerate(bfs.distances.ravel()) if d >= 0}
+            p0 = dic_test == dic_g
+            if not p0:
+                break
+
+        u_tester.run([p0])
+
+
+    def tester_targets():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        bfs = BFS(grid, 0, targets=[6])
+        p0 = bfs.get_distance(6) == 2 and bfs.get_distance(24) == -1
+        p1 = bfs.is_reachable(6) and not bfs.is_reachable(24)
+        bfs = BFS(grid, 0, targets=[24])
+        p2 = bfs.get_distance(24) == 8
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_obstacle():
+
+        grid = u_grid.gen_symmetric_grid(3)
+        grid[0][1] = -1
+        grid[1][0] = -1
+        bfs = BFS(grid, 0)
+        p0 = bfs.get_distance(0) == 0
+        p1 = (bfs.distances.ravel()[1:] == -1).all()
+        bfs = BFS(grid, 1)
+        p2 = (bfs.distances == -1).all()
+
+        u_tester.run([p0,p1,p2])
+
+
+    u_tester.print_start(__file__)
+    tester_distances()
+    tester_targets()
+    tester_obstacle()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
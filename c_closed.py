@@ -0,0 +1,256 @@
+class Closed:
+    """
+    ===========================================================================
+     Description: Closed List for A* (Index of Nodes by Idd).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. is_empty() -> bool [Return True if the Closed is empty].
+
+        2. contains(node) -> bool [Return True if Closed contains the node].
+
+        3. contains_idd(idd) -> bool [Return True if Closed contains the idd].
+
+        4. get(node) -> Node [Return the stored Node, None otherwise].
+
+        5. get_nodes() -> set of Node (Set of Nodes in Closed).
+
+        6. add(node) -> [Add the Node into Closed].
+
+        7. update(nodes) -> [Add iterable of Nodes into Closed].
+
+        8. load(nodes) -> [Load iterable of Nodes].
+
+        9. copy() -> Closed [Return Shallow Copy of the Closed].
+    ===========================================================================
+    """
+
+
+    def __init__(self):
+        """
+        =======================================================================
+         Description: Constructor. Init the Attributes.
+        =======================================================================
+        """
+        self._closed = dict()
+
+
+    def is_empty(self):
+        """
+        =======================================================================
+         Description: Return True if the Closed is empty.
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        return len(self._closed) == 0
+
+
+    def contains(self, node):
+        """
+        =======================================================================
+         Description: Return True if Closed contains the Node.
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. node : Node.
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        return node.idd in self._closed
+
+
+    def contains_idd(self, idd):
+        """
+        =======================================================================
+         Description: Return True if Closed contains a Node with the Idd.
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        return idd in self._closed
+
+
+    def get(self, node):
+        """
+        =======================================================================
+         Description: Return the stored Node if exists (None otherwise).
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. node : Node.
+        =======================================================================
+         Return: Node if exists (None otherwise).
+        =======================================================================
+        """
+        return self._closed.get(node.idd)
+
+
+    def get_nodes(self):
+        """
+        =======================================================================
+         Description: Return Set of Nodes in Closed.
+        =======================================================================
+         Return: set of Node.
+        =======================================================================
+        """
+        return set(self._closed.values())
+
+
+    def add(self, node):
+        """
+        =======================================================================
+         Description: Add the Node into Closed.
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. node : Node.
+        =======================================================================
+        """
+        self._closed[node.idd] = node
+
+
+    def update(self, nodes):
+        """
+        =======================================================================
+         Description: Add iterable of Nodes (or other Closed) into Closed.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. nodes : iterable of Node.
+        =======================================================================
+        """
+        if isinstance(nodes, Closed):
+            self._closed.update(nodes._closed)
+            return
+        for node in nodes:
+            self._closed[node.idd] = node
+
+
+    def load(self, nodes):
+        """
+        =======================================================================
+         Description: Load Closed with iterable of Nodes (or other Closed).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. nodes : iterable of Node.
+        =======================================================================
+        """
+        self._closed = dict()
+        self.update(nodes)
+
+
+    def copy(self):
+        """
+        =======================================================================
+         Description: Return Shallow Copy of the Closed.
+        =======================================================================
+         Return: Closed.
+        =======================================================================
+        """
+        closed = Closed()
+        closed._closed = self._closed.copy()
+        return closed
+
+
+    def __contains__(self, node):
+        return self.contains(node)
+
+
+    def __iter__(self):
+        return iter(self._closed.values())
+
+
+    def __len__(self):
+        return len(self._closed)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+
+    from c_node import Node
+
+
+    def tester_contains():
+
+        closed = Closed()
+        closed.add(Node(1))
+        p0 = closed.contains(Node(1))
+        p1 = not closed.contains(Node(2))
+        p2 = Node(1) in closed
+        p3 = closed.contains_idd(1) and not closed.contains_idd(2)
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    def tester_get():
+
+        closed = Closed()
+        node = Node(1)
+        node.g = 5
+        closed.add(node)
+        p0 = closed.get(Node(1)) is node
+        p1 = closed.get(Node(2)) is None
+
+        u_tester.run([p0,p1])
+
+
+    def tester_update():
+
+        closed = Closed()
+        closed.add(Node(1))
+        other = Closed()
+        other.add(Node(2))
+        closed.update(other)
+        closed.update({Node(3)})
+        p0 = closed.get_nodes() == {Node(1),Node(2),Node(3)}
+        p1 = len(closed) == 3
+
+        u_tester.run([p0,p1])
+
+
+    def tester_copy():
+
+        closed = Closed()
+        closed.add(Node(1))
+        closed_copy = closed.copy()
+        closed_copy.add(Node(2))
+        p0 = len(closed) == 1 and len(closed_copy) == 2
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_contains()
+    tester_get()
+    tester_update()
+    tester_copy()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,359 @@
+import u_grid_fast
+
+from collections import OrderedDict
+import os
+
+import numpy as np
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+
+class Components:
+    """
+    ===========================================================================
+     Description: Connected Components of a Grid (Reachability Index).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_label(idd) -> int [Component's Label of the Node, 0 on
+                                    Obstacle].
+
+        2. is_connected(idd_1, idd_2) -> bool [True if there is a Path
+                                                between the Nodes].
+
+        3. get_idds(label) -> np.ndarray [Idds of the Component's Cells].
+
+        4. sample(k, rand) -> list of int [k distinct Idds of one Component].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. labels : np.ndarray of int32 (rows, cols). Component's Label of
+                        every Cell (1..count), 0 on Obstacle.
+        2. count : int (Number of Components).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. The Components are 4-Connected. They are the same for Octile
+            Moves, since a Diagonal Move needs both Orthogonal Cells
+            passable (no Corner-Cutting).
+        2. Labeled by scipy.ndimage when it is installed, otherwise by
+            Union-Find over the Rows' Runs of passable Cells.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid=None, labels=None):
+        """
+        =======================================================================
+         Description: Label the Components of the Grid.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. labels : np.ndarray (precomputed Labels, instead of Grid).
+        =======================================================================
+        """
+        if labels is None:
+            labels = _label(u_grid_fast.get_mask(grid))
+        self.labels = labels
+        self._labels = labels.ravel()
+        self.count = int(self._labels.max(initial=0))
+        self._order = None
+        self._offsets = None
+
+
+    def get_label(self, idd):
+        """
+        =======================================================================
+         Description: Return Component's Label of the Node.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: int (Label, 0 on Obstacle).
+        =======================================================================
+        """
+        return int(self._labels[idd])
+
+
+    def is_connected(self, idd_1, idd_2):
+        """
+        =======================================================================
+         Description: Return True if there is a Path between the Nodes.
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd_1 : int (Node's Id).
+            2. idd_2 : int (Node's Id).
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        label = self._labels[idd_1]
+        return bool(label) and label == self._labels[idd_2]
+
+
+    def get_idds(self, label):
+        """
+        =======================================================================
+         Description: Return the Idds of the Component's Cells.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. label : int (Component's Label).
+        =======================================================================
+         Return: np.ndarray of int (Idds, sorted).
+        =======================================================================
+        """
+        if self._order is None:
+            self._order = np.argsort(self._labels, kind='stable')
+            self._offsets = np.zeros(self.count + 2, dtype=np.int64)
+            np.cumsum(np.bincount(self._labels, minlength=self.count + 1),
+                      out=self._offsets[1:])
+        return self._order[self._offsets[label]:self._offsets[label+1]]
+
+
+    def sample(self, k, rand):
+        """
+        =======================================================================
+         Description: Return k distinct Idds of one Component. The
+                        Component is drawn by its Size, so the first Idd is
+                        uniform over the Cells of large-enough Components.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. k : int (Number of Idds).
+            2. rand : random.Random.
+        =======================================================================
+         Return: list of int (Empty List if no Component has k Cells).
+        =======================================================================
+        """
+        sizes = np.bincount(self._labels, minlength=self.count + 1)
+        sizes[0] = 0
+        sizes[sizes < k] = 0
+        total = int(sizes.sum())
+        if not total:
+            return list()
+        cumsum = np.cumsum(sizes)
+        label = int(np.searchsorted(cumsum, rand.randrange(total),
+                                    side='right'))
+        return rand.sample(self.get_idds(label).tolist(), k)
+
+
+def _label(mask):
+    """
+    ===========================================================================
+     Description: Return 4-Connected Labels of the Mask (0 on False).
+    ===========================================================================
+    """
+    if ndimage is not None:
+        labels, count = ndimage.label(mask)
+        return labels.astype(np.int32)
+
+    rows, cols = mask.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    diff = np.diff(padded, axis=1)
+    runs_rows, runs_starts = np.nonzero(diff == 1)
+    runs_ends = np.nonzero(diff == -1)[1]
+    row_starts = np.searchsorted(runs_rows, np.arange(rows + 1)).tolist()
+    runs_rows = runs_rows.tolist()
+    runs_starts = runs_starts.tolist()
+    runs_ends = runs_ends.tolist()
+
+    # Union-Find over the Runs (overlapping Runs of adjacent Rows)
+    parents = list(range(len(runs_rows)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    # Runs of each Row are [row_starts[row], row_starts[row+1])
+    for row in range(1, rows):
+        j = row_starts[row-1]
+        end_prev = row_starts[row]
+        for i in range(row_starts[row], row_starts[row+1]):
+            while j < end_prev and runs_ends[j] <= runs_starts[i]:
+                j += 1
+            k = j
+            while k < end_prev and runs_starts[k] < runs_ends[i]:
+                root_i, root_k = find(i), find(k)
+                if root_i != root_k:
+                    parents[max(root_i, root_k)] = min(root_i, root_k)
+                k += 1
+
+    labels = np.zeros((rows, cols), dtype=np.int32)
+    roots = dict()
+    for i in range(len(runs_rows)):
+        root = find(i)
+        label = roots.get(root)
+        if label is None:
+            label = roots[root] = len(roots) + 1
+        labels[runs_rows[i], runs_starts[i]:runs_ends[i]] = label
+    return labels
+
+
+# Indexes of the most recently used Grids (LRU, as c_neighbors._cache)
+CACHE_SIZE = 4
+_cache = OrderedDict()
+
+
+def get_components(grid, path_map=None):
+    """
+    ===========================================================================
+     Description: Return Components of the Grid (Cached per Grid, the last
+                    CACHE_SIZE are kept, and persisted next to the Map as
+                    <map>.<digest>.cc.npy).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. path_map : str (Path to .map File, no Persistence on None).
+    ===========================================================================
+     Return: Components.
+    ===========================================================================
+    """
+    digest = u_grid_fast.get_digest(grid)
+    components = _cache.get(digest)
+    if components is not None:
+        _cache.move_to_end(digest)
+        return components
+    path = None
+    if path_map is not None:
+        path = '{0}.{1}.cc.npy'.format(path_map, digest[:16])
+        if os.path.exists(path):
+            try:
+                components = Components(labels=np.load(path))
+            except (OSError, ValueError):
+                components = None
+    if components is None:
+        components = Components(grid)
+        if path is not None:
+            try:
+                np.save(path, components.labels)
+            except OSError:
+                pass
+    put(digest, components)
+    return components
+
+
+def put(digest, components):
+    """
+    ===========================================================================
+     Description: Register the Components of the Grid in the Cache (e.g.
+                    Labels attached from Shared Memory), get_components()
+                    returns them.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. digest : str (Grid's Digest, u_grid_fast.get_digest()).
+        2. components : Components.
+    ===========================================================================
+    """
+    _cache[digest] = components
+    _cache.move_to_end(digest)
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    import tempfile
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+
+
+    def tester_label():
+
+        p0 = True
+        for i in range(1000):
+            n = random.randint(3, 15)
+            grid = u_grid.gen_obstacles_grid(n, 40)
+            components = Components(grid)
+            idds = u_grid.get_valid_idds(grid)
+            if not idds: continue
+            start = random.choice(idds)
+            reachable = set(u_grid.to_dic_g(grid, start))
+            p0 = all(components.is_connected(start, idd) == (idd in reachable)
+                     for idd in idds)
+            p0 = p0 and set(components.get_idds(
+                            components.get_label(start)).tolist()) == reachable
+            if not p0: break
+
+        grid = u_grid.gen_symmetric_grid(4)
+        grid[1][1] = -1
+        components = Components(grid)
+        p1 = components.get_label(5) == 0 and not components.is_connected(5,5)
+
+        u_tester.run([p0,p1])
+
+
+    def tester_sample():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        grid[:, 1] = -1
+        components = Components(grid)
+        rand = random.Random(0)
+        p0 = True
+        for i in range(100):
+            idds = components.sample(6, rand)
+            p0 = len(set(idds)) == 6
+            p0 = p0 and all(components.is_connected(idds[0], idd)
+                            for idd in idds)
+            if not p0: break
+        p1 = components.sample(16, rand) == list()
+
+        u_tester.run([p0,p1])
+
+
+    def tester_get_components():
+
+        grid = u_grid.gen_obstacles_grid(10, 30)
+        path_map = os.path.join(tempfile.mkdtemp(), 'a.map')
+        components = get_components(grid, path_map)
+        p0 = get_components(grid.copy()) is components
+        _cache.clear()
+        loaded = get_components(grid, path_map)
+        p1 = loaded is not components
+        p1 = p1 and np.array_equal(loaded.labels, components.labels)
+        for i in range(CACHE_SIZE):
+            grid_edited = grid.copy()
+            grid_edited.flat[i] = -1 - grid_edited.flat[i]
+            get_components(grid_edited)
+        p2 = len(_cache) == CACHE_SIZE
+        p2 = p2 and u_grid_fast.get_digest(grid) not in _cache
+        # Registered Components are returned as is
+        put(u_grid_fast.get_digest(grid), loaded)
+        p3 = get_components(grid) is loaded
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    u_tester.print_start(__file__)
+    tester_label()
+    tester_sample()
+    tester_get_components()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,289 @@
+from c_bfs import BFS
+import c_neighbors
+import c_components
+
+from array import array
+import heapq
+
+
+UNSEEN = 0
+OPENED = 1
+CLOSED = 2
+
+
+class Dijkstra:
+    """
+    ===========================================================================
+     Description: Multi-Goal Dijkstra (one Shared Tree from Start, Early
+                    Exit once all the Goals are reached).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. run() -> [Run the Search].
+
+        2. get_path(goal) -> list of int [Optimal Path to the Goal, Empty
+                                            List on No-Solution].
+
+        3. get_distance(goal) -> float [Optimal Cost to the Goal, -1 on
+                                        No-Solution].
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. 4-Connected: the Tree is the vectorized BFS Distance Field
+            (c_bfs), a Path walks it back from the Goal (Neighbor with
+            Distance - 1, first in the Neighbors' Order). Stats get the
+            Number of labeled Cells as expanded (no per-Node Hook).
+        2. Octile: Flat-Buffer Dijkstra keyed by (g, idd), with Fathers.
+        3. Goals in another Component than Start are dropped up front.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, start, goals, neighbors=None, octile=False,
+                 stats=None, components=None):
+        """
+        =======================================================================
+         Description: Dijkstra Algorithm.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start Idd).
+            3. goals : iterable of int (Goals Idds).
+            4. neighbors : Neighbors (Grid's Table, cached one on None).
+            5. octile : bool (8-Connected Moves, 4-Connected otherwise).
+            6. stats : Stats (Search Statistics to populate, None to skip).
+            7. components : Components (Grid's Index, cached one on None).
+        =======================================================================
+        """
+        self.grid = grid
+        self.start = start
+        self.goals = list(goals)
+        self.octile = octile
+        self.stats = stats
+        if neighbors is None:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+        self.neighbors = neighbors
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
+        self._distances = None
+        self._g = None
+        self._father = None
+
+
+    def run(self):
+        """
+        =======================================================================
+         Description: Run Dijkstra Algorithm.
+        =======================================================================
+        """
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        goals = [goal for goal in dict.fromkeys(self.goals)
+                 if self.components.is_connected(self.start, goal)]
+        if not self.octile:
+            bfs = BFS(self.grid, self.start, targets=goals)
+            self._distances = bfs.distances.ravel()
+            if stats:
+                stats.expanded += int((self._distances >= 0).sum())
+        else:
+            self._run_octile(goals)
+        if stats:
+            for goal in goals:
+                stats.goal_found(goal, self.get_distance(goal))
+            stats.time_run += stats.clock() - t
+
+
+    def get_distance(self, goal):
+        """
+        =======================================================================
+         Description: Return Optimal Cost from Start to the Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal's Id).
+        =======================================================================
+         Return: float (-1 on No-Solution).
+        =======================================================================
+        """
+        if not self.octile:
+            return int(self._distances[goal])
+        if self._state[goal] != CLOSED:
+            return -1
+        return self._g[goal]
+
+
+    def get_path(self, goal):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to the Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal's Id).
+        =======================================================================
+         Return: list of int (Empty List on No-Solution).
+        =======================================================================
+        """
+        if self.get_distance(goal) < 0:
+            return list()
+        path = [goal]
+        if self.octile:
+            while path[-1] != self.start:
+                path.append(self._father[path[-1]])
+        else:
+            distances = self._distances
+            idd = goal
+            while idd != self.start:
+                d = distances[idd] - 1
+                for child in self.neighbors.get(idd):
+                    if distances[child] == d:
+                        idd = child
+                        break
+                path.append(idd)
+        path.reverse()
+        return path
+
+
+    def _run_octile(self, goals):
+        """
+        =======================================================================
+         Description: Flat-Buffer Dijkstra until all the Goals are closed.
+        =======================================================================
+        """
+        size = self.grid.shape[0] * self.grid.shape[1]
+        g = self._g = array('d', [float('Infinity')]) * size
+        father = self._father = array('l', [-1]) * size
+        state = self._state = array('b', [UNSEEN]) * size
+        stats = self.stats
+        offsets, idds = self.neighbors.offsets, self.neighbors.idds
+        costs = self.neighbors.costs
+        goals_active = set(goals)
+        if not goals_active:
+            return
+        g[self.start] = 0
+        heap = [(0, self.start)]
+        len_closed = 0
+        while heap:
+            g_best, idd = heapq.heappop(heap)
+            if state[idd] == CLOSED:
+                continue
+            state[idd] = CLOSED
+            len_closed += 1
+            if idd in goals_active:
+                goals_active.discard(idd)
+                if not goals_active:
+                    break
+            for i in range(offsets[idd], offsets[idd+1]):
+                child = idds[i]
+                g_new = g_best + costs[i]
+                if state[child] == CLOSED or g[child] <= g_new:
+                    continue
+                if stats:
+                    if state[child] == OPENED:
+                        stats.reopened += 1
+                    else:
+                        stats.generated += 1
+                g[child] = g_new
+                father[child] = idd
+                state[child] = OPENED
+                heapq.heappush(heap, (g_new, child))
+            if stats:
+                stats.expand(idd, g_best, len(heap), len_closed)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_random
+    import u_grid
+    import u_grid_fast
+
+    from c_astar_flat import AStar_Flat
+
+
+    def tester_run():
+
+        p0 = True
+        for i in range(500):
+            n = u_random.get_random_int(5,12)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 6: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:6]
+            for octile in (False, True):
+                dijkstra = Dijkstra(grid, start, goals, octile=octile)
+                dijkstra.run()
+                neighbors = c_neighbors.get_neighbors(grid, octile)
+                for goal in goals:
+                    path_test = dijkstra.get_path(goal)
+                    path_true = AStar_Flat(grid, start, goal,
+                                           octile=octile).get_path()
+                    p0 = bool(path_test) == bool(path_true)
+                    if path_test:
+                        p0 = p0 and path_test[0] == start
+                        p0 = p0 and path_test[-1] == goal
+                        p0 = p0 and all(idd_2 in neighbors.get(idd_1)
+                                        for idd_1, idd_2 in
+                                        zip(path_test, path_test[1:]))
+                        cost_test = u_grid_fast.get_path_cost(grid,
+                                                              path_test,
+                                                              octile)
+                        cost_true = u_grid_fast.get_path_cost(grid,
+                                                              path_true,
+                                                              octile)
+                        p0 = p0 and abs(cost_test - cost_true) < 1e-9
+                        p0 = p0 and abs(dijkstra.get_distance(goal)
+                                        - cost_true) < 1e-9
+                    if not p0: break
+                if not p0: break
+            if not p0: break
+
+        grid = u_grid.gen_symmetric_grid(4)
+        p1 = True
+        for octile in (False, True):
+            dijkstra = Dijkstra(grid, 5, [5], octile=octile)
+            dijkstra.run()
+            p1 = p1 and dijkstra.get_path(5) == [5]
+
+        u_tester.run([p0,p1])
+
+
+    def tester_stats():
+
+        from c_stats import Stats
+
+        grid = u_grid.gen_symmetric_grid(5)
+        goals_found = list()
+        stats = Stats(on_goal_found=lambda idd, g: goals_found.append(idd))
+        dijkstra = Dijkstra(grid, 0, [24, 6], octile=True, stats=stats)
+        dijkstra.run()
+        p0 = sorted(goals_found) == [6, 24]
+        p1 = stats.expanded == 24 and stats.generated == 24
+
+        u_tester.run([p0,p1])
+
+
+    u_tester.print_start(__file__)
+    tester_run()
+    tester_stats()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
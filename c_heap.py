@@ -0,0 +1,333 @@
+import heapq
+
+
+INFINITY = float('Infinity')
+
+
+class Heap:
+    """
+    ===========================================================================
+     Description: Binary-Heap of (key, idd) Items (for the Flat Engines).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. is_empty() -> bool [Return True if the Heap is empty].
+
+        2. push(key, idd) -> [Push the Idd with its Key].
+
+        3. pop() -> (key, idd) [Return and Remove the Item with Min Key].
+
+        4. top() -> (key, idd) [Return the Item with Min Key].
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. There is no decrease-key. The Engine pushes the improved Key
+            and skips the out-of-date Items on pop (lazy deletion).
+    ===========================================================================
+    """
+
+
+    def __init__(self):
+        """
+        =======================================================================
+         Description: Constructor. Init the Attributes.
+        =======================================================================
+        """
+        self._heap = list()
+
+
+    def is_empty(self):
+        """
+        =======================================================================
+         Description: Return True if the Heap is empty.
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        return not self._heap
+
+
+    def push(self, key, idd):
+        """
+        =======================================================================
+         Description: Push the Idd with its Key.
+        =======================================================================
+         Complexity: O(log n).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. key : tuple (f, -g, idd).
+            2. idd : int (Node's Id).
+        =======================================================================
+        """
+        heapq.heappush(self._heap, (key, idd))
+
+
+    def pop(self):
+        """
+        =======================================================================
+         Description: Return and Remove the Item with the Min Key.
+        =======================================================================
+         Complexity: O(log n).
+        =======================================================================
+         Return: tuple (key, idd).
+        =======================================================================
+        """
+        return heapq.heappop(self._heap)
+
+
+    def top(self):
+        """
+        =======================================================================
+         Description: Return the Item with the Min Key (without Removing).
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Return: tuple (key, idd).
+        =======================================================================
+        """
+        return self._heap[0]
+
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class Heap_Buckets:
+    """
+    ===========================================================================
+     Description: Dial's Bucket Queue of (key, item) Items (for Integer-Cost
+                    Grids).
+    ===========================================================================
+     Methods: Same as Heap.
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. Items are kept in Buckets by f = key[0] and, inside a Bucket, in
+            Cells by key[1] (-g for A*, g for LPA*). Both must be Integers
+            (or Infinity). The Cell orders its Items by the rest of the
+            Key, so the Tie-Breaking is the same as Heap's.
+        2. The Min-f and the Bucket's Min-Cell Pointers only move up,
+            except when an Item is pushed below them. With Unit Moves a
+            Child lands at most one Step away, so finding the Min Cell is
+            O(1) amortized.
+        3. Only a Cell is a Binary-Heap, push and pop are O(log m) with
+            m = Items sharing f and g (a Segment of the Frontier, m << n).
+    ===========================================================================
+    """
+
+
+    def __init__(self):
+        """
+        =======================================================================
+         Description: Constructor. Init the Attributes.
+        =======================================================================
+        """
+        # f -> [Min-Cell Pointer, Max Finite Cell, dict (key[1] -> Cell)]
+        self._buckets = dict()
+        self._f_min = None
+        self._f_max = -INFINITY
+        self._size = 0
+
+
+    def is_empty(self):
+        """
+        =======================================================================
+         Description: Return True if the Heap is empty.
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        return self._size == 0
+
+
+    def push(self, key, idd):
+        """
+        =======================================================================
+         Description: Push the Idd with its Key.
+        =======================================================================
+         Complexity: O(1) amortized (+ O(log m) inside the Cell).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. key : tuple (f, -g, idd).
+            2. idd : int (Node's Id, or any Item).
+        =======================================================================
+        """
+        f, c = key[0], key[1]
+        if not (type(f) is int and type(c) is int) and \
+           not (_is_integer(f) and _is_integer(c)):
+            raise ValueError('Heap_Buckets requires integer f and g '
+                             '(got {0} for {1})'.format(key[:2], idd))
+        bucket = self._buckets.get(f)
+        if bucket is None:
+            bucket = self._buckets[f] = [c, -INFINITY, dict()]
+        cells = bucket[2]
+        cell = cells.get(c)
+        if cell is None:
+            cells[c] = [(key, idd)]
+        else:
+            heapq.heappush(cell, (key, idd))
+        if c < bucket[0]:
+            bucket[0] = c
+        if c != INFINITY and c > bucket[1]:
+            bucket[1] = c
+        if self._f_min is None or f < self._f_min:
+            self._f_min = f
+        if f != INFINITY and f > self._f_max:
+            self._f_max = f
+        self._size += 1
+
+
+    def top(self):
+        """
+        =======================================================================
+         Description: Return the Item with the Min Key (without Removing).
+        =======================================================================
+         Complexity: O(1) amortized.
+        =======================================================================
+         Return: tuple (key, idd).
+        =======================================================================
+        """
+        f = self._f_min
+        if f not in self._buckets:
+            f = self._f_min = _get_min(self._buckets, f, self._f_max)
+        bucket = self._buckets[f]
+        cells = bucket[2]
+        if bucket[0] not in cells:
+            bucket[0] = _get_min(cells, bucket[0], bucket[1])
+        return cells[bucket[0]][0]
+
+
+    def pop(self):
+        """
+        =======================================================================
+         Description: Return and Remove the Item with the Min Key.
+        =======================================================================
+         Complexity: O(1) amortized (+ O(log m) inside the Cell).
+        =======================================================================
+         Return: tuple (key, idd).
+        =======================================================================
+        """
+        buckets = self._buckets
+        f = self._f_min
+        if f not in buckets:
+            f = self._f_min = _get_min(buckets, f, self._f_max)
+        bucket = buckets[f]
+        cells = bucket[2]
+        c = bucket[0]
+        if c not in cells:
+            c = bucket[0] = _get_min(cells, c, bucket[1])
+        cell = cells[c]
+        item = heapq.heappop(cell)
+        if not cell:
+            del cells[c]
+            if not cells:
+                del buckets[f]
+        self._size -= 1
+        return item
+
+
+    def __len__(self):
+        return self._size
+
+
+def _is_integer(x):
+    """
+    ===========================================================================
+     Description: Return True if x is an Integer Value (or +-Infinity).
+    ===========================================================================
+    """
+    return x == INFINITY or x == -INFINITY or x == int(x)
+
+
+def _get_min(slots, low, high):
+    """
+    ===========================================================================
+     Description: Return the Min Key of the Slots, scanning up from the
+                    Pointer low (min() once it passes high, the max finite
+                    Key pushed, or is not finite).
+    ===========================================================================
+    """
+    while low not in slots:
+        if low >= high or low == -INFINITY:
+            return min(slots)
+        low += 1
+    return low
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+
+
+    def tester_pop():
+
+        heap = Heap()
+        for idd, f, g in [(3,5,1), (2,5,2), (1,5,1), (4,4,0)]:
+            heap.push((f,-g,idd), idd)
+        order = [heap.pop()[1] for i in range(4)]
+        p0 = order == [4,2,1,3]
+        p1 = heap.is_empty() and len(heap) == 0
+
+        u_tester.run([p0,p1])
+
+
+    def tester_buckets():
+
+        import random
+
+        p0 = True
+        for i in range(100):
+            heap = Heap()
+            heap_buckets = Heap_Buckets()
+            for idd in range(50):
+                f = random.randint(0, 20)
+                g = random.randint(0, f)
+                heap.push((f,-g,idd), idd)
+                heap_buckets.push((f,-g,idd), idd)
+            for j in range(50):
+                p0 = heap.pop() == heap_buckets.pop()
+                if not p0: break
+            if not p0: break
+        p1 = heap_buckets.is_empty()
+
+        # (f, g, idd) Keys as in LPA*, Infinity and top()
+        p2 = True
+        for i in range(100):
+            heap = Heap()
+            heap_buckets = Heap_Buckets()
+            for idd in range(50):
+                f = random.choice([random.randint(0, 20), float('Infinity')])
+                g = random.randint(0, 20)
+                heap.push((f,g,idd), idd)
+                heap_buckets.push((f,g,idd), idd)
+                if random.random() < 0.3:
+                    p2 = heap.pop() == heap_buckets.pop()
+                if not p2: break
+            while p2 and not heap.is_empty():
+                p2 = heap.top() == heap_buckets.top()
+                p2 = p2 and heap.pop() == heap_buckets.pop()
+            p2 = p2 and heap_buckets.is_empty()
+            if not p2: break
+
+        u_tester.run([p0,p1,p2])
+
+
+    u_tester.print_start(__file__)
+    tester_pop()
+    tester_buckets()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,751 @@
+from c_astar import AStar
+from c_components import Components
+from c_neighbors import Neighbors
+import c_components
+import c_landmarks
+import u_grid_fast
+
+import heapq
+import os
+
+import numpy as np
+
+
+# Entrances of this Width or more get two Transitions (one at each End)
+WIDTH_ENTRANCE = 6
+
+
+class HPA:
+    """
+    ===========================================================================
+     Description: HPA* Abstraction of a Grid (Hierarchical Path-Finding).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_abstract_path(start, goal) -> list of int [Abstract Nodes'
+                                                Idds from Start to Goal].
+
+        2. get_abstract_paths(start, goals) -> dict [Goal -> Abstract Path,
+                                                One shared Search].
+
+        3. refine(abstract_path) -> generator of int [Cells of the Path,
+                                        refined one Segment at a time].
+
+        4. get_path(start, goal) -> list of int [Cells from Start to Goal,
+                                                Empty List on No-Solution].
+
+        5. get_paths(start, goals) -> dict [Goal -> Path, reachable Goals].
+
+        6. update(idds) -> [Repair the Abstraction after Cells changed].
+
+        7. save(path) -> [Save the Abstraction into .npz File].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. size : int (Cluster's Side in Cells).
+        3. octile : bool (8-Connected Moves, 4-Connected otherwise).
+        4. digest : str (Digest of the Grid the Abstraction was built for).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. The Grid is split into size x size Clusters. An Entrance is a
+            maximal Run of Cell Pairs passable on both Sides of a Border.
+            It gets one Transition in its Middle, or two at its Ends when
+            it is WIDTH_ENTRANCE wide or more (Botea et al.).
+        2. Abstract Nodes are the Transitions' Cells. Inter-Edges join the
+            two Cells of a Transition (Cost 1). Intra-Edges join the Nodes
+            of a Cluster with their Distance inside the Cluster
+            (precomputed).
+        3. A Query inserts Start and Goals into their Clusters (Distances
+            inside the Cluster), runs A* over the Abstract Graph (KA*-like
+            min-h over the Goals on Multi-Goal), and refines every
+            Intra-Edge by AStar inside its Cluster.
+        4. Complete (same Reachability as the Grid) but near-optimal: the
+            Paths cross the Borders only at the Transitions, orthogonally.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid=None, size=16, octile=False):
+        """
+        =======================================================================
+         Description: Build the Abstraction of the Grid.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid (None for an Empty Abstraction, see load()).
+            2. size : int (Cluster's Side in Cells).
+            3. octile : bool (8-Connected Moves, 4-Connected otherwise).
+        =======================================================================
+        """
+        self.size = size
+        self.octile = octile
+        self.grid = None
+        self.digest = None
+        # Border (cluster_1, cluster_2) -> list of Transitions (idd_1, idd_2)
+        self._entrances = dict()
+        # Idd -> dict (Idd -> Cost) of Inter-Edges
+        self._inter = dict()
+        # Cluster -> dict (Idd -> dict (Idd -> Cost)) of Intra-Edges
+        self._intra = dict()
+        # Cluster -> (Sub-Grid, Neighbors, Components), built on demand
+        self._locals = dict()
+        if grid is None:
+            return
+
+        self._set_grid(grid)
+        for border in self._get_borders(range(self._count)):
+            self._build_border(border)
+        for cluster in range(self._count):
+            self._build_cluster(cluster)
+
+
+    def get_abstract_path(self, start, goal):
+        """
+        =======================================================================
+         Description: Return Abstract Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start's Id).
+            2. goal : int (Goal's Id).
+        =======================================================================
+         Return: list of int (Start, Abstract Nodes, Goal), Empty List on
+                    No-Solution.
+        =======================================================================
+        """
+        return self.get_abstract_paths(start, [goal]).get(goal, list())
+
+
+    def get_abstract_paths(self, start, goals):
+        """
+        =======================================================================
+         Description: Return Abstract Paths from Start to the Goals (one
+                        Search over the Abstract Graph for all of them).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start's Id).
+            2. goals : iterable of int (Goals' Ids).
+        =======================================================================
+         Return: dict (Goal -> list of int), only the reachable Goals.
+        =======================================================================
+        """
+        components = c_components.get_components(self.grid)
+        goals = [goal for goal in dict.fromkeys(goals)
+                 if components.is_connected(start, goal)]
+        if not goals:
+            return dict()
+
+        # Insert Start and Goals (Edges into their Clusters' Nodes)
+        edges_start = self._get_insertion(start, goals)
+        edges_goals = dict()
+        for goal in goals:
+            for idd, cost in self._get_insertion(goal).items():
+                edges_goals.setdefault(idd, dict())[goal] = cost
+
+        goals_active = set(goals)
+        g = {start: 0}
+        father = {start: None}
+        closed = set()
+        heap = [(self._get_h(start, goals_active), 0, start)]
+        paths = dict()
+        while heap and goals_active:
+            f, g_neg, idd = heapq.heappop(heap)
+            if idd in closed:
+                continue
+            # Lazy re-keying: h only grows when a Goal is removed
+            f_now = g[idd] + self._get_h(idd, goals_active)
+            if f_now > f:
+                heapq.heappush(heap, (f_now, g_neg, idd))
+                continue
+            closed.add(idd)
+            if idd in goals_active:
+                goals_active.discard(idd)
+                path = [idd]
+                while father[path[-1]] is not None:
+                    path.append(father[path[-1]])
+                path.reverse()
+                paths[idd] = path
+            edges = [self._inter.get(idd),
+                     self._intra[self._get_cluster(idd)].get(idd),
+                     edges_goals.get(idd)]
+            if idd == start:
+                edges.append(edges_start)
+            for items in edges:
+                if not items:
+                    continue
+                for child, cost in items.items():
+                    g_new = g[idd] + cost
+                    if child in closed or g.get(child, float('Infinity')) \
+                            <= g_new:
+                        continue
+                    g[child] = g_new
+                    father[child] = idd
+                    heapq.heappush(heap, (g_new + self._get_h(child,
+                                                              goals_active),
+                                          -g_new, child))
+        return paths
+
+
+    def refine(self, abstract_path):
+        """
+        =======================================================================
+         Description: Return the Cells of the Abstract Path. Every
+                        Intra-Edge is refined by AStar inside its Cluster
+                        only when the Generator reaches it.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. abstract_path : list of int (see get_abstract_path()).
+        =======================================================================
+         Return: generator of int (Cells' Idds).
+        =======================================================================
+        """
+        if not abstract_path:
+            return
+        yield abstract_path[0]
+        for idd_1, idd_2 in zip(abstract_path, abstract_path[1:]):
+            cluster = self._get_cluster(idd_1)
+            if cluster != self._get_cluster(idd_2):
+                yield idd_2
+                continue
+            grid, neighbors, components = self._get_local(cluster)
+            astar = AStar(grid, self._to_local(cluster, idd_1),
+                          self._to_local(cluster, idd_2), neighbors,
+                          octile=self.octile, components=components)
+            for idd in astar.get_path()[1:]:
+                yield self._to_global(cluster, idd)
+
+
+    def get_path(self, start, goal):
+        """
+        =======================================================================
+         Description: Return Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start's Id).
+            2. goal : int (Goal's Id).
+        =======================================================================
+         Return: list of int (Cells' Idds, Empty List on No-Solution).
+        =======================================================================
+        """
+        return list(self.refine(self.get_abstract_path(start, goal)))
+
+
+    def get_paths(self, start, goals):
+        """
+        =======================================================================
+         Description: Return Paths from Start to the Goals (one shared
+                        Abstract Search).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start's Id).
+            2. goals : iterable of int (Goals' Ids).
+        =======================================================================
+         Return: dict (Goal -> list of int), only the reachable Goals.
+        =======================================================================
+        """
+        return {goal: list(self.refine(path)) for goal, path in
+                self.get_abstract_paths(start, goals).items()}
+
+
+    def update(self, idds):
+        """
+        =======================================================================
+         Description: Repair the Abstraction after the Cells were changed
+                        in the Grid (in-place). Only the Clusters of the
+                        Cells and their Borders are rebuilt.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : iterable of int (Ids of the changed Cells).
+        =======================================================================
+        """
+        clusters = {self._get_cluster(idd) for idd in idds}
+        borders = self._get_borders(clusters)
+        for cluster in clusters:
+            self._locals.pop(cluster, None)
+        for border in borders:
+            self._build_border(border)
+        for cluster in clusters.union(*borders):
+            self._build_cluster(cluster)
+        self.digest = u_grid_fast.get_digest(self.grid)
+
+
+    def save(self, path):
+        """
+        =======================================================================
+         Description: Save the Abstraction into (compressed) .npz File.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. path : str (Path to .npz File).
+        =======================================================================
+        """
+        entrances = [(border[0], border[1], idd_1, idd_2)
+                     for border, transitions in self._entrances.items()
+                     for idd_1, idd_2 in transitions]
+        edges = [(idd_1, idd_2, cost)
+                 for cluster in self._intra.values()
+                 for idd_1, items in cluster.items()
+                 for idd_2, cost in items.items()]
+        np.savez_compressed(path,
+                            entrances=np.array(entrances,
+                                               np.int64).reshape(-1, 4),
+                            edges=np.array(edges, np.float64).reshape(-1, 3),
+                            size=self.size, octile=self.octile,
+                            digest=self.digest)
+
+
+    def _set_grid(self, grid):
+        """
+        =======================================================================
+         Description: Set the Grid and its Clusters' Layout.
+        =======================================================================
+        """
+        self.grid = grid
+        self.digest = u_grid_fast.get_digest(grid)
+        rows, cols = grid.shape
+        self._rows_clusters = -(-rows // self.size)
+        self._cols_clusters = -(-cols // self.size)
+        self._count = self._rows_clusters * self._cols_clusters
+        for cluster in range(self._count):
+            self._intra[cluster] = dict()
+
+
+    def _get_cluster(self, idd):
+        """
+        =======================================================================
+         Description: Return the Cluster of the Cell.
+        =======================================================================
+        """
+        row, col = divmod(idd, self.grid.shape[1])
+        return (row // self.size) * self._cols_clusters + col // self.size
+
+
+    def _get_bounds(self, cluster):
+        """
+        =======================================================================
+         Description: Return the Cluster's Bounds (row_1, row_2, col_1,
+                        col_2), exclusive Ends.
+        =======================================================================
+        """
+        rows, cols = self.grid.shape
+        row, col = divmod(cluster, self._cols_clusters)
+        row_1, col_1 = row * self.size, col * self.size
+        return (row_1, min(row_1 + self.size, rows),
+                col_1, min(col_1 + self.size, cols))
+
+
+    def _get_borders(self, clusters):
+        """
+        =======================================================================
+         Description: Return the Borders (cluster_1, cluster_2) of the
+                        Clusters (cluster_1 is Left of / Above cluster_2).
+        =======================================================================
+        """
+        borders = set()
+        for cluster in clusters:
+            row, col = divmod(cluster, self._cols_clusters)
+            if col > 0:
+                borders.add((cluster - 1, cluster))
+            if col + 1 < self._cols_clusters:
+                borders.add((cluster, cluster + 1))
+            if row > 0:
+                borders.add((cluster - self._cols_clusters, cluster))
+            if row + 1 < self._rows_clusters:
+                borders.add((cluster, cluster + self._cols_clusters))
+        return sorted(borders)
+
+
+    def _build_border(self, border):
+        """
+        =======================================================================
+         Description: (Re)Build the Entrances and Transitions of the Border.
+        =======================================================================
+        """
+        for idd_1, idd_2 in self._entrances.pop(border, list()):
+            for idd, other in ((idd_1, idd_2), (idd_2, idd_1)):
+                items = self._inter[idd]
+                del items[other]
+                if not items:
+                    del self._inter[idd]
+
+        cluster_1, cluster_2 = border
+        width = self.grid.shape[1]
+        row_1, row_2, col_1, col_2 = self._get_bounds(cluster_2)
+        mask = u_grid_fast.get_mask(self.grid)
+        if cluster_2 == cluster_1 + 1 and col_1 > 0:
+            # Vertical Border: Left Column of cluster_2 and the one before
+            passable = mask[row_1:row_2, col_1 - 1] & mask[row_1:row_2, col_1]
+            pairs = [((row_1 + i) * width + col_1 - 1,
+                      (row_1 + i) * width + col_1)
+                     for i in range(row_2 - row_1)]
+        else:
+            # Horizontal Border: Top Row of cluster_2 and the one above
+            passable = mask[row_1 - 1, col_1:col_2] & mask[row_1, col_1:col_2]
+            pairs = [((row_1 - 1) * width + col_1 + i,
+                      row_1 * width + col_1 + i)
+                     for i in range(col_2 - col_1)]
+
+        transitions = list()
+        passable = passable.tolist() + [False]
+        begin = None
+        for i, is_passable in enumerate(passable):
+            if is_passable and begin is None:
+                begin = i
+            elif not is_passable and begin is not None:
+                if i - begin >= WIDTH_ENTRANCE:
+                    transitions.extend([pairs[begin], pairs[i - 1]])
+                else:
+                    transitions.append(pairs[(begin + i - 1) // 2])
+                begin = None
+        for idd_1, idd_2 in transitions:
+            self._inter.setdefault(idd_1, dict())[idd_2] = 1
+            self._inter.setdefault(idd_2, dict())[idd_1] = 1
+        if transitions:
+            self._entrances[border] = transitions
+
+
+    def _build_cluster(self, cluster):
+        """
+        =======================================================================
+         Description: (Re)Build the Intra-Edges of the Cluster (Distances
+                        between its Nodes inside the Cluster).
+        =======================================================================
+        """
+        nodes = set()
+        for border in self._get_borders([cluster]):
+            for transition in self._entrances.get(border, list()):
+                nodes.update(idd for idd in transition
+                             if self._get_cluster(idd) == cluster)
+        nodes = sorted(nodes)
+        edges = dict()
+        for idd in nodes:
+            distances = self._get_distances(cluster, idd)
+            edges[idd] = {other: distances[self._to_local(cluster, other)]
+                          for other in nodes if other != idd and
+                          distances[self._to_local(cluster, other)] >= 0}
+        self._intra[cluster] = edges
+
+
+    def _get_insertion(self, idd, goals=tuple()):
+        """
+        =======================================================================
+         Description: Return Edges of the Node into its Cluster (to the
+                        Cluster's Nodes and to the Goals in the Cluster).
+        =======================================================================
+         Return: dict (Idd -> Cost).
+        =======================================================================
+        """
+        cluster = self._get_cluster(idd)
+        distances = self._get_distances(cluster, idd)
+        edges = dict()
+        for other in list(self._intra[cluster]) + list(goals):
+            if other == idd or self._get_cluster(other) != cluster:
+                continue
+            distance = distances[self._to_local(cluster, other)]
+            if distance >= 0:
+                edges[other] = distance
+        return edges
+
+
+    def _get_distances(self, cluster, idd):
+        """
+        =======================================================================
+         Description: Return Distances from the Cell to the Cluster's Cells
+                        inside the Cluster (Local Idds, -1 on Unreachable).
+        =======================================================================
+        """
+        grid, neighbors, components = self._get_local(cluster)
+        distances = c_landmarks.dijkstra(neighbors, self._to_local(cluster,
+                                                                   idd),
+                                         grid.size)
+        if not self.octile:
+            distances = distances.astype(np.int64)
+        return distances.tolist()
+
+
+    def _get_local(self, cluster):
+        """
+        =======================================================================
+         Description: Return the Cluster's (Sub-Grid, Neighbors, Components).
+        =======================================================================
+        """
+        local = self._locals.get(cluster)
+        if local is None:
+            row_1, row_2, col_1, col_2 = self._get_bounds(cluster)
+            grid = np.array(self.grid[row_1:row_2, col_1:col_2])
+            local = (grid, Neighbors(grid, self.octile), Components(grid))
+            self._locals[cluster] = local
+        return local
+
+
+    def _to_local(self, cluster, idd):
+        """
+        =======================================================================
+         Description: Return the Cell's Idd inside the Cluster's Sub-Grid.
+        =======================================================================
+        """
+        row_1, row_2, col_1, col_2 = self._get_bounds(cluster)
+        row, col = divmod(idd, self.grid.shape[1])
+        return (row - row_1) * (col_2 - col_1) + col - col_1
+
+
+    def _to_global(self, cluster, idd):
+        """
+        =======================================================================
+         Description: Return the Grid's Idd of the Sub-Grid's Cell.
+        =======================================================================
+        """
+        row_1, row_2, col_1, col_2 = self._get_bounds(cluster)
+        row, col = divmod(idd, col_2 - col_1)
+        return (row + row_1) * self.grid.shape[1] + col + col_1
+
+
+    def _get_h(self, idd, goals):
+        """
+        =======================================================================
+         Description: Return min Heuristic Distance to the Goals (Octile or
+                        Manhattan).
+        =======================================================================
+        """
+        if not goals:
+            return 0
+        if self.octile:
+            return min(u_grid_fast.octile_distance(self.grid, idd, goal)
+                       for goal in goals)
+        width = self.grid.shape[1]
+        row, col = divmod(idd, width)
+        return min(abs(row - row_goal) + abs(col - col_goal)
+                   for row_goal, col_goal in (divmod(goal, width)
+                                              for goal in goals))
+
+
+def load(path, grid):
+    """
+    ===========================================================================
+     Description: Load Abstraction from .npz File (see HPA.save).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .npz File).
+        2. grid : Grid (the Abstraction was built for).
+    ===========================================================================
+     Return: HPA.
+    ===========================================================================
+     Raises: ValueError if the Abstraction was built for another Grid.
+    ===========================================================================
+    """
+    with np.load(path) as data:
+        hpa = HPA(size=int(data['size']), octile=bool(data['octile']))
+        digest = str(data['digest'])
+        entrances = data['entrances'].tolist()
+        edges = data['edges'].tolist()
+    hpa._set_grid(grid)
+    if hpa.digest != digest:
+        raise ValueError('abstraction was built for another grid')
+    for cluster_1, cluster_2, idd_1, idd_2 in entrances:
+        hpa._entrances.setdefault((cluster_1, cluster_2), list()).append(
+                                                            (idd_1, idd_2))
+        hpa._inter.setdefault(idd_1, dict())[idd_2] = 1
+        hpa._inter.setdefault(idd_2, dict())[idd_1] = 1
+    for cluster in range(hpa._count):
+        for border in hpa._get_borders([cluster]):
+            for transition in hpa._entrances.get(border, list()):
+                for idd in transition:
+                    if hpa._get_cluster(idd) == cluster:
+                        hpa._intra[cluster].setdefault(idd, dict())
+    for idd_1, idd_2, cost in edges:
+        idd_1, idd_2 = int(idd_1), int(idd_2)
+        if not hpa.octile:
+            cost = int(cost)
+        hpa._intra[hpa._get_cluster(idd_1)][idd_1][idd_2] = cost
+    return hpa
+
+
+def get_hpa(grid, path_map=None, size=16, octile=False):
+    """
+    ===========================================================================
+     Description: Return HPA Abstraction of the Grid, persisted next to the
+                    Map (<map>.<digest>.hpa<size>-<4|8>.npz).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. path_map : str (Path to .map File, no Persistence on None).
+        3. size : int (Cluster's Side in Cells).
+        4. octile : bool (8-Connected Moves, 4-Connected otherwise).
+    ===========================================================================
+     Return: HPA.
+    ===========================================================================
+    """
+    if path_map is None:
+        return HPA(grid, size, octile)
+    digest = u_grid_fast.get_digest(grid)
+    path = '{0}.{1}.hpa{2}-{3}.npz'.format(path_map, digest[:16], size,
+                                           8 if octile else 4)
+    if os.path.exists(path):
+        try:
+            return load(path, grid)
+        except (OSError, ValueError, KeyError):
+            pass
+    hpa = HPA(grid, size, octile)
+    try:
+        hpa.save(path)
+    except OSError:
+        pass
+    return hpa
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    import tempfile
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_random
+    import u_grid
+
+    import c_neighbors
+    from c_astar_flat import AStar_Flat
+
+
+    def is_valid(grid, path, octile):
+
+        neighbors = c_neighbors.get_neighbors(grid, octile)
+        return all(idd_2 in neighbors.get(idd_1)
+                   for idd_1, idd_2 in zip(path, path[1:]))
+
+
+    def tester_get_path():
+
+        p0 = True
+        p1 = True
+        for i in range(300):
+            n = u_random.get_random_int(5,30)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            for octile in (False, True):
+                hpa = HPA(grid, u_random.get_random_int(3,8), octile)
+                random.shuffle(idds_valid)
+                start = idds_valid[0]
+                goal = idds_valid[1]
+                path_test = hpa.get_path(start, goal)
+                path_true = AStar_Flat(grid,start,goal,octile=octile).\
+                                get_path()
+                # Complete: same Reachability as the Grid
+                p0 = bool(path_test) == bool(path_true)
+                if path_test:
+                    p0 = p0 and path_test[0] == start
+                    p0 = p0 and path_test[-1] == goal
+                    p0 = p0 and is_valid(grid, path_test, octile)
+                    cost_test = u_grid_fast.get_path_cost(grid, path_test,
+                                                          octile)
+                    cost_true = u_grid_fast.get_path_cost(grid, path_true,
+                                                          octile)
+                    p1 = cost_test >= cost_true - 1e-9
+                if not (p0 and p1): break
+            if not (p0 and p1): break
+
+        grid = u_grid.gen_symmetric_grid(8)
+        hpa = HPA(grid, 4)
+        p2 = hpa.get_path(9, 9) == [9]
+        p3 = len(hpa.get_path(0, 63)) == 15
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    def tester_get_paths():
+
+        p0 = True
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(20,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 6: continue
+            hpa = HPA(grid, 5)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:6]
+            paths = hpa.get_paths(start, goals)
+            for goal in goals:
+                path = hpa.get_path(start, goal)
+                cost_1 = u_grid_fast.get_path_cost(grid, path)
+                cost_2 = u_grid_fast.get_path_cost(grid,
+                                                   paths.get(goal, list()))
+                p0 = cost_1 == cost_2 and bool(path) == (goal in paths)
+                if not p0: break
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    def tester_update():
+
+        p0 = True
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(20,30)
+            for octile in (False, True):
+                hpa = HPA(grid, 6, octile)
+                idds = random.sample(range(grid.size), 10)
+                for idd in idds:
+                    row, col = divmod(idd, 20)
+                    grid[row][col] = -1 if grid[row][col] >= 0 else 0
+                hpa.update(idds)
+                fresh = HPA(grid, 6, octile)
+                p0 = hpa._inter == fresh._inter
+                p0 = p0 and hpa._intra == fresh._intra
+                p0 = p0 and hpa.digest == fresh.digest
+                if not p0: break
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    def tester_save():
+
+        grid = u_grid.gen_obstacles_grid(30,30)
+        folder = tempfile.mkdtemp()
+        path_map = os.path.join(folder, 'a.map')
+        p0 = True
+        for octile in (False, True):
+            hpa = get_hpa(grid, path_map, 8, octile)
+            loaded = get_hpa(grid, path_map, 8, octile)
+            p0 = p0 and loaded._inter == hpa._inter
+            p0 = p0 and loaded._intra == hpa._intra
+        p1 = len(os.listdir(folder)) == 2
+        other = grid.copy()
+        other[0][0] = -1 if other[0][0] >= 0 else 0
+        try:
+            load(os.path.join(folder, os.listdir(folder)[0]), other)
+            p2 = False
+        except ValueError:
+            p2 = True
+
+        u_tester.run([p0,p1,p2])
+
+
+    u_tester.print_start(__file__)
+    tester_get_path()
+    tester_get_paths()
+    tester_update()
+    tester_save()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
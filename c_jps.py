@@ -0,0 +1,520 @@
+from c_heap import Heap
+import c_components
+import u_grid_fast
+
+from array import array
+
+import numpy as np
+
+
+UNSEEN = 0
+OPENED = 1
+CLOSED = 2
+
+
+class KJPS:
+    """
+    ===========================================================================
+     Description: Multi-Goal Jump Point Search (KA* Semantics: Optimal
+                    Paths to all the Goals).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. run() -> [Run the Search].
+
+        2. get_path(goal) -> list of int [Optimal Path to the Goal as full
+                                            Cell Sequence, Empty List on
+                                            No-Solution].
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. Uniform-Cost Grids only. Octile: 8-Connected with sqrt(2)
+            Diagonals and no Corner-Cutting (as in c_neighbors). Otherwise
+            4-Connected, where Vertical Jumps look for Horizontal Jump
+            Points.
+        2. The Search runs on a Mask padded with an Obstacle Border, so the
+            Jumps need no Bounds Checks. All Goals stop the Jumps.
+        3. h = min Octile / Manhattan Distance to the Active Goals. A Node
+            whose nearest Goal was reached is re-keyed when it surfaces
+            (as in KAStar._pop_best).
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, start, goals, octile=False, heap=Heap,
+                 stats=None, components=None):
+        """
+        =======================================================================
+         Description: KJPS Algorithm.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start Idd).
+            3. goals : iterable of int (Goals Idds).
+            4. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            5. heap : class (Priority Queue of (key, idd) Items).
+            6. stats : Stats (Search Statistics to populate, None to skip).
+            7. components : Components (Grid's Index, cached one on None).
+        =======================================================================
+        """
+        self.grid = grid
+        self.start = start
+        self.goals = list(goals)
+        self.octile = octile
+        self.heap = heap
+        self.stats = stats
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
+
+        rows, cols = grid.shape
+        self._cols = cols
+        self._width = cols + 2
+        mask = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        mask[1:-1, 1:-1] = u_grid_fast.get_mask(grid)
+        self._mask = mask.ravel().tobytes()
+
+
+    def run(self):
+        """
+        =======================================================================
+         Description: Run KJPS Algorithm.
+        =======================================================================
+        """
+        stats = self.stats
+        heap = self.heap
+        if stats:
+            t = stats.clock()
+            heap = stats.get_type_opened(heap)
+        size = len(self._mask)
+        self._g = array('d', [float('Infinity')]) * size
+        self._father = array('l', [-1]) * size
+        self._state = bytearray(size)
+        self._goal = dict()
+        self._goals_all = {self._to_padded(goal) for goal in self.goals}
+        # Goals in another Component are never searched for (No-Solution)
+        self._goals_active = {self._to_padded(goal) for goal in self.goals
+                              if self.components.is_connected(self.start,
+                                                              goal)}
+        self.opened = heap()
+
+        start = self._to_padded(self.start)
+        if self._goals_active:
+            self._g[start] = 0
+            self._push(start, 0)
+        self._run()
+        if stats:
+            stats.time_run += stats.clock() - t
+
+
+    def get_path(self, goal):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal's Id).
+        =======================================================================
+         Return: list of int (Full Cell Sequence, Empty List on No-Solution).
+        =======================================================================
+        """
+        p = self._to_padded(goal)
+        if self._state[p] != CLOSED:
+            return list()
+        points = [p]
+        while self._father[p] >= 0:
+            p = self._father[p]
+            points.append(p)
+        points.reverse()
+        path = [points[0]]
+        for p_from, p_to in zip(points, points[1:]):
+            step = self._get_step(p_from, p_to)
+            p = p_from
+            while p != p_to:
+                p += step
+                path.append(p)
+        return [self._to_idd(p) for p in path]
+
+
+    def _run(self):
+        """
+        =======================================================================
+         Description: Pop and expand the Jump Points until all the Goals
+                        are closed.
+        =======================================================================
+        """
+        g, state, stats = self._g, self._state, self.stats
+        goals_active = self._goals_active
+        len_closed = 0
+        while goals_active and not self.opened.is_empty():
+            key, p = self.opened.pop()
+            if state[p] == CLOSED or -key[1] != g[p]:
+                continue
+            if self._goal[p] not in goals_active:
+                self._push(p, g[p])
+                continue
+            state[p] = CLOSED
+            len_closed += 1
+            if p in goals_active:
+                goals_active.discard(p)
+                if stats:
+                    stats.goal_found(self._to_idd(p), g[p])
+                if not goals_active:
+                    return
+            self._expand(p)
+            if stats:
+                stats.expand(self._to_idd(p), g[p], len(self.opened),
+                             len_closed)
+
+
+    def _expand(self, p):
+        """
+        =======================================================================
+         Description: Jump from the Node along its pruned Directions.
+        =======================================================================
+        """
+        g, father, state, stats = self._g, self._father, self._state, \
+                                  self.stats
+        for dr, dc in self._get_directions(p):
+            q = self._jump(p, dr, dc)
+            if q is None or state[q] == CLOSED:
+                continue
+            g_new = g[p] + self._get_distance(p, q)
+            if g[q] <= g_new:
+                continue
+            if stats:
+                if state[q] == OPENED:
+                    stats.reopened += 1
+                else:
+                    stats.generated += 1
+            g[q] = g_new
+            father[q] = p
+            state[q] = OPENED
+            self._push(q, g_new)
+
+
+    def _push(self, p, g):
+        """
+        =======================================================================
+         Description: Push the Node with h toward the Active Goals.
+        =======================================================================
+        """
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        h, goal = float('Infinity'), None
+        for goal_active in self._goals_active:
+            d = self._get_distance(p, goal_active)
+            if d < h:
+                h, goal = d, goal_active
+        self._goal[p] = goal
+        if stats:
+            stats.time_h += stats.clock() - t
+            stats.counter_h += 1
+        self.opened.push((g + h, -g, p), p)
+
+
+    def _get_directions(self, p):
+        """
+        =======================================================================
+         Description: Return the pruned Directions (dr, dc) of the Node
+                        (by the Direction it was reached from).
+        =======================================================================
+        """
+        father = self._father[p]
+        if father < 0:
+            if self.octile:
+                return [(-1, 0), (0, 1), (1, 0), (0, -1),
+                        (-1, 1), (1, 1), (1, -1), (-1, -1)]
+            return [(-1, 0), (0, 1), (1, 0), (0, -1)]
+        dr, dc = self._get_direction(father, p)
+        if not self.octile:
+            if dc:
+                return [(-1, 0), (1, 0), (0, dc)]
+            return [(0, -1), (0, 1), (dr, 0)]
+        if dr and dc:
+            return [(dr, 0), (0, dc), (dr, dc)]
+        if dc:
+            return [(0, dc), (-1, dc), (1, dc), (-1, 0), (1, 0)]
+        return [(dr, 0), (dr, -1), (dr, 1), (0, -1), (0, 1)]
+
+
+    def _jump(self, p, dr, dc):
+        """
+        =======================================================================
+         Description: Return the next Jump Point from the Node in the
+                        Direction (None on Dead-End).
+        =======================================================================
+        """
+        if not (dr and dc):
+            return self._jump_straight(p, dr, dc)
+        mask, width, goals = self._mask, self._width, self._goals_all
+        step = dr * width + dc
+        while True:
+            # No Corner-Cutting
+            if not (mask[p + step] and mask[p + dc] and mask[p + dr*width]):
+                return None
+            p += step
+            if p in goals:
+                return p
+            if self._jump_straight(p, 0, dc) is not None or \
+               self._jump_straight(p, dr, 0) is not None:
+                return p
+
+
+    def _jump_straight(self, p, dr, dc):
+        """
+        =======================================================================
+         Description: Return the next Jump Point along a Row or a Col
+                        (None on Dead-End).
+        =======================================================================
+        """
+        mask, width, goals = self._mask, self._width, self._goals_all
+        step = dr * width + dc
+        while True:
+            p += step
+            if not mask[p]:
+                return None
+            if p in goals:
+                return p
+            if dc:
+                # Forced Neighbor above / below
+                if (mask[p - width] and not mask[p - width - dc]) or \
+                   (mask[p + width] and not mask[p + width - dc]):
+                    return p
+            else:
+                # Forced Neighbor left / right
+                if (mask[p - 1] and not mask[p - 1 - step]) or \
+                   (mask[p + 1] and not mask[p + 1 - step]):
+                    return p
+                if not self.octile and \
+                   (self._jump_straight(p, 0, 1) is not None or
+                    self._jump_straight(p, 0, -1) is not None):
+                    return p
+
+
+    def _get_direction(self, p_from, p_to):
+        """
+        =======================================================================
+         Description: Return the unit Direction (dr, dc) between two Nodes.
+        =======================================================================
+        """
+        row_from, col_from = divmod(p_from, self._width)
+        row_to, col_to = divmod(p_to, self._width)
+        return (row_to > row_from) - (row_to < row_from), \
+               (col_to > col_from) - (col_to < col_from)
+
+
+    def _get_step(self, p_from, p_to):
+        """
+        =======================================================================
+         Description: Return the Index Step from a Node toward the other.
+        =======================================================================
+        """
+        dr, dc = self._get_direction(p_from, p_to)
+        return dr * self._width + dc
+
+
+    def _get_distance(self, p_from, p_to):
+        """
+        =======================================================================
+         Description: Return Octile / Manhattan Distance between Nodes.
+        =======================================================================
+        """
+        row_from, col_from = divmod(p_from, self._width)
+        row_to, col_to = divmod(p_to, self._width)
+        d_row = abs(row_from - row_to)
+        d_col = abs(col_from - col_to)
+        if self.octile:
+            return max(d_row, d_col) + (u_grid_fast.SQRT_2 - 1) * min(d_row,
+                                                                      d_col)
+        return d_row + d_col
+
+
+    def _to_padded(self, idd):
+        row, col = divmod(idd, self._cols)
+        return (row + 1) * self._width + col + 1
+
+
+    def _to_idd(self, p):
+        row, col = divmod(p, self._width)
+        return (row - 1) * self._cols + col - 1
+
+
+class JPS(KJPS):
+    """
+    ===========================================================================
+     Description: Jump Point Search (AStar's Contract).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_path() -> list of int (List of Node'd Id, Optimal Path to Goal).
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, start, goal, octile=False, heap=Heap,
+                 stats=None, components=None):
+        """
+        =======================================================================
+         Description: JPS Algorithm (runs on Construction).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start's Id).
+            3. goal : int (Goal's Id).
+            4. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            5. heap : class (Priority Queue of (key, idd) Items).
+            6. stats : Stats (Search Statistics to populate, None to skip).
+            7. components : Components (Grid's Index, cached one on None).
+        =======================================================================
+        """
+        super().__init__(grid, start, [goal], octile, heap, stats,
+                         components)
+        self.goal = goal
+        self.run()
+
+
+    def get_path(self):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Return: list of int (Full Cell Sequence, Empty List on No-Solution).
+        =======================================================================
+        """
+        return super().get_path(self.goal)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_random
+    import u_grid
+
+    import c_neighbors
+    from c_astar import AStar
+
+
+    def is_valid(grid, path, octile):
+
+        neighbors = c_neighbors.get_neighbors(grid, octile)
+        return all(idd_2 in neighbors.get(idd_1)
+                   for idd_1, idd_2 in zip(path, path[1:]))
+
+
+    def tester_run():
+
+        p0 = True
+        p1 = True
+        for i in range(1000):
+            n = u_random.get_random_int(5,12)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if len(idds_valid) < 2: continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            for octile in (False, True):
+                path_test = JPS(grid,start,goal,octile).get_path()
+                path_true = AStar(grid,start,goal,octile=octile).get_path()
+                cost_test = u_grid_fast.get_path_cost(grid,path_test,octile)
+                cost_true = u_grid_fast.get_path_cost(grid,path_true,octile)
+                p0 = cost_test == cost_true or \
+                     abs(cost_test - cost_true) < 1e-9
+                p1 = not path_test or (path_test[0] == start and
+                                       path_test[-1] == goal and
+                                       is_valid(grid, path_test, octile))
+                if not (p0 and p1): break
+            if not (p0 and p1): break
+
+        u_tester.run([p0,p1])
+
+
+    def tester_kjps():
+
+        from c_kastar import KAStar
+
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(12, 25)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:6]
+            for octile in (False, True):
+                kjps = KJPS(grid, start, goals, octile)
+                kjps.run()
+                kastar = KAStar(grid, start, goals, octile=octile)
+                kastar.run()
+                for goal in goals:
+                    path = kjps.get_path(goal)
+                    cost_test = u_grid_fast.get_path_cost(grid, path, octile)
+                    cost_true = u_grid_fast.get_path_cost(grid,
+                                            kastar.get_path(goal), octile)
+                    p0 = cost_test == cost_true or \
+                         abs(cost_test - cost_true) < 1e-9
+                    p0 = p0 and is_valid(grid, path, octile)
+                    if not p0: break
+                if not p0: break
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    def tester_start_is_goal():
+
+        grid = u_grid.gen_symmetric_grid(4)
+        p0 = JPS(grid, 5, 5).get_path() == [5]
+        p1 = JPS(grid, 0, 15, octile=True).get_path() == [0, 5, 10, 15]
+
+        u_tester.run([p0,p1])
+
+
+    def tester_stats():
+
+        from c_stats import Stats
+
+        p0 = True
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(12, 20)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            stats = Stats()
+            kjps = KJPS(grid, idds[0], idds[1:4], stats=stats,
+                        octile=random.random() < 0.5)
+            kjps.run()
+            len_closed = kjps._state.count(CLOSED)
+            p0 = stats.expanded <= len_closed
+            p0 = p0 and stats.peak_closed == stats.expanded
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_run()
+    tester_kjps()
+    tester_start_is_goal()
+    tester_stats()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -3,14 +3,80 @@ sys.path.append('D:\\MyPy\\f_grid')
 sys.path.append('D:\\MyPy\\f_utils')
 
 import u_grid
-import u_set
+import u_grid_fast
 from c_node import Node
 from c_opened import Opened
+from c_closed import Closed
+from c_dijkstra import Dijkstra
+import c_neighbors
+import c_components
+
+import numpy as np
+
+
+STRATEGIES = ('auto', 'astar', 'dijkstra')
+
+# Cost Model of the 'auto' Strategy (see _get_strategy), measured on
+# ost000a (969x487). Times in us, keyed by octile (the Sweep is c_bfs'
+# vectorized BFS when 4-Connected, the Flat-Buffer Dijkstra when Octile).
+SWEEP_FIXED = {False: 620, True: 1120}      # Buffers over the whole Grid
+SWEEP_CELL = {False: 0.21, True: 3.4}       # per labeled Cell
+SWEEP_LEVEL = {False: 34, True: 7.3}        # per Unit of Distance
+KASTAR_FIXED = {False: 310, True: 360}
+KASTAR_NODE = {False: 38, True: 58}         # per Expansion
+KASTAR_GOAL = {False: 0.13, True: 0.38}     # per Expansion and Active Goal
+RATIO_ONE = {False: 0.08, True: 0.12}       # KA* / Sweep Cells, one Goal
+RATIO_DECAY = {False: 0.125, True: 0.1}     # (1 - Ratio) ~ k_eff ** -DECAY
+DENSITY = {False: 1.44, True: 2.0}          # Sweep Cells ~ DENSITY * d ** 2
+
 
 class KAStar:
+    """
+    ===========================================================================
+     Description: KA* (one Search from Start toward many Goals).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. run() -> [Run the Search].
+
+        2. get_path(goal) -> list of int [Path to the Goal, Empty List on
+                                            No-Solution].
+
+        3. improve(epsilon) -> dict [Search again with a lower epsilon
+                                        (reusing the State), Return bounds].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. epsilon : float (Weight of h, f = g + epsilon * min-h).
+        2. bounds : dict (Goal -> bound, the Path's Cost <= bound * Optimal
+                            Cost, for the reached Goals).
+        3. strategy_used : str ('astar' or 'dijkstra', set by run()).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. epsilon > 1 is Weighted KA*: every Goal's Path costs at most
+            epsilon times its Optimal one (min-h is admissible toward each
+            Active Goal). Closed Nodes are not re-opened, a cheaper g
+            found for one is kept aside (INCONS).
+        2. improve() is the ARA* Step over all the Goals: Opened, INCONS
+            and the reached Goals are re-keyed with the lower epsilon, all
+            the Goals are active again and the Search resumes with the g
+            of the previous Steps.
+        3. bound of a Goal = min(epsilon, g(Goal) / min(g + h(Goal) over
+            Opened, INCONS and the reached Goals)), the min is a Lower
+            Bound of the Goal's Optimal Cost.
+        4. The 'dijkstra' Strategy runs c_dijkstra.Dijkstra (no h), its
+            Paths are optimal at any epsilon ('auto' keeps KA* when
+            epsilon > 1). get_path() keeps its Contract (optimal Cost,
+            Start..Goal, Empty List on No-Solution), but among the
+            equal-cost Paths the Sweep may return another one than KA*.
+    ===========================================================================
+    """
     
     
-    def __init__(self, grid, start, goals):
+    def __init__(self, grid, start, goals, neighbors=None, type_opened=Opened,
+                 octile=False, stats=None, landmarks=None, components=None,
+                 strategy='auto', epsilon=1):
         """
         =======================================================================
          Description: KA* Algorithm.
@@ -20,12 +86,67 @@ class KAStar:
             1. grid : Grid.
             2. start : int (Start Idd).
             3. goals : set of int (Goal Idd).
+            4. neighbors : Neighbors (Grid's Table, cached one on None).
+            5. type_opened : class (Opened or Opened_Buckets).
+            6. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            7. stats : Stats (Search Statistics to populate, None to skip).
+            8. landmarks : Landmarks (ALT Heuristic, max(Manhattan / Octile,
+                            Landmark Bound), None to skip).
+            9. components : Components (Grid's Index, cached one on None).
+            10. strategy : str ('astar' for KA*, 'dijkstra' for a
+                            Uniform-Cost Sweep without Heuristic, 'auto'
+                            (default) to choose by the Goals' Distance,
+                            Count and Spread).
+            11. epsilon : float (Weight of h >= 1, 1 for Optimal KA*).
         =======================================================================
         """  
+        if strategy not in STRATEGIES:
+            raise ValueError('strategy must be one of {0}'.format(STRATEGIES))
+        if epsilon < 1:
+            raise ValueError('epsilon must be >= 1 (got {0})'.format(epsilon))
         self.start = start
         self.goals = goals
         self.grid = grid
+        self.octile = octile
+        self.stats = stats
+        if landmarks is not None and landmarks.octile != octile:
+            raise ValueError('landmarks were built with octile={0}'.format(
+                                                        landmarks.octile))
+        self.landmarks = landmarks
+        if neighbors is None:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+        self.neighbors = neighbors
+        if components is None:
+            components = c_components.get_components(grid)
+        self.components = components
+        self.type_opened = type_opened
+        self.strategy = strategy
+        self.strategy_used = None
+        self._dijkstra = None
+        self.epsilon = epsilon
+        self.bounds = dict()
         self.counter_h = 0
+        self.goals_active = set()
+        
+    
+    @property
+    def goals_active(self):
+        return self._goals_active
+    
+    
+    @goals_active.setter
+    def goals_active(self, goals):
+        """
+        =======================================================================
+         Description: Set the Active Goals (and their Rows/Cols Arrays for
+                        the vectorized Heuristic).
+        =======================================================================
+        """
+        self._goals_active = set(goals)
+        self._idds_goals = list(self._goals_active)
+        self._rows_goals, self._cols_goals = u_grid_fast.to_rows_cols(
+                                                self.grid, self._idds_goals)
         
     
     def run(self):
@@ -36,24 +157,154 @@ class KAStar:
         """
         if not (self.start or self.goals): return
         
-        self.goals_active = set(self.goals) 
-        self.closed = set()                     
-        self.opened = Opened()
+        stats = self.stats
+        type_opened = self.type_opened
+        if stats:
+            t = stats.clock()
+            type_opened = stats.get_type_opened(type_opened)
+        # Goals in another Component are never searched for (No-Solution)
+        self._goals_reachable = {goal for goal in self.goals
+                                 if self.components.is_connected(self.start,
+                                                                 goal)}
+        self.goals_active = self._goals_reachable
+        self.strategy_used = self._get_strategy()
+        if stats:
+            stats.strategy(self.strategy_used)
+        if self.strategy_used == 'dijkstra':
+            # Dijkstra counts its own Time (run() stops the Clock here)
+            if stats:
+                stats.time_run += stats.clock() - t
+            self._dijkstra = Dijkstra(self.grid, self.start,
+                                      self._goals_reachable, self.neighbors,
+                                      self.octile, stats, self.components)
+            self._dijkstra.run()
+            self.goals_active = set()
+            self.bounds = self._get_bounds()
+            return
+        self._type_opened = type_opened
+        self.closed = Closed()
+        self.opened = type_opened()
         self.counter_h = 0
+        # Closed Nodes whose g was improved (Weighted KA* does not re-open)
+        self.incons = dict()
+        # Nodes closed in the previous improve() Steps, by Idd
+        self._visited = dict()
                
         self.best = Node(self.start)
         self._update_node(self.best,g=0)        
         self.opened.push(self.best)   
         
+        self._run()
+        self.bounds = self._get_bounds()
+        if stats:
+            stats.time_run += stats.clock() - t
+            
+            
+    def improve(self, epsilon):
+        """
+        =======================================================================
+         Description: Search again with a lower epsilon, reusing the g of
+                        the previous Steps (ARA* over all the Goals).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. epsilon : float (New Weight of h, 1 <= epsilon <= current).
+        =======================================================================
+         Return: dict (Goal -> New bound of its Path, see bounds).
+        =======================================================================
+        """
+        if not 1 <= epsilon <= self.epsilon:
+            raise ValueError('epsilon must be in [1, {0}] (got {1})'.format(
+                                                        self.epsilon, epsilon))
+        self.epsilon = epsilon
+        if self.strategy_used != 'astar':
+            self.bounds = self._get_bounds()
+            return self.bounds
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        for node in self.closed.get_nodes():
+            self._visited[node.idd] = node
+        nodes = self.opened.get_nodes().union(self.incons.values())
+        # The reached Goals are re-found once no Key is below their g
+        nodes.update(self._visited[goal] for goal in self._goals_reachable
+                     if goal in self._visited)
+        nodes = list(nodes)
+        self.goals_active = self._goals_reachable
+        hs, goals = self._get_min_h_batch([node.idd for node in nodes])
+        for node, h, goal in zip(nodes, hs, goals):
+            node.h = h
+            node.goal = goal
+            node.f = node.g + epsilon * h
+        self.incons = dict()
+        self.closed = Closed()
+        self.opened = self._type_opened()
+        for node in nodes:
+            self.opened.push(node)
+        self._run()
+        self.bounds = self._get_bounds()
+        if stats:
+            stats.time_run += stats.clock() - t
+        return self.bounds
+            
+            
+    def _run(self):
+        """
+        =======================================================================
+         Description: Expand until all the Active Goals are closed.
+        =======================================================================
+        """
+        stats = self.stats
         while (self.goals_active and not self.opened.is_empty()):
-            self.best = self.opened.pop()
+            self.best = self._pop_best()
             self.closed.add(self.best)
             if (self.best.idd in self.goals_active):
-                self.goals_active.remove(self.best.idd)
+                self.goals_active = self.goals_active - {self.best.idd}
+                if stats:
+                    stats.goal_found(self.best.idd, self.best.g)
                 if not self.goals_active: 
-                    return
-                self._update_opened()     
+                    break
             self._expand_best()
+            if stats:
+                stats.expand(self.best.idd, self.best.g, len(self.opened),
+                             len(self.closed))
+            
+            
+    def _get_bounds(self):
+        """
+        =======================================================================
+         Description: Return the Suboptimality Bounds of the reached Goals.
+        =======================================================================
+         Return: dict (Goal -> float).
+        =======================================================================
+        """
+        if self.strategy_used == 'dijkstra':
+            return {goal: 1.0 for goal in self._goals_reachable
+                    if self._dijkstra.get_distance(goal) >= 0}
+        reached = [self.closed.get(Node(goal)) for goal in
+                   self._goals_reachable]
+        reached = [node for node in reached if node is not None]
+        if self.epsilon == 1:
+            return {node.idd: 1.0 for node in reached}
+        # The last Goal is closed but not expanded, so it joins the Lower
+        # Bound's Nodes (the reached Goals are harmless there)
+        nodes = self.opened.get_nodes().union(self.incons.values(), reached)
+        idds = [node.idd for node in nodes]
+        gs = np.array([node.g for node in nodes])
+        rows, cols = u_grid_fast.to_rows_cols(self.grid, idds)
+        bounds = dict()
+        for node in reached:
+            row, col = u_grid.to_row_col(self.grid, node.idd)
+            distances = u_grid_fast.get_distances(rows, cols, np.array([row]),
+                                                  np.array([col]),
+                                                  self.octile)[:, 0]
+            lower = float((gs + distances).min())
+            if lower <= 0:
+                bounds[node.idd] = 1.0
+            else:
+                bounds[node.idd] = max(1.0, min(self.epsilon,
+                                                node.g / lower))
+        return bounds
             
             
     def get_path(self, goal):
@@ -68,7 +319,9 @@ class KAStar:
          Return: list of Node (Empty List on No-Solution).
         =======================================================================
         """            
-        node = u_set.get(self.closed, Node(goal))
+        if self.strategy_used == 'dijkstra':
+            return self._dijkstra.get_path(goal)
+        node = self.closed.get(Node(goal))
         if not node: return list()
         path = [node.idd]
         while (node.idd != self.start):
@@ -78,15 +331,106 @@ class KAStar:
         return path
             
             
-    def _update_opened(self):
+    def _get_strategy(self):
         """
         =======================================================================
-         Description: Update h of Opened Nodes (after removing active goal).
+         Description: Return the Strategy of the Run ('astar' or 'dijkstra').
         =======================================================================
+         Notes:
+        -----------------------------------------------------------------------
+            1. 'auto' estimates both Times from the Active Goals:
+                - d = max Distance (Manhattan / Octile) Start -> Goal, the
+                    Sweep labels cells = DENSITY * d ** 2 Cells (at most
+                    the Grid's Size) and stops on the farthest Goal.
+                - spread = 1 - |Mean of the Unit Vectors Start -> Goal|
+                    (0 when all the Goals lie in one Direction).
+                - k_eff = 1 + (k - 1) * spread (Goals in one Direction are
+                    guided almost like a single one).
+                - KA* expands a Ratio of the Sweep's Cells,
+                    1 - (1 - RATIO_ONE) * k_eff ** -RATIO_DECAY (at least
+                    d + 1), each at KASTAR_NODE + KASTAR_GOAL * k.
+            2. The Sweep's per-Cell Cost is 10-180x lower than a KA*
+                Expansion, so KA* is kept only on short Queries, where the
+                Sweep's fixed Cost over the whole Grid dominates.
+        =======================================================================
+         Return: str.
+        =======================================================================
+        """
+        if self.strategy != 'auto':
+            return self.strategy
+        if self.epsilon > 1:
+            return 'astar'
+        k = len(self._goals_active)
+        if not k:
+            return 'astar'
+        octile = self.octile
+        row, col = u_grid.to_row_col(self.grid, self.start)
+        d_rows = self._rows_goals - row
+        d_cols = self._cols_goals - col
+        norms = np.hypot(d_rows, d_cols)
+        far = norms > 0
+        if not far.any():
+            return 'astar'
+        mean_row = (d_rows[far] / norms[far]).sum() / k
+        mean_col = (d_cols[far] / norms[far]).sum() / k
+        spread = 1 - float(np.hypot(mean_row, mean_col))
+        k_eff = 1 + (k - 1) * spread
+        distance = float(u_grid_fast.get_distances(np.array([row]),
+                                                   np.array([col]),
+                                                   self._rows_goals,
+                                                   self._cols_goals,
+                                                   octile).max())
+        cells = min(DENSITY[octile] * distance ** 2 + 1, self.grid.size)
+        ratio = 1 - (1 - RATIO_ONE[octile]) * k_eff ** -RATIO_DECAY[octile]
+        nodes = max(distance + 1, ratio * cells)
+        cost_sweep = SWEEP_FIXED[octile] + SWEEP_CELL[octile] * cells + \
+                     SWEEP_LEVEL[octile] * distance
+        cost_kastar = KASTAR_FIXED[octile] + nodes * (KASTAR_NODE[octile] +
+                                                      KASTAR_GOAL[octile] * k)
+        if cost_kastar > cost_sweep:
+            return 'dijkstra'
+        return 'astar'
+
+
+    def _pop_best(self):
         """
-        for node in self.opened.get_nodes():
+        =======================================================================
+         Description: Pop the Best Node from Opened (lazy re-keying).
+        =======================================================================
+         Notes:
+        -----------------------------------------------------------------------
+            1. Only the Nodes whose nearest Goal was reached have out-of-date
+                h. Removing a Goal can only increase h, so an out-of-date Node
+                surfaces no later than its true Key would. It is re-keyed and
+                pushed back once it reaches the top, which gives the same
+                Expansion Order as re-keying the whole Opened.
+        =======================================================================
+         Return: Node.
+        =======================================================================
+        """
+        while True:
+            node = self.opened.pop()
+            if node.goal in self.goals_active:
+                return node
             node.h = self._get_min_h(node)
-            node.f = node.g + node.h
+            node.f = node.g + self.epsilon * node.h
+            self.opened.push(node)
+            
+            
+    def _update_opened(self):
+        """
+        =======================================================================
+         Description: Update h of Opened Nodes whose nearest Goal is not
+                        Active anymore (eager variant of _pop_best re-keying).
+        =======================================================================
+        """
+        nodes = [node for node in self.opened.get_nodes()
+                 if node.goal not in self.goals_active]
+        hs, goals = self._get_min_h_batch([node.idd for node in nodes])
+        for node, h, goal in zip(nodes, hs, goals):
+            node.h = h
+            node.goal = goal
+            node.f = node.g + self.epsilon * node.h
             
         
     def _expand_best(self):   
@@ -95,21 +439,70 @@ class KAStar:
          Description: Expand the Best Node's Children.
         ===================================================================
         """     
-        row, col = u_grid.to_row_col(self.grid, self.best.idd)
-        idds = u_grid.get_neighbors(self.grid, row, col)
-        children = {Node(x) for x in idds} - self.closed      
-        for child in sorted(children):
-            if self.opened.contains(child):
-                child = self.opened.get(child)
-            g_new = self.best.g + child.w
+        best = self.best
+        closed, opened = self.closed, self.opened
+        neighbors = self.neighbors
+        idds, costs = neighbors.idds, neighbors.costs
+        stats = self.stats
+        improved = list()
+        w = 1
+        # Table's Order (Keys are unique, so the Push Order does not matter)
+        for i in range(neighbors.offsets[best.idd],
+                       neighbors.offsets[best.idd+1]):
+            x = idds[i]
+            if costs is not None:
+                w = costs[i]
+            if closed.contains_idd(x):
+                if self.epsilon > 1:
+                    self._update_incons(x, w)
+                continue
+            g_new = best.g + w
+            child = opened.get_idd(x)
+            is_opened = child is not None
+            if not is_opened:
+                child = self._visited.get(x) or Node(x)
             # Already in Opened with best g 
             if child.g <= g_new:
                 continue
-            self._update_node(child, g_new)
+            improved.append((child, g_new))
+            if not stats:
+                continue
+            if is_opened:
+                stats.reopened += 1
+            else:
+                stats.generated += 1
+        if not improved:
+            return
+        hs, goals = self._get_min_h_batch([child.idd for child, g_new in improved])
+        for (child, g_new), h, goal in zip(improved, hs, goals):
+            child.goal = goal
+            self._update_node(child, g_new, h)
             self.opened.push(child)
             
             
-    def _update_node(self, node, g):
+    def _update_incons(self, idd, w):
+        """
+        =======================================================================
+         Description: Keep a cheaper g of a Closed Node (to re-open it on
+                        the next improve()).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Closed Node's Id).
+            2. w : float (Cost of the Move from the Best Node).
+        =======================================================================
+        """
+        node = self.closed.get(Node(idd))
+        g_new = self.best.g + w
+        if node.g <= g_new:
+            return
+        node.father = self.best
+        node.g = g_new
+        node.f = g_new + self.epsilon * node.h
+        self.incons[idd] = node
+            
+            
+    def _update_node(self, node, g, h=None):
         """
         =======================================================================
          Description: Update Node.
@@ -118,19 +511,23 @@ class KAStar:
         -----------------------------------------------------------------------
             1. node : Node (Node to update).
             2. g : int
+            3. h : int (Calculated toward the Active Goals on None).
         =======================================================================
         """
         if not node == self.best:
             node.father = self.best
         node.g = g
-        node.h = self._get_min_h(node)
-        node.f = node.g + node.h
+        if h is None:
+            h = self._get_min_h(node)
+        node.h = h
+        node.f = node.g + self.epsilon * node.h
 
 
     def _get_min_h(self, node):
         """
         =======================================================================
-         Description: Calc h toward the Active Goals and Return the Minimum.
+         Description: Calc h toward the Active Goals and Return the Minimum
+                        (the nearest Goal is stored in node.goal).
         =======================================================================
          Arguments:
         -----------------------------------------------------------------------
@@ -139,10 +536,64 @@ class KAStar:
          Return: float (Minimum h toward the Active Goals).
         =======================================================================
         """
-        h = float('Infinity')
-        for goal in self.goals_active:
-            h = min(h, self._get_manhattan_distance(node,goal))
-        return h
+        if not self.goals_active:
+            node.goal = None
+            return float('Infinity')
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        row, col = u_grid.to_row_col(self.grid, node.idd)
+        self.counter_h += len(self.goals_active)
+        d_rows = np.abs(self._rows_goals - row)
+        d_cols = np.abs(self._cols_goals - col)
+        if self.octile:
+            distances = np.maximum(d_rows, d_cols)
+            distances = distances + (u_grid_fast.SQRT_2 - 1) * np.minimum(
+                                                            d_rows, d_cols)
+        else:
+            distances = d_rows + d_cols
+        if self.landmarks is not None:
+            distances = np.maximum(distances, self.landmarks.get_bounds(
+                                        [node.idd], self._idds_goals)[0])
+        nearest = int(distances.argmin())
+        node.goal = self._idds_goals[nearest]
+        if stats:
+            stats.time_h += stats.clock() - t
+            stats.counter_h += 1
+        return distances[nearest].item()
+    
+    
+    def _get_min_h_batch(self, idds):
+        """
+        =======================================================================
+         Description: Calc h toward the Active Goals for a Batch of Nodes.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : list of int (Nodes' Ids).
+        =======================================================================
+         Return: tuple (list of int (Minimum h toward the Active Goals per
+                        Node), list of int (the nearest Goal per Node)).
+        =======================================================================
+        """
+        if not self.goals_active:
+            return [float('Infinity')] * len(idds), [None] * len(idds)
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        self.counter_h += len(idds) * len(self.goals_active)
+        rows, cols = u_grid_fast.to_rows_cols(self.grid, idds)
+        distances = u_grid_fast.get_distances(rows, cols, self._rows_goals,
+                                              self._cols_goals, self.octile)
+        if self.landmarks is not None:
+            distances = np.maximum(distances, self.landmarks.get_bounds(
+                                                    idds, self._idds_goals))
+        hs, nearest = u_grid_fast.get_nearest(distances)
+        hs, goals = hs.tolist(), [self._idds_goals[i] for i in nearest]
+        if stats:
+            stats.time_h += stats.clock() - t
+            stats.counter_h += len(idds)
+        return hs, goals
         
     
     def _get_manhattan_distance(self, node, goal):
@@ -206,6 +657,26 @@ def tester():
         u_tester.run([p0])
         
         
+    def tester_get_min_h_batch():
+        
+        grid = u_grid.gen_obstacles_grid(8, 20)
+        idds = u_grid.get_valid_idds(grid)
+        random.shuffle(idds)
+        kastar = KAStar(grid, idds[0], idds[1:6])
+        kastar.goals_active = idds[1:6]
+        h_test, goals_test = kastar._get_min_h_batch(idds)
+        nodes = [Node(idd) for idd in idds]
+        h_true = [kastar._get_min_h(node) for node in nodes]
+        p0 = h_test == h_true
+        p1 = True
+        for node, h, goal in zip(nodes, h_true, goals_test):
+            p1 = u_grid.manhattan_distance(grid, node.idd, goal) == h
+            p1 = p1 and node.goal in kastar.goals_active
+            if not p1: break
+        
+        u_tester.run([p0,p1])
+        
+        
     def tester_update_node():
         
         grid = u_grid.gen_symmetric_grid(3)
@@ -351,13 +822,240 @@ def tester():
         else:
             print('Failed: {0}'.format(fname))  
     
+    def tester_type_opened():
+        
+        from c_opened_buckets import Opened_Buckets
+        
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10, 20)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:6]
+            kastar = KAStar(grid, start, goals)
+            kastar.run()
+            kastar_buckets = KAStar(grid, start, goals,
+                                    type_opened=Opened_Buckets)
+            kastar_buckets.run()
+            for goal in goals:
+                p0 = kastar.get_path(goal) == kastar_buckets.get_path(goal)
+                if not p0: break
+            if not p0: break
+            
+        u_tester.run([p0])
+        
+    
+    def tester_octile():
+        
+        from c_astar import AStar
+        
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10, 20)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:6]
+            kastar = KAStar(grid, start, goals, octile=True)
+            kastar.run()
+            for goal in goals:
+                path_test = kastar.get_path(goal)
+                path_true = AStar(grid, start, goal, octile=True).get_path()
+                cost_test = u_grid_fast.get_path_cost(grid, path_test, True)
+                cost_true = u_grid_fast.get_path_cost(grid, path_true, True)
+                p0 = abs(cost_test - cost_true) < 1e-9 or cost_test == cost_true
+                if not p0: break
+            if not p0: break
+            
+        u_tester.run([p0])
+        
+    
+    def tester_stats():
+        
+        from c_stats import Stats
+        
+        p0 = True
+        p1 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10, 20)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:6]
+            found = list()
+            stats = Stats(timing=True,
+                          on_goal_found=lambda idd, g: found.append(idd))
+            kastar = KAStar(grid, start, goals, stats=stats)
+            kastar.run()
+            kastar_true = KAStar(grid, start, goals)
+            kastar_true.run()
+            for goal in goals:
+                p0 = kastar.get_path(goal) == kastar_true.get_path(goal)
+                if not p0: break
+            p1 = sorted(found) == sorted(goal for goal in goals
+                                         if kastar.get_path(goal))
+            if kastar.strategy_used == 'astar':
+                p1 = p1 and stats.expanded <= len(kastar.closed)
+                p1 = p1 and stats.peak_closed <= len(kastar.closed)
+                p1 = p1 and stats.counter_h >= stats.generated
+            else:
+                p1 = p1 and stats.counter_h == 0 and stats.expanded > 0
+            if not (p0 and p1): break
+            
+        u_tester.run([p0,p1])
+        
+    
+    def tester_landmarks():
+        
+        from c_landmarks import Landmarks
+        
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10, 20)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:6]
+            for octile in (False, True):
+                landmarks = Landmarks(grid, 4, octile)
+                kastar = KAStar(grid, start, goals, octile=octile,
+                                landmarks=landmarks)
+                kastar.run()
+                kastar_true = KAStar(grid, start, goals, octile=octile)
+                kastar_true.run()
+                for goal in goals:
+                    cost_test = u_grid_fast.get_path_cost(grid,
+                                        kastar.get_path(goal), octile)
+                    cost_true = u_grid_fast.get_path_cost(grid,
+                                        kastar_true.get_path(goal), octile)
+                    p0 = cost_test == cost_true or \
+                         abs(cost_test - cost_true) < 1e-9
+                    if not p0: break
+                if not p0: break
+            if not p0: break
+            
+        u_tester.run([p0])
+        
+    
+    def tester_strategy():
+        
+        from c_stats import Stats
+        
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10, 20)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:8]
+            octile = random.random() < 0.5
+            kastars = [KAStar(grid, start, goals, octile=octile,
+                              strategy=strategy)
+                       for strategy in ('astar', 'dijkstra', 'auto')]
+            for kastar in kastars:
+                kastar.run()
+            for goal in goals:
+                paths = [kastar.get_path(goal) for kastar in kastars]
+                costs = [u_grid_fast.get_path_cost(grid, path, octile)
+                         for path in paths]
+                p0 = all(bool(path) == bool(paths[0]) for path in paths)
+                if paths[0]:
+                    p0 = p0 and all(path[0] == start and path[-1] == goal
+                                    for path in paths)
+                    p0 = p0 and max(costs) - min(costs) < 1e-9
+                if not p0: break
+            if not p0: break
+        
+        # 8 Goals all around the Center -> Sweep, 1 near Goal -> KA*
+        grid = u_grid.gen_symmetric_grid(21)
+        goals = [u_grid.to_idd(grid, row, col) for row in (0, 10, 20)
+                 for col in (0, 10, 20) if (row, col) != (10, 10)]
+        center = u_grid.to_idd(grid, 10, 10)
+        stats = Stats()
+        kastar = KAStar(grid, center, goals, stats=stats)
+        kastar.run()
+        p1 = kastar.strategy_used == 'dijkstra' and kastar.counter_h == 0
+        p1 = p1 and all(len(kastar.get_path(goal)) ==
+                        u_grid.manhattan_distance(grid, center, goal) + 1
+                        for goal in goals)
+        kastar = KAStar(grid, center, [center + 2], stats=stats)
+        kastar.run()
+        p1 = p1 and kastar.strategy_used == 'astar'
+        p1 = p1 and stats.strategies == {'dijkstra': 1, 'astar': 1}
+        p1 = p1 and stats.to_dict()['strategies'] == stats.strategies
+        
+        try:
+            KAStar(grid, center, goals, strategy='bfs')
+            p2 = False
+        except ValueError:
+            p2 = True
+        
+        u_tester.run([p0,p1,p2])
+        
+    
+    def tester_epsilon():
+        
+        from c_astar_flat import AStar_Flat
+        
+        p0 = True
+        for i in range(200):
+            grid = u_grid.gen_obstacles_grid(15, 30)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:6]
+            octile = random.random() < 0.5
+            costs_true = {goal: u_grid_fast.get_path_cost(grid,
+                                AStar_Flat(grid, start, goal,
+                                           octile=octile).get_path(), octile)
+                          for goal in goals}
+            kastar = KAStar(grid, start, goals, octile=octile, epsilon=3)
+            kastar.run()
+            for epsilon in (3, 2, 1.5, 1):
+                if epsilon < 3:
+                    kastar.improve(epsilon)
+                for goal in goals:
+                    path = kastar.get_path(goal)
+                    p0 = bool(path) == (goal in kastar.bounds)
+                    if path:
+                        cost = u_grid_fast.get_path_cost(grid, path, octile)
+                        bound = kastar.bounds[goal]
+                        p0 = p0 and path[0] == start and path[-1] == goal
+                        p0 = p0 and 1 <= bound <= epsilon
+                        p0 = p0 and cost <= bound * costs_true[goal] + 1e-9
+                    if not p0: break
+                if not p0: break
+            if not p0: break
+        
+        # Sweep and auto Strategy are exact, auto keeps KA* when weighted
+        grid = u_grid.gen_symmetric_grid(9)
+        kastar = KAStar(grid, 40, [0, 8, 72, 80], strategy='dijkstra',
+                        epsilon=2)
+        kastar.run()
+        p1 = set(kastar.bounds.values()) == {1.0}
+        p1 = p1 and kastar.improve(1.5) == kastar.bounds
+        kastar = KAStar(grid, 40, [0, 8, 72, 80], epsilon=2)
+        kastar.run()
+        p1 = p1 and kastar.strategy_used == 'astar'
+        
+        u_tester.run([p0,p1])
+        
+    
     u_tester.print_start(__file__)
     tester_get_manhattan_distance()
     tester_get_min_h()
+    tester_get_min_h_batch()
     tester_update_node()
     tester_expand_best()
     tester_update_opened()
     tester_run()
+    tester_type_opened()
+    tester_octile()
+    tester_stats()
+    tester_landmarks()
+    tester_strategy()
+    tester_epsilon()
     u_tester.print_finish(__file__)       
     
     
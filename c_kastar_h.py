@@ -5,41 +5,74 @@ sys.path.append(path_parent + '\\f_utils')
 sys.path.append(path_parent + '\\f_grid')
 
 from c_astar_h import AStar_H
+from c_opened import Opened
+from c_closed import Closed
+import c_neighbors
+import c_components
 import u_grid
-import u_set
+import u_grid_fast
 
 class KAStar_H:
     """
     ===========================================================================
      Description: KA* with Heuristic Improvements.
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. All the Goal Phases resume the same Opened and Closed in-place
+            (no copies). Only the h/f of the Opened Nodes are re-keyed
+            toward the next Goal between the Phases.
+        2. Goals in another Component than Start are skipped without a
+            Search (has_solution is False, the other Paths are found).
     ===========================================================================
     """
     
-    def __init__(self, grid, start, goals):
+    def __init__(self, grid, start, goals, type_opened=Opened, octile=False,
+                 stats=None, components=None):
        self.grid = grid
        self.start = start
        self.goals = goals
+       self.octile = octile
+       self.stats = stats
+       self.neighbors = c_neighbors.get_neighbors(grid, octile)
+       if components is None:
+           components = c_components.get_components(grid)
+       self.components = components
        
        self.counter_h = 0
        self.paths = dict()
-       self.opened = set()
-       self.closed = set()
+       if stats:
+           type_opened = stats.get_type_opened(type_opened)
+       self.opened = type_opened()
+       self.closed = Closed()
        self.has_solution = True
        
        
     def run(self):
+       stats = self.stats
+       if stats:
+           # The Phases' AStar_H add their own time_run, the total replaces it
+           time_run = stats.time_run
+           t = stats.clock()
        for goal in self._sorted_goals():
+           if not self.components.is_connected(self.start, goal):
+               self.has_solution = False
+               continue
            self._update_opened(goal)
-           self.counter_h += len(self.opened)
-           astar = AStar_H(self.grid, self.start, goal, self.opened, self.closed)
-           self.counter_h += len(astar.closed) - len(self.closed)
-           self.counter_h += len(astar.opened._opened) - len(self.opened)
+           len_opened = len(self.opened)
+           len_closed = len(self.closed)
+           self.counter_h += len_opened
+           astar = AStar_H(self.grid, self.start, goal, self.opened, self.closed,
+                           self.neighbors, octile=self.octile, stats=stats,
+                           components=self.components)
+           self.counter_h += len(self.closed) - len_closed
+           self.counter_h += len(self.opened) - len_opened
            if not astar.best:
                self.has_solution = False
                break
            self.paths[goal] = astar.get_path()
-           self.opened = astar.opened.get_nodes()
-           self.closed.update(astar.closed)
+       if stats:
+           stats.time_run = time_run + stats.clock() - t
            
 
     def get_path(self, goal):
@@ -56,8 +89,10 @@ class KAStar_H:
         """
         dic = dict()
         for goal in self.goals:
-            dic[goal] = u_grid.manhattan_distance(self.grid, self.start, goal)
+            dic[goal] = self._get_distance(self.start, goal)
             self.counter_h += 1
+        if self.stats:
+            self.stats.counter_h += len(dic)
         return [k for k, v in sorted(dic.items(), key=lambda item: item[1])]
     
     
@@ -71,9 +106,28 @@ class KAStar_H:
             1. goal : int (New Goal Id).
         =======================================================================
         """
-        for node in self.opened:
-            node.h = u_grid.manhattan_distance(self.grid, node.idd, goal)
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        nodes = self.opened.get_nodes()
+        for node in nodes:
+            node.h = self._get_distance(node.idd, goal)
             node.f = node.g + node.h    
+        if stats:
+            stats.time_h += stats.clock() - t
+            stats.counter_h += len(nodes)
+            
+            
+    def _get_distance(self, idd, goal):
+        """
+        =======================================================================
+         Description: Return Heuristic Distance between Node and Goal
+                        (Octile or Manhattan).
+        =======================================================================
+        """
+        if self.octile:
+            return u_grid_fast.octile_distance(self.grid, idd, goal)
+        return u_grid.manhattan_distance(self.grid, idd, goal)
     
     
 """
@@ -114,7 +168,7 @@ def tester():
         goal_new = 8
         kastar_h._update_opened(goal_new)
         p0 = True
-        for node in kastar_h.opened:
+        for node in kastar_h.opened.get_nodes():
             p0 = node.h == u_grid.manhattan_distance(grid,node.idd,goal_new)
             if not p0: break
         
@@ -144,7 +198,7 @@ def tester():
             f_max = 0
             for goal in goals:
                 node_goal = Node(goal)
-                node_goal = u_set.get(kastar_h.closed,node_goal)
+                node_goal = kastar_h.closed.get(node_goal)
                 f_max = max(f_max,node_goal.f)
             for node in kastar_h.closed:
                 if node.f > f_max:
@@ -162,10 +216,80 @@ def tester():
         u_tester.run([p0,p1])
         
         
+    def tester_octile():
+        
+        import random
+        from c_kastar import KAStar
+        
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10,30)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:4]
+            kastar = KAStar(grid, start, goals, octile=True)
+            kastar.run()
+            kastar_h = KAStar_H(grid, start, goals, octile=True)
+            kastar_h.run()
+            if not kastar_h.has_solution: continue
+            for goal in goals:
+                cost_test = u_grid_fast.get_path_cost(grid,
+                                        kastar_h.get_path(goal), True)
+                cost_true = u_grid_fast.get_path_cost(grid,
+                                        kastar.get_path(goal), True)
+                p0 = abs(cost_test - cost_true) < 1e-9
+                if not p0: break
+            if not p0: break
+            
+        u_tester.run([p0])
+        
+        
+    def tester_stats():
+        
+        import random
+        from c_stats import Stats
+        
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10,30)
+            idds = u_grid.get_valid_idds(grid)
+            random.shuffle(idds)
+            start = idds[0]
+            goals = idds[1:4]
+            found = list()
+            stats = Stats(timing=True,
+                          on_goal_found=lambda idd, g: found.append(idd))
+            kastar_h = KAStar_H(grid, start, goals, stats=stats)
+            kastar_h.run()
+            p0 = sorted(found) == sorted(kastar_h.paths)
+            p0 = p0 and stats.peak_closed == len(kastar_h.closed)
+            p0 = p0 and stats.time_h + stats.time_queue <= stats.time_run
+            if not p0: break
+            
+        u_tester.run([p0])
+        
+        
+    def tester_components():
+        
+        # Goal 5 is behind a Wall, Goals 2 and 12 are reachable
+        grid = u_grid.gen_symmetric_grid(6)
+        grid[:, 3] = -1
+        kastar_h = KAStar_H(grid, 0, [5, 2, 12])
+        kastar_h.run()
+        p0 = not kastar_h.has_solution
+        p1 = sorted(kastar_h.paths) == [2, 12]
+        
+        u_tester.run([p0,p1])
+        
+        
     u_tester.print_start(__file__)
     tester_sorted_goals()
     tester_update_opened()
     tester_run()
+    tester_octile()
+    tester_stats()
+    tester_components()
     u_tester.print_finish(__file__)
     
 
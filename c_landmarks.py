@@ -0,0 +1,357 @@
+from c_bfs import BFS
+import c_neighbors
+import u_grid_fast
+
+import heapq
+import os
+
+import numpy as np
+
+
+class Landmarks:
+    """
+    ===========================================================================
+     Description: ALT Heuristic (Landmarks + Triangle Inequality).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_bound(idd, goal) -> float [Landmark Lower Bound of the
+                                            Distance between the Nodes].
+
+        2. get_bounds(idds, goals) -> np.ndarray [Lower Bounds of every
+                                                    Node to every Goal].
+
+        3. save(path) -> [Save the Table into .npz File].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. landmarks : list of int (Landmarks' Idds).
+        2. table : np.ndarray (size, L). Distance of every Cell from every
+                    Landmark (int32 on 4-Connected, float64 on Octile),
+                    -1 on Unreachable.
+        3. octile : bool (Octile Distances, 4-Connected BFS otherwise).
+        4. digest : str (Digest of the Grid the Table was built for).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. bound(n, t) = max over Landmarks of |d(L, t) - d(L, n)|, for the
+            Landmarks that reach both Nodes. The Engines take
+            max(Manhattan / Octile, bound), which is still consistent.
+        2. Farthest-Point Selection: each new Landmark is the Cell farthest
+            from the chosen ones (Cells that none of them reaches come
+            first, so every Component gets a Landmark).
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid=None, count=8, octile=False, seed=0):
+        """
+        =======================================================================
+         Description: Select the Landmarks and compute their Distances.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid (None for an Empty Table, see load()).
+            2. count : int (Number of Landmarks).
+            3. octile : bool (Octile Distances, 4-Connected otherwise).
+            4. seed : int (Seed of the first Cell of the Selection).
+        =======================================================================
+        """
+        self.octile = octile
+        self.landmarks = list()
+        self.table = None
+        self.digest = None
+        if grid is None:
+            return
+
+        self.digest = u_grid_fast.get_digest(grid)
+        mask = u_grid_fast.get_mask(grid).ravel()
+        idds_valid = np.flatnonzero(mask)
+        columns = list()
+        if len(idds_valid):
+            rand = np.random.default_rng(seed)
+            distances = self._get_distances(grid,
+                                            int(rand.choice(idds_valid)))
+            score = np.where(distances >= 0, distances, -1)
+        for i in range(count if len(idds_valid) else 0):
+            landmark = int(np.argmax(score))
+            if score[landmark] <= 0:
+                break
+            distances = self._get_distances(grid, landmark)
+            self.landmarks.append(landmark)
+            columns.append(distances)
+            if i == 0:
+                score = np.where(distances >= 0, distances, np.inf)
+            else:
+                score = np.minimum(score, np.where(distances >= 0,
+                                                   distances, np.inf))
+            score[~mask] = -1
+        dtype = np.float64 if octile else np.int32
+        if columns:
+            self.table = np.ascontiguousarray(np.stack(columns, axis=1),
+                                              dtype=dtype)
+        else:
+            self.table = np.zeros((len(mask), 0), dtype=dtype)
+
+
+    def get_bound(self, idd, goal):
+        """
+        =======================================================================
+         Description: Return Landmark Lower Bound of the Distance between
+                        the Node and the Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+            2. goal : int (Goal's Id).
+        =======================================================================
+         Return: float (Lower Bound, 0 if no Landmark reaches both).
+        =======================================================================
+        """
+        d_node = self.table[idd]
+        d_goal = self.table[goal]
+        valid = (d_node >= 0) & (d_goal >= 0)
+        return np.abs(d_goal - d_node)[valid].max(initial=0).item()
+
+
+    def get_bounds(self, idds, goals):
+        """
+        =======================================================================
+         Description: Return Landmark Lower Bounds of every Node to every
+                        Goal (vectorized).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : list of int (Nodes' Ids).
+            2. goals : list of int (Goals' Ids).
+        =======================================================================
+         Return: np.ndarray (Nodes, Goals) of Lower Bounds.
+        =======================================================================
+        """
+        d_nodes = self.table[idds][:, None, :]
+        d_goals = self.table[goals][None, :, :]
+        bounds = np.abs(d_goals - d_nodes)
+        bounds[(d_nodes < 0) | (d_goals < 0)] = 0
+        return bounds.max(axis=2, initial=0)
+
+
+    def save(self, path):
+        """
+        =======================================================================
+         Description: Save the Table into (compressed) .npz File.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. path : str (Path to .npz File).
+        =======================================================================
+         Notes:
+        -----------------------------------------------------------------------
+            1. 4-Connected Distances are stored as uint16 (65535 on
+                Unreachable) when they fit.
+        =======================================================================
+        """
+        table = self.table
+        if not self.octile and table.size and table.max() < 65535:
+            table = np.where(table >= 0, table, 65535).astype(np.uint16)
+        np.savez_compressed(path, table=table,
+                            landmarks=np.array(self.landmarks, np.int64),
+                            octile=self.octile, digest=self.digest)
+
+
+    def _get_distances(self, grid, source):
+        """
+        =======================================================================
+         Description: Return Distances of every Cell from the Source
+                        (-1 on Unreachable).
+        =======================================================================
+        """
+        if not self.octile:
+            return BFS(grid, source).distances.ravel()
+        return dijkstra(c_neighbors.get_neighbors(grid, True), source,
+                        grid.shape[0] * grid.shape[1])
+
+
+def dijkstra(neighbors, source, size):
+    """
+    ===========================================================================
+     Description: Return Distances of every Cell from the Source over the
+                    Neighbors Table (-1 on Unreachable).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. neighbors : Neighbors (Table of the Grid).
+        2. source : int (Source's Id).
+        3. size : int (Number of Cells).
+    ===========================================================================
+     Return: np.ndarray of float (size).
+    ===========================================================================
+    """
+    offsets, idds, costs = neighbors.offsets, neighbors.idds, neighbors.costs
+    distances = np.full(size, -1.0)
+    done = np.zeros(size, dtype=bool)
+    best = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, idd = heapq.heappop(heap)
+        if done[idd]:
+            continue
+        done[idd] = True
+        distances[idd] = d
+        for i in range(offsets[idd], offsets[idd+1]):
+            child = idds[i]
+            d_new = d + (costs[i] if costs is not None else 1)
+            if d_new < best.get(child, float('Infinity')):
+                best[child] = d_new
+                heapq.heappush(heap, (d_new, child))
+    return distances
+
+
+def load(path):
+    """
+    ===========================================================================
+     Description: Load Landmarks from .npz File (see Landmarks.save).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .npz File).
+    ===========================================================================
+     Return: Landmarks.
+    ===========================================================================
+    """
+    with np.load(path) as data:
+        landmarks = Landmarks(octile=bool(data['octile']))
+        landmarks.landmarks = data['landmarks'].tolist()
+        landmarks.digest = str(data['digest'])
+        table = data['table']
+    if table.dtype == np.uint16:
+        table = np.where(table != 65535, table.astype(np.int32), -1)
+    landmarks.table = np.ascontiguousarray(table)
+    return landmarks
+
+
+def get_landmarks(grid, path_map=None, count=8, octile=False):
+    """
+    ===========================================================================
+     Description: Return Landmarks of the Grid, persisted next to the Map
+                    (<map>.<digest>.alt<count>-<4|8>.npz).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. path_map : str (Path to .map File, no Persistence on None).
+        3. count : int (Number of Landmarks).
+        4. octile : bool (Octile Distances, 4-Connected otherwise).
+    ===========================================================================
+     Return: Landmarks.
+    ===========================================================================
+    """
+    if path_map is None:
+        return Landmarks(grid, count, octile)
+    digest = u_grid_fast.get_digest(grid)
+    path = '{0}.{1}.alt{2}-{3}.npz'.format(path_map, digest[:16], count,
+                                           8 if octile else 4)
+    if os.path.exists(path):
+        try:
+            landmarks = load(path)
+            if landmarks.digest == digest:
+                return landmarks
+        except (OSError, ValueError, KeyError):
+            pass
+    landmarks = Landmarks(grid, count, octile)
+    try:
+        landmarks.save(path)
+    except OSError:
+        pass
+    return landmarks
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    import tempfile
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+
+
+    def tester_select():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        landmarks = Landmarks(grid, count=3)
+        p0 = len(landmarks.landmarks) == 3
+        # The first two are opposite Corners
+        p1 = sorted(landmarks.landmarks[:2]) in ([0, 24], [4, 20])
+        p2 = landmarks.table.shape == (25, 3)
+
+        # Every Component gets a Landmark
+        grid = u_grid.gen_symmetric_grid(5)
+        grid[:, 2] = -1
+        landmarks = Landmarks(grid, count=2)
+        cols = sorted(idd % 5 for idd in landmarks.landmarks)
+        p3 = cols[0] < 2 < cols[1]
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    def tester_admissible():
+
+        p0 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(10, 30)
+            idds = u_grid.get_valid_idds(grid)
+            if len(idds) < 5: continue
+            for octile in (False, True):
+                landmarks = Landmarks(grid, count=4, octile=octile)
+                random.shuffle(idds)
+                goals = idds[:3]
+                true = [landmarks._get_distances(grid, goal)
+                        for goal in goals]
+                bounds = landmarks.get_bounds(idds, goals)
+                for j, goal in enumerate(goals):
+                    d = true[j][idds]
+                    p0 = bool(((d < 0) | (bounds[:, j] <= d + 1e-5)).all())
+                    if not p0: break
+                    p0 = landmarks.get_bound(idds[0], goal) == \
+                        bounds[0, j].item()
+                    if not p0: break
+                if not p0: break
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    def tester_save():
+
+        grid = u_grid.gen_obstacles_grid(10, 30)
+        folder = tempfile.mkdtemp()
+        path_map = os.path.join(folder, 'a.map')
+        p0 = True
+        for octile in (False, True):
+            landmarks = get_landmarks(grid, path_map, 4, octile)
+            loaded = get_landmarks(grid, path_map, 4, octile)
+            p0 = p0 and landmarks.landmarks == loaded.landmarks
+            p0 = p0 and np.array_equal(landmarks.table, loaded.table)
+            p0 = p0 and loaded.table.dtype == landmarks.table.dtype
+        p1 = len(os.listdir(folder)) == 2
+
+        u_tester.run([p0,p1])
+
+
+    u_tester.print_start(__file__)
+    tester_select()
+    tester_admissible()
+    tester_save()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,459 @@
+from c_heap import Heap
+from c_heap import Heap_Buckets
+import u_grid_fast
+
+from array import array
+
+import sys
+sys.path.append('D:\\MyPy\\f_grid\\')
+import u_grid
+
+
+# Keys within this of the Goal's f are still expanded (Octile Sums of g and
+# h round differently, a Node on the Path may key a few ulps above the Goal)
+TOLERANCE = 1e-9
+
+
+class LPAStar:
+    """
+    ===========================================================================
+     Description: Lifelong Planning A* (Incremental Replanning on a Grid
+                    whose Cells become blocked or free).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_path() -> list of int (List of Node'd Id, Optimal Path to Goal).
+
+        2. update(idds) -> list of int [Repair the Search after the Cells
+                                        were changed, Return the new Path].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. g : array of float (Node's Cost from Start, by idd).
+        2. rhs : array of float (One-Step Lookahead of g, by idd).
+        3. expanded : int (Expansions of the last run, the Construction or
+                            the last update()).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. g and rhs are kept across the Calls. A Node is consistent when
+            g == rhs, only the inconsistent ones are in Opened, keyed by
+            (min(g, rhs) + h, min(g, rhs), idd).
+        2. update() recomputes rhs of the changed Cells and of their 8
+            Neighbors (a Cell also gates the Diagonal Moves next to it),
+            then expands until the Goal is consistent and no f in Opened
+            is smaller than the Goal's (up to TOLERANCE). Only the Part of
+            the Search Tree the Changes reached is expanded again.
+        3. The Neighbors are generated from a private Passability Buffer
+            (the cached Neighbors Table would be stale after an Edit). The
+            Grid is read again only for the Cells passed to update().
+        4. No Components Index: it would be stale after an Edit too, so an
+            unreachable Goal costs a Sweep of the Start's Component (as
+            AStar without the Index).
+        5. The Arguments follow AStar's Order, so LPAStar is a drop-in
+            Engine. neighbors and components are accepted for it and
+            ignored (see Notes 3 and 4), heap takes type_opened's Place.
+        6. The Path walks back from the Goal through the Neighbor with min
+            g + Cost (first in the Neighbors' Order on Tie). It may differ
+            from AStar's among the equal-cost Paths.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, start, goal, neighbors=None, heap=Heap,
+                 octile=False, stats=None, components=None):
+        """
+        ===================================================================
+         Description: LPA* Algorithm (first run is a plain A*).
+        ===================================================================
+         Arguments:
+        -------------------------------------------------------------------
+            1. grid : Grid (edited in-place between the Calls).
+            2. start : int (Start's Id).
+            3. goal : int (Goal's Id).
+            4. neighbors : Neighbors (ignored, see Note 3).
+            5. heap : class (Priority Queue of (key, idd) Items, Heap or
+                        Heap_Buckets).
+            6. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+            7. stats : Stats (Search Statistics to populate, None to skip).
+            8. components : Components (ignored, see Note 4).
+        ===================================================================
+        """
+        self.start = start
+        self.goal = goal
+        self.grid = grid
+        self.octile = octile
+        self.stats = stats
+
+        size = grid.shape[0] * grid.shape[1]
+        self.g = array('d', [float('Infinity')]) * size
+        self.rhs = array('d', [float('Infinity')]) * size
+        self.expanded = 0
+        self._passable = bytearray(u_grid_fast.get_mask(grid).ravel())
+        # Idd -> its current Key in Opened (older Items are out-of-date)
+        self._keys = dict()
+        self._len_closed = 0
+
+        if stats:
+            heap = stats.get_type_opened(heap)
+        self.opened = heap()
+        self.rhs[start] = 0
+        self._update_key(start)
+        self._run()
+
+
+    def get_path(self):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Return: list of int (List of Nodes Idds or Empty List on No-Solution).
+        =======================================================================
+        """
+        g = self.g
+        if g[self.goal] == float('Infinity'):
+            return list()
+        if not (self._passable[self.start] and self._passable[self.goal]):
+            return list()
+        idd = self.goal
+        path = [idd]
+        while idd != self.start:
+            idd = min(self._get_items(idd),
+                      key=lambda item: g[item[0]] + item[1])[0]
+            path.append(idd)
+        path.reverse()
+        return path
+
+
+    def update(self, idds):
+        """
+        =======================================================================
+         Description: Repair the Search after the Cells were changed in the
+                        Grid (in-place) and Return the new Path.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : iterable of int (Ids of the changed Cells).
+        =======================================================================
+         Return: list of int (List of Nodes Idds or Empty List on No-Solution).
+        =======================================================================
+        """
+        rows, cols = self.grid.shape
+        grid = self.grid.ravel()
+        affected = set()
+        for idd in idds:
+            passable = int(grid[idd] >= 0)
+            if passable == self._passable[idd]:
+                continue
+            self._passable[idd] = passable
+            row, col = divmod(idd, cols)
+            for row_near in range(max(row - 1, 0), min(row + 2, rows)):
+                for col_near in range(max(col - 1, 0), min(col + 2, cols)):
+                    affected.add(row_near * cols + col_near)
+        for idd in sorted(affected):
+            if idd != self.start:
+                self.rhs[idd] = self._get_rhs(idd)
+            self._update_key(idd)
+        self._run()
+        return self.get_path()
+
+
+    def _run(self):
+        """
+        =======================================================================
+         Description: Expand the inconsistent Nodes until the Goal's Path is
+                        optimal (ComputeShortestPath).
+        =======================================================================
+        """
+        g, rhs = self.g, self.rhs
+        goal = self.goal
+        stats = self.stats
+        if stats:
+            t = stats.clock()
+        self.expanded = 0
+        while True:
+            key, idd = self._get_top()
+            if idd is None:
+                break
+            if key[0] > self._get_key(goal)[0] + TOLERANCE and \
+               rhs[goal] == g[goal]:
+                # Kept for the next Call
+                self.opened.push(key, idd)
+                break
+            del self._keys[idd]
+            self.expanded += 1
+            if g[idd] > rhs[idd]:
+                if g[idd] == float('Infinity'):
+                    self._len_closed += 1
+                g[idd] = rhs[idd]
+                g_best = g[idd]
+                for child, w in self._get_items(idd):
+                    if child != self.start and g_best + w < rhs[child]:
+                        rhs[child] = g_best + w
+                        self._update_key(child)
+            else:
+                g_old = g[idd]
+                g[idd] = float('Infinity')
+                self._len_closed -= 1
+                if idd != self.start:
+                    rhs[idd] = self._get_rhs(idd)
+                self._update_key(idd)
+                for child, w in self._get_items(idd):
+                    if child != self.start and rhs[child] == g_old + w:
+                        rhs[child] = self._get_rhs(child)
+                        self._update_key(child)
+            if stats:
+                stats.expand(idd, g[idd], len(self._keys), self._len_closed)
+        if stats:
+            if g[goal] < float('Infinity'):
+                stats.goal_found(goal, g[goal])
+            stats.time_run += stats.clock() - t
+
+
+    def _get_top(self):
+        """
+        =======================================================================
+         Description: Pop the Item with the Min Key (out-of-date Items are
+                        skipped).
+        =======================================================================
+         Return: tuple (key, idd), (None, None) on empty Opened.
+        =======================================================================
+        """
+        opened, keys = self.opened, self._keys
+        while not opened.is_empty():
+            key, idd = opened.pop()
+            if keys.get(idd) == key:
+                return key, idd
+        return None, None
+
+
+    def _update_key(self, idd):
+        """
+        =======================================================================
+         Description: Push the inconsistent Node with its new Key, drop the
+                        consistent one from Opened (lazy deletion).
+        =======================================================================
+        """
+        if self.g[idd] == self.rhs[idd]:
+            self._keys.pop(idd, None)
+            return
+        key = self._get_key(idd)
+        key_old = self._keys.get(idd)
+        if key == key_old:
+            return
+        self._keys[idd] = key
+        self.opened.push(key, idd)
+        stats = self.stats
+        if stats:
+            if key_old is None:
+                stats.generated += 1
+            else:
+                stats.reopened += 1
+
+
+    def _get_key(self, idd):
+        """
+        =======================================================================
+         Description: Return the Node's Key (min(g, rhs) + h, min(g, rhs),
+                        idd).
+        =======================================================================
+        """
+        g_min = min(self.g[idd], self.rhs[idd])
+        width = self.grid.shape[1]
+        row, col = divmod(idd, width)
+        row_goal, col_goal = divmod(self.goal, width)
+        d_row = abs(row - row_goal)
+        d_col = abs(col - col_goal)
+        if self.octile:
+            h = max(d_row, d_col) + (u_grid_fast.SQRT_2 - 1) * min(d_row,
+                                                                   d_col)
+        else:
+            h = d_row + d_col
+        if self.stats:
+            self.stats.counter_h += 1
+        return (g_min + h, g_min, idd)
+
+
+    def _get_rhs(self, idd):
+        """
+        =======================================================================
+         Description: Return min g + Cost over the Node's Neighbors.
+        =======================================================================
+        """
+        g = self.g
+        return min((g[child] + w for child, w in self._get_items(idd)),
+                   default=float('Infinity'))
+
+
+    def _get_items(self, idd):
+        """
+        =======================================================================
+         Description: Return the Neighbors of the Node with their Costs
+                        (same Moves and Order as the Neighbors Table).
+        =======================================================================
+         Return: list of (int, float).
+        =======================================================================
+        """
+        passable = self._passable
+        if not passable[idd]:
+            return list()
+        rows, cols = self.grid.shape
+        row, col = divmod(idd, cols)
+        up = row > 0 and passable[idd - cols]
+        right = col < cols - 1 and passable[idd + 1]
+        down = row < rows - 1 and passable[idd + cols]
+        left = col > 0 and passable[idd - 1]
+        items = list()
+        # Up, Right, Down, Left
+        if up:
+            items.append((idd - cols, 1))
+        if right:
+            items.append((idd + 1, 1))
+        if down:
+            items.append((idd + cols, 1))
+        if left:
+            items.append((idd - 1, 1))
+        if not self.octile:
+            return items
+        # Up-Right, Down-Right, Down-Left, Up-Left (no Corner-Cutting)
+        w = u_grid_fast.SQRT_2
+        if up and right and passable[idd - cols + 1]:
+            items.append((idd - cols + 1, w))
+        if down and right and passable[idd + cols + 1]:
+            items.append((idd + cols + 1, w))
+        if down and left and passable[idd + cols - 1]:
+            items.append((idd + cols - 1, w))
+        if up and left and passable[idd - cols - 1]:
+            items.append((idd - cols - 1, w))
+        return items
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+    import u_random
+
+    from c_astar_flat import AStar_Flat
+    import c_neighbors
+
+
+    def is_valid(grid, path, start, goal, octile):
+        neighbors = c_neighbors.get_neighbors(grid, octile)
+        return path[0] == start and path[-1] == goal and \
+               all(idd_2 in neighbors.get(idd_1)
+                   for idd_1, idd_2 in zip(path, path[1:]))
+
+
+    def tester_run():
+
+        p0 = True
+        for i in range(300):
+            n = u_random.get_random_int(4,12)
+            grid = u_grid.gen_obstacles_grid(n,30)
+            idds = u_grid.get_valid_idds(grid)
+            if len(idds) < 2: continue
+            start, goal = random.sample(idds, 2)
+            for octile in (False, True):
+                path_test = LPAStar(grid, start, goal,
+                                    octile=octile).get_path()
+                path_true = AStar_Flat(grid, start, goal,
+                                       octile=octile).get_path()
+                p0 = bool(path_test) == bool(path_true)
+                if path_test:
+                    p0 = p0 and is_valid(grid, path_test, start, goal, octile)
+                    p0 = p0 and abs(
+                        u_grid_fast.get_path_cost(grid, path_test, octile) -
+                        u_grid_fast.get_path_cost(grid, path_true, octile)) \
+                        < 1e-9
+                if not p0: break
+            if not p0: break
+
+        grid = u_grid.gen_symmetric_grid(4)
+        p1 = LPAStar(grid, 5, 5).get_path() == [5]
+        p1 = p1 and LPAStar(grid, 0, 3).get_path() == [0, 1, 2, 3]
+        # AStar's Order of the Arguments
+        p1 = p1 and LPAStar(grid, 0, 3, None, Heap_Buckets, False, None,
+                            None).get_path() == [0, 1, 2, 3]
+
+        u_tester.run([p0,p1])
+
+
+    def tester_update():
+
+        p0 = True
+        for i in range(200):
+            n = u_random.get_random_int(5,12)
+            grid = u_grid.gen_obstacles_grid(n,25)
+            idds = u_grid.get_valid_idds(grid)
+            if len(idds) < 2: continue
+            start, goal = random.sample(idds, 2)
+            octile = random.random() < 0.5
+            lpastar = LPAStar(grid, start, goal, octile=octile)
+            for j in range(5):
+                changed = random.sample(range(n * n), 3)
+                for idd in changed:
+                    row, col = divmod(idd, n)
+                    grid[row][col] = -1 if grid[row][col] >= 0 else 0
+                path_test = lpastar.update(changed)
+                path_true = AStar_Flat(grid, start, goal,
+                                       octile=octile).get_path()
+                p0 = bool(path_test) == bool(path_true)
+                if path_test:
+                    p0 = p0 and is_valid(grid, path_test, start, goal, octile)
+                    p0 = p0 and abs(
+                        u_grid_fast.get_path_cost(grid, path_test, octile) -
+                        u_grid_fast.get_path_cost(grid, path_true, octile)) \
+                        < 1e-9
+                if not p0: break
+            if not p0: break
+
+        # Block the Path's Middle Cell: Detour, then free it again
+        grid = u_grid.gen_symmetric_grid(5)
+        lpastar = LPAStar(grid, 10, 14)
+        grid[2][2] = -1
+        p1 = len(lpastar.update([12])) == 7 and lpastar.expanded > 0
+        grid[2][2] = 0
+        p1 = p1 and lpastar.update([12]) == [10, 11, 12, 13, 14]
+        p1 = p1 and lpastar.update([12]) == [10, 11, 12, 13, 14]
+        p1 = p1 and lpastar.expanded == 0
+
+        u_tester.run([p0,p1])
+
+
+    def tester_stats():
+
+        from c_stats import Stats
+
+        grid = u_grid.gen_symmetric_grid(5)
+        stats = Stats()
+        lpastar = LPAStar(grid, 0, 24, heap=Heap_Buckets, stats=stats)
+        p0 = stats.goals_found == 1 and stats.expanded == lpastar.expanded
+        p0 = p0 and stats.generated >= stats.expanded
+        grid[0][1] = -1
+        lpastar.update([1])
+        p1 = stats.goals_found == 2 and stats.expanded >= lpastar.expanded
+
+        u_tester.run([p0,p1])
+
+
+    u_tester.print_start(__file__)
+    tester_run()
+    tester_update()
+    tester_stats()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
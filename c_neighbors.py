@@ -0,0 +1,343 @@
+import u_grid_fast
+
+from array import array
+from collections import OrderedDict
+from itertools import repeat
+
+import numpy as np
+
+
+class Neighbors:
+    """
+    ===========================================================================
+     Description: Precomputed Neighbors Table of a Grid (CSR Adjacency).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get(idd) -> array of int [Neighbors' Idds of the Node].
+
+        2. get_costs(idd) -> array of float [Edge Costs to the Neighbors,
+                                None on Uniform-Cost].
+
+        3. get_items(idd) -> iterable of (int, float) [Neighbors' Idds with
+                                their Edge Costs].
+
+        4. save(path) -> [Save the Table into .npz File].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. offsets : array of int (size + 1). The Neighbors of idd are
+                        idds[offsets[idd]:offsets[idd+1]].
+        2. idds : array of int (Neighbors' Idds of all the Nodes).
+        3. costs : array of float (Edge Costs aligned to idds), None on
+                        Uniform-Cost (Node.w).
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid=None, octile=False):
+        """
+        =======================================================================
+         Description: Build the Table of a Canonized Grid.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid (None for an Empty Table, see load()).
+            2. octile : bool (8-Connected with sqrt(2) Diagonal Costs,
+                        4-Connected Uniform-Cost otherwise).
+        =======================================================================
+         Notes:
+        -----------------------------------------------------------------------
+            1. No Corner-Cutting: a Diagonal Move is allowed only if both
+                Orthogonal Cells next to it are Passable.
+        =======================================================================
+        """
+        self.offsets = array('i')
+        self.idds = array('i')
+        self.costs = None
+        if grid is None:
+            return
+
+        mask = u_grid_fast.get_mask(grid)
+        rows, cols = mask.shape
+        idds = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+        table = np.full((rows, cols, 8 if octile else 4), -1, dtype=np.int32)
+        # Up, Right, Down, Left
+        table[1:, :, 0] = np.where(mask[:-1, :], idds[:-1, :], -1)
+        table[:, :-1, 1] = np.where(mask[:, 1:], idds[:, 1:], -1)
+        table[:-1, :, 2] = np.where(mask[1:, :], idds[1:, :], -1)
+        table[:, 1:, 3] = np.where(mask[:, :-1], idds[:, :-1], -1)
+        if octile:
+            # Up-Right, Down-Right, Down-Left, Up-Left
+            table[1:, :-1, 4] = np.where(mask[:-1, 1:] & mask[:-1, :-1]
+                                         & mask[1:, 1:], idds[:-1, 1:], -1)
+            table[:-1, :-1, 5] = np.where(mask[1:, 1:] & mask[1:, :-1]
+                                          & mask[:-1, 1:], idds[1:, 1:], -1)
+            table[:-1, 1:, 6] = np.where(mask[1:, :-1] & mask[1:, 1:]
+                                         & mask[:-1, :-1], idds[1:, :-1], -1)
+            table[1:, 1:, 7] = np.where(mask[:-1, :-1] & mask[:-1, 1:]
+                                        & mask[1:, :-1], idds[:-1, :-1], -1)
+        table[~mask] = -1
+        self._load_table(table.reshape(rows * cols, table.shape[2]))
+        if octile:
+            costs = np.ones(table.shape[2])
+            costs[4:] = np.sqrt(2)
+            costs = np.broadcast_to(costs, (rows * cols, table.shape[2]))
+            valid = table.reshape(rows * cols, table.shape[2]) >= 0
+            self.costs = array('d', costs[valid].tobytes())
+
+
+    def get(self, idd):
+        """
+        =======================================================================
+         Description: Return the Neighbors' Idds of the Node.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: array of int (Neighbors' Idds).
+        =======================================================================
+        """
+        return self.idds[self.offsets[idd]:self.offsets[idd+1]]
+
+
+    def get_costs(self, idd):
+        """
+        =======================================================================
+         Description: Return the Edge Costs to the Node's Neighbors.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: array of float (aligned to get(idd)), None on Uniform-Cost.
+        =======================================================================
+        """
+        if self.costs is None:
+            return None
+        return self.costs[self.offsets[idd]:self.offsets[idd+1]]
+
+
+    def get_items(self, idd):
+        """
+        =======================================================================
+         Description: Return the Neighbors' Idds with their Edge Costs.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: iterable of tuple (int, float) (Neighbor's Idd, Edge Cost),
+                    the Cost is 1 on Uniform-Cost.
+        =======================================================================
+        """
+        if self.costs is None:
+            return zip(self.get(idd), repeat(1))
+        return zip(self.get(idd), self.get_costs(idd))
+
+
+    def save(self, path):
+        """
+        =======================================================================
+         Description: Save the Table into .npz File.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. path : str (Path to .npz File).
+        =======================================================================
+        """
+        arrays = {'offsets': np.frombuffer(self.offsets, dtype=np.int32),
+                  'idds': np.frombuffer(self.idds, dtype=np.int32)}
+        if self.costs is not None:
+            arrays['costs'] = np.frombuffer(self.costs, dtype=np.float64)
+        np.savez(path, **arrays)
+
+
+    def _load_table(self, table):
+        """
+        =======================================================================
+         Description: Compress (size, degree) Table of Idds (-1 on None).
+        =======================================================================
+        """
+        valid = table >= 0
+        offsets = np.zeros(len(table) + 1, dtype=np.int32)
+        np.cumsum(valid.sum(axis=1), out=offsets[1:])
+        self.offsets = array('i', offsets.tobytes())
+        self.idds = array('i', table[valid].astype(np.int32).tobytes())
+
+
+def load(path):
+    """
+    ===========================================================================
+     Description: Load Neighbors Table from .npz File (see Neighbors.save).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .npz File).
+    ===========================================================================
+     Return: Neighbors.
+    ===========================================================================
+    """
+    neighbors = Neighbors()
+    with np.load(path) as data:
+        neighbors.offsets = array('i', data['offsets'].tobytes())
+        neighbors.idds = array('i', data['idds'].tobytes())
+        if 'costs' in data:
+            neighbors.costs = array('d', data['costs'].tobytes())
+    return neighbors
+
+
+# Tables of the most recently used Grids (an Edit changes the Digest, so
+# the Tables of the former Versions are evicted in LRU Order)
+CACHE_SIZE = 4
+_cache = OrderedDict()
+
+
+def get_neighbors(grid, octile=False):
+    """
+    ===========================================================================
+     Description: Return Neighbors Table of the Grid (Cached per Grid, the
+                    last CACHE_SIZE Tables are kept).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. octile : bool (8-Connected Table, 4-Connected otherwise).
+    ===========================================================================
+     Return: Neighbors.
+    ===========================================================================
+    """
+    digest = u_grid_fast.get_digest(grid)
+    neighbors = _cache.get((digest, octile))
+    if neighbors is None:
+        neighbors = Neighbors(grid, octile)
+        put(digest, octile, neighbors)
+    else:
+        _cache.move_to_end((digest, octile))
+    return neighbors
+
+
+def put(digest, octile, neighbors):
+    """
+    ===========================================================================
+     Description: Register the Table of the Grid in the Cache (e.g. one
+                    attached from Shared Memory), get_neighbors() returns it.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. digest : str (Grid's Digest, u_grid_fast.get_digest()).
+        2. octile : bool (8-Connected Table, 4-Connected otherwise).
+        3. neighbors : Neighbors.
+    ===========================================================================
+    """
+    _cache[(digest, octile)] = neighbors
+    _cache.move_to_end((digest, octile))
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+
+
+    def tester_get():
+
+        p0 = True
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(8, 30)
+            neighbors = Neighbors(grid)
+            for idd in u_grid.get_valid_idds(grid):
+                idds_test = set(neighbors.get(idd))
+                idds_true = set(u_grid.get_neighbors(grid, idd=idd))
+                p0 = idds_test == idds_true
+                if not p0: break
+            if not p0: break
+
+        grid = u_grid.gen_symmetric_grid(3)
+        grid[1][1] = -1
+        neighbors = Neighbors(grid)
+        p1 = len(neighbors.get(4)) == 0
+        p2 = set(neighbors.get(1)) == {0,2}
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_octile():
+
+        grid = u_grid.gen_symmetric_grid(3)
+        neighbors = Neighbors(grid, octile=True)
+        p0 = set(neighbors.get(4)) == set(range(9)) - {4}
+        p1 = sorted(neighbors.get_costs(4)) == [1]*4 + [np.sqrt(2)]*4
+        p2 = set(neighbors.get(0)) == {1,3,4}
+
+        # No Corner-Cutting
+        grid[0][1] = -1
+        neighbors = Neighbors(grid, octile=True)
+        p3 = set(neighbors.get(0)) == {3}
+        p4 = set(neighbors.get(4)) == {3,5,6,7,8}
+        costs = dict(zip(neighbors.get(4), neighbors.get_costs(4)))
+        p5 = costs[3] == 1 and costs[8] == np.sqrt(2)
+        p6 = Neighbors(grid).get_costs(4) is None
+        p6 = p6 and set(Neighbors(grid).get_items(4)) == {(3,1),(5,1),(7,1)}
+
+        u_tester.run([p0,p1,p2,p3,p4,p5,p6])
+
+
+    def tester_save():
+
+        import os
+        import tempfile
+
+        grid = u_grid.gen_obstacles_grid(8, 30)
+        neighbors = Neighbors(grid)
+        path = os.path.join(tempfile.mkdtemp(), 'neighbors.npz')
+        neighbors.save(path)
+        neighbors_test = load(path)
+        p0 = neighbors_test.offsets == neighbors.offsets
+        p1 = neighbors_test.idds == neighbors.idds
+
+        u_tester.run([p0,p1])
+
+
+    def tester_get_neighbors():
+
+        grid = u_grid.gen_obstacles_grid(8, 30)
+        neighbors = get_neighbors(grid)
+        p0 = neighbors is get_neighbors(grid.copy())
+        # Edits give new Tables, the least recently used one is evicted
+        for i in range(CACHE_SIZE):
+            grid_edited = grid.copy()
+            grid_edited.flat[i] = -1 - grid_edited.flat[i]
+            get_neighbors(grid_edited)
+        p1 = len(_cache) == CACHE_SIZE
+        p1 = p1 and get_neighbors(grid) is not neighbors
+        # Registered Table is returned as is
+        put(u_grid_fast.get_digest(grid), True, neighbors)
+        p2 = get_neighbors(grid, True) is neighbors
+
+        u_tester.run([p0,p1,p2])
+
+
+    u_tester.print_start(__file__)
+    tester_get()
+    tester_octile()
+    tester_save()
+    tester_get_neighbors()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
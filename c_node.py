@@ -2,9 +2,23 @@ class Node:
     """
     ===========================================================================
      Decription: Class of Node in Grid.
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. Slotted (no __dict__) to keep the per-Node memory low.
+        2. The Order is kept in a precomputed key = (f, -g, idd), refreshed
+            on every assignment of f or g (Lower f, then Larger g, then
+            Lower idd is Better).
+        3. goal is the Goal that h was calculated toward (the nearest one
+            in multi-goal searches), None otherwise.
     ===========================================================================
     """
     
+    __slots__ = ('idd', 'father', 'h', 'goal', '_g', '_f', 'key')
+    
+    # Cost of entering the Node (Uniform-Cost Grid).
+    w = 1
+    
     
     def __init__(self, idd):
         """
@@ -17,11 +31,34 @@ class Node:
         =======================================================================
         """
         self.idd = idd
-        self.w = 1  
         self.father = None  
-        self.g = float('Infinity')
         self.h = float('Infinity')
-        self.f = float('Infinity')
+        self.goal = None
+        self._g = float('Infinity')
+        self._f = float('Infinity')
+        self.key = (self._f, -self._g, idd)
+        
+        
+    @property
+    def g(self):
+        return self._g
+    
+    
+    @g.setter
+    def g(self, g):
+        self._g = g
+        self.key = (self._f, -g, self.idd)
+        
+        
+    @property
+    def f(self):
+        return self._f
+    
+    
+    @f.setter
+    def f(self, f):
+        self._f = f
+        self.key = (f, -self._g, self.idd)
         
     
     def __eq__(self, other):
@@ -36,8 +73,7 @@ class Node:
          Return: bool (True if Self equals to Other).
         =======================================================================
         """
-        if self.idd == other.idd:
-            return True
+        return self.idd == other.idd
     
     
     def __ne__(self, other):
@@ -52,7 +88,7 @@ class Node:
          Return: bool (True if Self not equals to Other).
         =======================================================================
         """
-        return not self.__eq__(other)
+        return self.idd != other.idd
     
     
     def __lt__(self, other):
@@ -67,16 +103,7 @@ class Node:
          Return: bool (True if Self is less than Other).
         =======================================================================
         """
-        if (self == other):
-            return False
-        if (self.f < other.f):
-            return True
-        if (self.f == other.f):
-            if (self.g > other.g):
-                return True
-            elif (self.g == other.g) and (self.idd < other.idd):
-                return True
-        return False
+        return self.key < other.key
     
     
     def __le__(self, other):
@@ -91,7 +118,7 @@ class Node:
          Return: bool
         =======================================================================
         """
-        return self == other or self < other
+        return self.key <= other.key
     
     
     def __gt__(self, other):
@@ -106,7 +133,7 @@ class Node:
          Return: bool (True if Self is greater than Other).
         =======================================================================
         """
-        return not (self < other) and not (self == other)
+        return self.key > other.key
     
     
     def __ge__(self, other):
@@ -121,7 +148,7 @@ class Node:
          Return: bool
         =======================================================================
         """
-        return self == other or self > other
+        return self.key >= other.key
     
     
     def __str__(self):
@@ -276,6 +303,32 @@ def tester():
         u_tester.run([p0,p1,p2])
         
         
+    def tester_key():
+        
+        node = Node(5)
+        node.g = 3
+        node.f = 7
+        p0 = node.key == (7, -3, 5)
+        
+        # f assigned before g (key must follow both)
+        node = Node(5)
+        node.f = 7
+        node.g = 3
+        p1 = node.key == (7, -3, 5)
+        
+        # f_1 == f_2 and g_1 == g_2 -> lower idd is better
+        node_1 = Node(1)
+        node_2 = Node(2)
+        for node in (node_1, node_2):
+            node.g = 2
+            node.f = 4
+        p2 = node_1 < node_2 and sorted([node_2, node_1])[0] is node_1
+        
+        p3 = not hasattr(node, '__dict__')
+        
+        u_tester.run([p0,p1,p2,p3])
+        
+        
     def tester_str():
         
         node = Node(1)
@@ -299,6 +352,7 @@ def tester():
     tester_le()
     tester_gt()
     tester_ge()
+    tester_key()
     tester_str()
     tester_hash()
     u_tester.print_finish(__file__)       
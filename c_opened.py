@@ -1,15 +1,10 @@
-from pathlib import Path
-path_parent = Path(Path(Path(__file__).parent).parent)
-
-import sys
-sys.path.append(str(path_parent) + '\\f_utils')
-import u_set
+import heapq
 
 
 class Opened:
     """
     ===========================================================================
-     Description: Opened Priority Queue for A*.
+     Description: Opened Priority Queue for A* (Indexed Binary-Heap).
     ===========================================================================
      Methods:
     ---------------------------------------------------------------------------
@@ -21,15 +16,29 @@ class Opened:
         
         4. get(node) -> Node [Return Node if exist, Node otherwise].
         
-        5. get_nodes() -> set of Node (Set of Nodes in Opened).
+        5. get_idd(idd) -> Node [Return the Node of the Idd, None otherwise].
+        
+        6. get_nodes() -> set of Node (Set of Nodes in Opened).
         
-        6. remove(node) -> [Remove the Node from the Opened].
+        7. remove(node) -> [Remove the Node from the Opened].
         
-        7. push(node) -> [Push the Node into Opened].
+        8. push(node) -> [Push the Node into Opened].
         
-        8. pop() -> Node [Return the Best Node and Remove it from the Opened].
+        9. pop() -> Node [Return the Best Node and Remove it from the Opened].
         
-        9. load(set) -> [Load set of Nodes].
+        10. load(set) -> [Load set of Nodes].
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. Nodes are indexed by Idd (O(1) contains / get / remove).
+        2. Heap entries are (key, node) snapshots of the Node's key,
+            so the order is the same as Node.__lt__.
+        3. Removed and out-of-date entries are skipped lazily on pop.
+        4. Nodes returned by get() / get_idd() may be improved in-place by the caller
+            (decrease-key). Their key is kept aside, the ones whose key
+            changed are re-pushed before the next get_best() / pop().
+        5. Nodes returned by get_nodes() may be changed in-place by the
+            caller. The Heap is rebuilt before the next get_best() / pop().
     ===========================================================================
     """
     
@@ -40,7 +49,10 @@ class Opened:
          Description: Constructor. Init the Attributes.
         =======================================================================
         """
-        self._opened = set()
+        self._opened = dict()
+        self._heap = list()
+        self._dirty = list()
+        self._rebuild = False
         
     
     def is_empty(self):
@@ -58,30 +70,37 @@ class Opened:
         """
         =======================================================================
          Description: Return True if Opened Set contains the Node
+        =======================================================================
+         Complexity: O(1).
         =======================================================================
          Arguments: node : Node.
         =======================================================================
         """
-        return node in self._opened
+        return node.idd in self._opened
     
     
     def get_best(self):
         """
         =======================================================================
          Description: Return the Best Node in Opened.
+        =======================================================================
+         Complexity: O(log n) amortized.
         =======================================================================
          Return: Node (Best Node in Opened), None on Opened is Empty.
         =======================================================================
         """
         if self.is_empty():
             return None
-        return min(self._opened)
+        self._clean()
+        return self._top_entry()[1]
     
     
     def get(self, node):
         """
         =======================================================================
          Description: Return the Node if exists (None otherwise).
+        =======================================================================
+         Complexity: O(1).
         =======================================================================
          Arguments:
         -----------------------------------------------------------------------
@@ -90,7 +109,27 @@ class Opened:
          Return: Node if exists (None otherwise).
         =======================================================================
         """
-        return u_set.get(self._opened, node)
+        return self.get_idd(node.idd)
+    
+    
+    def get_idd(self, idd):
+        """
+        =======================================================================
+         Description: Return the Node of the Idd if exists (None otherwise).
+        =======================================================================
+         Complexity: O(1).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: Node if exists (None otherwise).
+        =======================================================================
+        """
+        node = self._opened.get(idd)
+        if node is not None:
+            self._dirty.append((node.key, node))
+        return node
     
     
     def get_nodes(self):
@@ -101,50 +140,57 @@ class Opened:
          Return: Set of Nodes in Opened.
         =======================================================================
         """
-        return self._opened
+        self._rebuild = True
+        return set(self._opened.values())
     
     
     def remove(self, node):
         """
         =======================================================================
          Description: Remove specified Node from the Opened.
+        =======================================================================
+         Complexity: O(1) (the Heap Entry is skipped lazily on pop).
         =======================================================================
          Arguments:
         -----------------------------------------------------------------------
             1. node : Node.
         =======================================================================
         """
-        try:
-            self._opened.remove(node)
-        except:
-            pass
+        self._opened.pop(node.idd, None)
         
         
     def push(self, node):        
         """
         =======================================================================
-         Description: Push Node into the Opened.
+         Description: Push Node into the Opened (or Update its Key if the
+                        Node is already in the Opened).
         =======================================================================
-         Complexity: O(1).
+         Complexity: O(log n).
         =======================================================================
          Arguments:
         -----------------------------------------------------------------------
             1. node : Node.
         =======================================================================
         """
-        self._opened.add(node)        
+        self._opened[node.idd] = node
+        self._push_entry(node)
     
     
     def pop(self):
         """
         =======================================================================
          Description: Pop Node from the Opened.
+        =======================================================================
+         Complexity: O(log n) amortized.
         =======================================================================
          Return: Node.
         =======================================================================
         """
-        best = self.get_best()
-        self.remove(best)
+        if self.is_empty():
+            return None
+        self._clean()
+        best = self._pop_entry()[1]
+        del self._opened[best.idd]
         return best
     
     
@@ -152,9 +198,81 @@ class Opened:
         """
         =======================================================================
          Description: Load Opened with Set of Nodes.
+        =======================================================================
+         Complexity: O(n).
+        =======================================================================
+        """
+        self._opened = {node.idd: node for node in opened}
+        self._dirty = list()
+        self._rebuild = True
+        
+        
+    def _clean(self):
+        """
+        =======================================================================
+         Description: Bring the Heap up to date with the Opened Nodes and
+                        drop Stale Entries from its Top.
+        =======================================================================
+        """
+        if self._rebuild:
+            self._load_entries()
+            self._dirty = list()
+            self._rebuild = False
+        elif self._dirty:
+            for key, node in self._dirty:
+                if node.key != key and self._opened.get(node.idd) is node:
+                    self._push_entry(node)
+            self._dirty = list()
+        while True:
+            key, node = self._top_entry()
+            if self._opened.get(node.idd) is not node:
+                self._pop_entry()
+            elif key != node.key:
+                self._pop_entry()
+                self._push_entry(node)
+            else:
+                return
+                
+                
+    def _push_entry(self, node):
+        """
+        =======================================================================
+         Description: Push (key, node) Entry into the Heap.
+        =======================================================================
+        """
+        heapq.heappush(self._heap, (node.key, node))
+        
+        
+    def _top_entry(self):
+        """
+        =======================================================================
+         Description: Return the Entry with the Min Key (None on Empty).
+        =======================================================================
+        """
+        return self._heap[0] if self._heap else None
+    
+    
+    def _pop_entry(self):
+        """
+        =======================================================================
+         Description: Remove and Return the Entry with the Min Key.
+        =======================================================================
+        """
+        return heapq.heappop(self._heap)
+    
+    
+    def _load_entries(self):
+        """
+        =======================================================================
+         Description: Rebuild the Heap from the Opened Nodes.
         =======================================================================
         """
-        self._opened = opened.copy()
+        self._heap = [(node.key, node) for node in self._opened.values()]
+        heapq.heapify(self._heap)
+    
+    
+    def __len__(self):
+        return len(self._opened)
     
     
     def __str__(self):
@@ -169,7 +287,7 @@ class Opened:
         
         best = self.get_best()
         temp = 'Opened:\n' + '='*10 + '\n{0}\n'.format(best)
-        for node in self._opened:
+        for node in self._opened.values():
             if (node != best):
                 temp += '{0}\n'.format(node)
         return temp
@@ -188,13 +306,23 @@ def tester():
     sys.path.append('D:\\MyPy\\f_utils')
     import u_tester       
     
+    from c_node import Node
+    
+    
+    def to_node(idd, f=0):
+        
+        node = Node(idd)
+        node.f = f
+        node.g = 0
+        return node
+    
 
     def tester_is_empty():
         
         opened = Opened()
         p0 = opened.is_empty()
         
-        opened.push(1)
+        opened.push(to_node(1))
         p1 = not opened.is_empty()
         
         u_tester.run([p0,p1])
@@ -203,9 +331,9 @@ def tester():
     def tester_contains():
         
         opened = Opened()
-        opened.push(1)
-        p0 = opened.contains(1)
-        p1 = not opened.contains(2)
+        opened.push(to_node(1))
+        p0 = opened.contains(Node(1))
+        p1 = not opened.contains(Node(2))
         
         u_tester.run([p0,p1])
         
@@ -213,18 +341,16 @@ def tester():
     def tester_get_best():
         
         opened = Opened()
-        opened.push(3)
-        opened.push(1)
-        opened.push(2)
-        p0 = opened.get_best() == 1
+        opened.push(to_node(3))
+        opened.push(to_node(1))
+        opened.push(to_node(2))
+        p0 = opened.get_best() == Node(1)
         
         u_tester.run([p0])
         
         
     def tester_get():
         
-        from c_node import Node
-        
         opened = Opened()
         node = Node(1)
         node.g = 1
@@ -233,13 +359,14 @@ def tester():
         node.g = 2
         node_test = opened.get(node)
         p0 = node_test.g == 2
+        p1 = opened.get_idd(2).idd == 2 and opened.get_idd(3) is None
         
-        u_tester.run([p0])
+        u_tester.run([p0,p1])
         
     
     def tester_get_nodes():
 
-        nodes_true = {1,2,3}
+        nodes_true = {to_node(1),to_node(2),to_node(3)}
         opened = Opened()   
         for node in nodes_true:
             opened.push(node)
@@ -252,19 +379,20 @@ def tester():
     def tester_remove():
         
         opened = Opened()
-        opened.push(1)
-        opened.remove(1)
-        p0 = not opened.contains(1)
+        opened.push(to_node(1))
+        opened.remove(Node(1))
+        p0 = not opened.contains(Node(1))
+        p1 = opened.pop() is None
         
-        u_tester.run([p0])
+        u_tester.run([p0,p1])
         
         
     def tester_push():
     
         opened = Opened()
-        opened.push(1)
+        opened.push(to_node(1))
         best = opened.get_best()
-        p0 = best == 1
+        p0 = best == Node(1)
         
         u_tester.run([p0])
         
@@ -272,31 +400,83 @@ def tester():
     def tester_pop():
         
         opened = Opened()
-        opened.push(3)
-        opened.push(1)
-        opened.push(2)
+        opened.push(to_node(3))
+        opened.push(to_node(1))
+        opened.push(to_node(2))
         best = opened.pop()
-        p0 = best == 1
+        p0 = best == Node(1)
+        
+        # Tie-Break on f: larger g first, then smaller idd
+        opened = Opened()
+        for idd, f, g in [(3,5,1), (2,5,2), (1,5,1), (4,4,0)]:
+            node = Node(idd)
+            node.f = f
+            node.g = g
+            opened.push(node)
+        order = [opened.pop().idd for i in range(4)]
+        p1 = order == [4,2,1,3]
+        
+        u_tester.run([p0,p1])
+        
+        
+    def tester_decrease_key():
+        
+        opened = Opened()
+        for idd in range(5):
+            opened.push(to_node(idd, 10+idd))
+        # Improve Node via get() (the way the Engines do)
+        node = opened.get(Node(4))
+        node.f = 1
+        p0 = opened.pop().idd == 4
+        # Improve Node via push()
+        node = to_node(3, 0)
+        opened.push(node)
+        p1 = opened.pop().idd == 3
+        p2 = [opened.pop().idd for i in range(3)] == [0,1,2]
+        p3 = opened.is_empty() and opened.pop() is None
+        # Lookups that leave the Key unchanged push no Entry
+        opened = Opened()
+        for idd in range(5):
+            opened.push(to_node(idd, idd))
+        for i in range(3):
+            for idd in range(5):
+                opened.get(Node(idd))
+            opened.get_best()
+        p4 = len(opened._heap) == 5
+        
+        u_tester.run([p0,p1,p2,p3,p4])
+        
+        
+    def tester_rekey():
+        
+        opened = Opened()
+        for idd in range(5):
+            opened.push(to_node(idd, idd))
+        for node in opened.get_nodes():
+            node.f = 10 - node.idd
+        order = [opened.pop().idd for i in range(5)]
+        p0 = order == [4,3,2,1,0]
         
         u_tester.run([p0])
         
     
     def tester_load():
 
-        nodes_true = {1,2,3}
+        nodes_true = {to_node(1,3),to_node(2,2),to_node(3,1)}
         opened = Opened()
         opened.load(nodes_true)
         nodes_test = opened.get_nodes()
         p0 = nodes_test == nodes_true
+        p1 = opened.pop().idd == 3
 
-        u_tester.run([p0])
+        u_tester.run([p0,p1])
  
        
     def tester_str():
         
         opened = Opened()
-        opened.push(2)
-        opened.push(1)
+        opened.push(to_node(2,2))
+        opened.push(to_node(1,1))
         str_test = str(opened)
         p0 = str_test == 'Opened:\n{0}\n{1}\n{2}\n'.format('='*10,1,2)
         
@@ -312,6 +492,8 @@ def tester():
     tester_get_nodes()
     tester_push()
     tester_pop()
+    tester_decrease_key()
+    tester_rekey()
     tester_load()
     tester_str()
     u_tester.print_finish(__file__)        
@@ -319,4 +501,3 @@ def tester():
     
 if __name__ == '__main__':
     tester()
- 
\ No newline at end of file
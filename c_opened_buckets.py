@@ -0,0 +1,176 @@
+from c_heap import Heap_Buckets
+from c_opened import Opened
+
+
+class Opened_Buckets(Opened):
+    """
+    ===========================================================================
+     Description: Opened Priority Queue for A* (Dial's f-Indexed Buckets).
+    ===========================================================================
+     Methods: Same as Opened.
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. For Integer-Cost Grids (Node.w = 1) with Integer h (Manhattan),
+            where every f and g is a small Integer.
+        2. The Entries are kept in a Heap_Buckets (Buckets by f, Cells by
+            -g inside), so the Tie-Breaking is the same as Node.__lt__ and
+            finding the Min Entry is O(1) amortized (see c_heap).
+    ===========================================================================
+    """
+
+
+    def __init__(self):
+        """
+        =======================================================================
+         Description: Constructor. Init the Attributes.
+        =======================================================================
+        """
+        super().__init__()
+        self._heap = Heap_Buckets()
+
+
+    def _push_entry(self, node):
+        """
+        =======================================================================
+         Description: Push (key, node) Entry into the Buckets.
+        =======================================================================
+        """
+        self._heap.push(node.key, node)
+
+
+    def _top_entry(self):
+        """
+        =======================================================================
+         Description: Return the Entry with the Min Key (None on Empty).
+        =======================================================================
+        """
+        return self._heap.top() if self._heap else None
+
+
+    def _pop_entry(self):
+        """
+        =======================================================================
+         Description: Remove and Return the Entry with the Min Key.
+        =======================================================================
+        """
+        return self._heap.pop()
+
+
+    def _load_entries(self):
+        """
+        =======================================================================
+         Description: Rebuild the Buckets from the Opened Nodes.
+        =======================================================================
+        """
+        self._heap = Heap_Buckets()
+        for node in self._opened.values():
+            self._push_entry(node)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+
+    from c_node import Node
+
+
+    def to_node(idd, f, g=0):
+
+        node = Node(idd)
+        node.g = g
+        node.f = f
+        return node
+
+
+    def tester_pop():
+
+        opened = Opened_Buckets()
+        for idd, f, g in [(3,5,1), (2,5,2), (1,5,1), (4,4,0), (5,9,0)]:
+            opened.push(to_node(idd, f, g))
+        order = [opened.pop().idd for i in range(5)]
+        p0 = order == [4,2,1,3,5]
+        p1 = opened.is_empty() and opened.pop() is None
+
+        u_tester.run([p0,p1])
+
+
+    def tester_decrease_key():
+
+        opened = Opened_Buckets()
+        for idd in range(5):
+            opened.push(to_node(idd, 10+idd))
+        node = opened.get(Node(4))
+        node.f = 1
+        p0 = opened.pop().idd == 4
+        opened.push(to_node(3, 0))
+        p1 = opened.pop().idd == 3
+        p2 = [opened.pop().idd for i in range(3)] == [0,1,2]
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_infinity():
+
+        opened = Opened_Buckets()
+        opened.push(to_node(1, float('Infinity')))
+        opened.push(to_node(2, 3))
+        p0 = opened.pop().idd == 2
+        p1 = opened.pop().idd == 1
+
+        u_tester.run([p0,p1])
+
+
+    def tester_same_as_opened():
+
+        import random
+
+        p0 = True
+        for i in range(100):
+            opened = Opened()
+            opened_buckets = Opened_Buckets()
+            for idd in range(50):
+                f = random.randint(0, 20)
+                g = random.randint(0, f)
+                opened.push(to_node(idd, f, g))
+                opened_buckets.push(to_node(idd, f, g))
+            for j in range(50):
+                p0 = opened.pop().idd == opened_buckets.pop().idd
+                if not p0: break
+            if not p0: break
+
+        u_tester.run([p0])
+
+
+    def tester_non_integer():
+
+        opened = Opened_Buckets()
+        try:
+            opened.push(to_node(1, 1.5))
+            p0 = False
+        except ValueError:
+            p0 = True
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_pop()
+    tester_decrease_key()
+    tester_infinity()
+    tester_same_as_opened()
+    tester_non_integer()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
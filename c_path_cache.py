@@ -0,0 +1,401 @@
+from c_astar import AStar
+from c_kastar import KAStar
+import c_components
+import u_grid_fast
+
+from collections import OrderedDict
+
+
+class PathCache:
+    """
+    ===========================================================================
+     Description: LRU Memoization of Optimal Paths (in front of AStar and
+                    KAStar).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. get_path(start, goal) -> list of int [Optimal Path, AStar on
+                                                    Miss].
+
+        2. get_paths(start, goals) -> dict [Goal -> Optimal Path, KAStar on
+                                            Miss].
+
+        3. clear() -> [Remove all the Entries].
+
+        4. to_dict() -> dict [Hit / Miss / Eviction Counters].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. grid : Grid (may be edited in-place between the Queries).
+        2. capacity : int (Max total Length of the cached Paths, in Cells).
+        3. digest : str (Grid's Version the Entries are valid for).
+        4. hits : int (Queries answered without a Search).
+        5. hits_subpath : int (Hits answered by a Sub-Path of a cached
+                                Path, part of hits).
+        6. misses : int (Queries that ran a Search).
+        7. evictions : int (Entries removed to fit the Capacity).
+        8. invalidations : int (Entries removed on a Grid's Edit).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. An Entry is keyed by (start, goal) or (start, frozenset(goals))
+            and weighs the total Length of its Paths. The least recently
+            used Entries are evicted until the Weight fits the Capacity,
+            so a long Path takes the Room of many short ones.
+        2. Every Sub-Path of an Optimal Path is optimal (both Directions,
+            the Moves are symmetric), so a Query between any two Cells of
+            a cached Path is a Hit. The Path may differ from the Engine's
+            own among the equal-cost Paths.
+        3. The Grid's Digest is checked on every Query. When it changed,
+            all the Entries are dropped.
+        4. Empty Paths (No-Solution) are not cached. An unreachable Goal
+            is answered in O(1) by the Components Index (a Hit), so the
+            other Goals of a Set can still be answered from the Cache.
+    ===========================================================================
+    """
+
+
+    def __init__(self, grid, capacity=100000, octile=False):
+        """
+        =======================================================================
+         Description: Create an empty Cache for the Grid.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. capacity : int (Max total Length of the cached Paths).
+            3. octile : bool (8-Connected Moves with Octile Heuristic,
+                        4-Connected with Manhattan otherwise).
+        =======================================================================
+        """
+        self.grid = grid
+        self.capacity = capacity
+        self.octile = octile
+        self.digest = u_grid_fast.get_digest(grid)
+        self.hits = 0
+        self.hits_subpath = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Key -> dict (Goal -> Path), in LRU Order (most recent last)
+        self._entries = OrderedDict()
+        # Key -> dict (Goal -> dict (Cell -> Position on the Path))
+        self._positions = dict()
+        # Cell -> set of (Key, Goal) of the Paths through the Cell
+        self._index = dict()
+        self._weight = 0
+        # Grid's Components Index (fetched on the first unanswered Query)
+        self._components = None
+
+
+    def get_path(self, start, goal):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start's Id).
+            2. goal : int (Goal's Id).
+        =======================================================================
+         Return: list of int (Empty List on No-Solution).
+        =======================================================================
+        """
+        self._check_version()
+        path = self._lookup(start, goal)
+        if path is None and not self._is_reachable(start, goal):
+            path = []
+        if path is not None:
+            self.hits += 1
+            return path
+        self.misses += 1
+        path = AStar(self.grid, start, goal, octile=self.octile,
+                     components=self._components).get_path()
+        self._add((start, goal), {goal: path})
+        return path
+
+
+    def get_paths(self, start, goals):
+        """
+        =======================================================================
+         Description: Return Optimal Paths from Start to the Goals.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start's Id).
+            2. goals : iterable of int (Goals' Ids).
+        =======================================================================
+         Return: dict (Goal -> list of int, Empty List on No-Solution).
+        =======================================================================
+        """
+        self._check_version()
+        goals = frozenset(goals)
+        paths = dict()
+        for goal in goals:
+            path = self._lookup(start, goal)
+            if path is None:
+                if self._is_reachable(start, goal):
+                    break
+                path = []
+            paths[goal] = path
+        else:
+            self.hits += 1
+            return paths
+        self.misses += 1
+        kastar = KAStar(self.grid, start, goals, octile=self.octile,
+                        components=self._components)
+        kastar.run()
+        paths = {goal: kastar.get_path(goal) for goal in goals}
+        self._add((start, goals), paths)
+        return paths
+
+
+    def clear(self):
+        """
+        =======================================================================
+         Description: Remove all the Entries (the Counters are kept).
+        =======================================================================
+        """
+        self._entries.clear()
+        self._positions.clear()
+        self._index.clear()
+        self._weight = 0
+
+
+    def to_dict(self):
+        """
+        =======================================================================
+         Description: Return the Counters.
+        =======================================================================
+         Return: dict (str -> int).
+        =======================================================================
+        """
+        keys = ['hits', 'hits_subpath', 'misses', 'evictions',
+                'invalidations']
+        counters = {key: getattr(self, key) for key in keys}
+        counters['entries'] = len(self._entries)
+        counters['weight'] = self._weight
+        return counters
+
+
+    def _check_version(self):
+        """
+        =======================================================================
+         Description: Drop all the Entries if the Grid was edited.
+        =======================================================================
+        """
+        digest = u_grid_fast.get_digest(self.grid)
+        if digest != self.digest:
+            self.invalidations += len(self._entries)
+            self.clear()
+            self.digest = digest
+            self._components = None
+
+
+    def _is_reachable(self, start, goal):
+        """
+        =======================================================================
+         Description: Return True if there is a Path from Start to Goal (by
+                        the Grid's Components Index).
+        =======================================================================
+         Return: bool.
+        =======================================================================
+        """
+        if self._components is None:
+            self._components = c_components.get_components(self.grid)
+        return self._components.is_connected(start, goal)
+
+
+    def _lookup(self, start, goal):
+        """
+        =======================================================================
+         Description: Return cached (Sub-)Path from Start to Goal and mark
+                        its Entry as recently used.
+        =======================================================================
+         Return: list of int (None on Miss).
+        =======================================================================
+        """
+        if start == goal:
+            return [start] if self.grid.flat[start] >= 0 else None
+        paths_start = self._index.get(start)
+        paths_goal = self._index.get(goal)
+        if not (paths_start and paths_goal):
+            return None
+        for key, goal_key in paths_start & paths_goal:
+            positions = self._positions[key][goal_key]
+            path = self._entries[key][goal_key]
+            self._entries.move_to_end(key)
+            i, j = positions[start], positions[goal]
+            if (key[0], goal_key) != (start, goal):
+                self.hits_subpath += 1
+            if i < j:
+                return path[i:j+1]
+            return path[j:i+1][::-1]
+        return None
+
+
+    def _add(self, key, paths):
+        """
+        =======================================================================
+         Description: Add the Entry (its non-empty Paths) and evict the
+                        least recently used Entries beyond the Capacity.
+        =======================================================================
+        """
+        paths = {goal: path for goal, path in paths.items() if path}
+        weight = sum(len(path) for path in paths.values())
+        if not paths or weight > self.capacity:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = paths
+        self._positions[key] = dict()
+        for goal, path in paths.items():
+            self._positions[key][goal] = {idd: i for i, idd in
+                                          enumerate(path)}
+            for idd in path:
+                self._index.setdefault(idd, set()).add((key, goal))
+        self._weight += weight
+        while self._weight > self.capacity:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+    def _remove(self, key):
+        """
+        =======================================================================
+         Description: Remove the Entry and its Cells from the Index.
+        =======================================================================
+        """
+        paths = self._entries.pop(key)
+        del self._positions[key]
+        for goal, path in paths.items():
+            self._weight -= len(path)
+            for idd in path:
+                refs = self._index[idd]
+                refs.discard((key, goal))
+                if not refs:
+                    del self._index[idd]
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import random
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+
+
+    def tester_get_path():
+
+        p0 = True
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(10,30)
+            idds = u_grid.get_valid_idds(grid)
+            if len(idds) < 2: continue
+            for octile in (False, True):
+                cache = PathCache(grid, octile=octile)
+                for j in range(20):
+                    start, goal = random.sample(idds, 2)
+                    path_test = cache.get_path(start, goal)
+                    path_true = AStar(grid,start,goal,octile=octile).\
+                                    get_path()
+                    p0 = bool(path_test) == bool(path_true)
+                    if path_test:
+                        cost_test = u_grid_fast.get_path_cost(grid,
+                                                              path_test,
+                                                              octile)
+                        cost_true = u_grid_fast.get_path_cost(grid,
+                                                              path_true,
+                                                              octile)
+                        p0 = p0 and abs(cost_test - cost_true) < 1e-9
+                        p0 = p0 and path_test[0] == start
+                        p0 = p0 and path_test[-1] == goal
+                    if not p0: break
+                p0 = p0 and cache.hits + cache.misses == 20
+                if not p0: break
+            if not p0: break
+
+        # Sub-Path (reversed) of a cached Path
+        grid = u_grid.gen_symmetric_grid(5)
+        cache = PathCache(grid)
+        path = cache.get_path(0, 24)
+        p1 = cache.get_path(path[6], path[2]) == path[2:7][::-1]
+        p1 = p1 and cache.hits == 1 and cache.hits_subpath == 1
+        p1 = p1 and cache.misses == 1
+
+        u_tester.run([p0,p1])
+
+
+    def tester_get_paths():
+
+        grid = u_grid.gen_symmetric_grid(6)
+        cache = PathCache(grid)
+        paths = cache.get_paths(0, [5, 30, 35])
+        p0 = cache.misses == 1 and sorted(paths) == [5, 30, 35]
+        p0 = p0 and all(len(path) == u_grid.manhattan_distance(grid, 0, goal)
+                        + 1 for goal, path in paths.items())
+        p1 = cache.get_paths(0, [30, 35, 5]) == paths and cache.hits == 1
+        p2 = cache.get_path(paths[35][3], 0) == paths[35][:4][::-1]
+        # Unreachable Goal (Wall on Column 5) -> the other Goals still hit
+        grid = u_grid.gen_symmetric_grid(10)
+        for row in range(10):
+            grid[row][5] = -1
+        cache = PathCache(grid)
+        paths = [cache.get_paths(0, [4, 44, 9]) for i in range(3)]
+        p3 = paths[0][9] == [] and len(paths[0][44]) == 9
+        p3 = p3 and paths[0] == paths[1] == paths[2]
+        p3 = p3 and cache.misses == 1 and cache.hits == 2
+        p3 = p3 and cache.get_path(9, 0) == [] and cache.misses == 1
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    def tester_evict():
+
+        grid = u_grid.gen_symmetric_grid(10)
+        cache = PathCache(grid, capacity=30)
+        cache.get_path(0, 99)       # 19 Cells
+        cache.get_path(90, 99)      # 10 Cells
+        p0 = cache.evictions == 0 and cache._weight == 29
+        cache.get_path(11, 13)      # 3 Cells, evicts (0, 99)
+        p1 = cache.evictions == 1 and cache._weight == 13
+        p1 = p1 and 1 not in cache._index and 99 in cache._index
+        cache.get_path(95, 90)      # Sub-Path of (90, 99)
+        p2 = cache.hits == 1 and cache.misses == 3
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_invalidate():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        cache = PathCache(grid)
+        path = cache.get_path(0, 4)
+        grid[0][2] = -1
+        path_new = cache.get_path(0, 4)
+        p0 = path == [0, 1, 2, 3, 4] and 2 not in path_new
+        p0 = p0 and len(path_new) == 7
+        p1 = cache.invalidations == 1 and cache.misses == 2
+
+        u_tester.run([p0,p1])
+
+
+    u_tester.print_start(__file__)
+    tester_get_path()
+    tester_get_paths()
+    tester_evict()
+    tester_invalidate()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,303 @@
+import functools
+import time
+
+
+class Stats:
+    """
+    ===========================================================================
+     Description: Search Statistics (Counters, Timers and Hooks) populated
+                    by the Engines (stats argument).
+    ===========================================================================
+     Methods:
+    ---------------------------------------------------------------------------
+        1. expand(idd, g, len_opened, len_closed) -> [Count an Expansion].
+
+        2. goal_found(idd, g) -> [Count a reached Goal].
+
+        3. clock() -> float [Current Time, 0 when Timing is disabled].
+
+        4. get_type_opened(type_opened) -> class [Queue Type with timed
+                                                    push() and pop()].
+
+        5. strategy(name) -> [Count a Run by its chosen Strategy].
+
+        6. to_dict() -> dict [Counters and Timers].
+    ===========================================================================
+     Attributes:
+    ---------------------------------------------------------------------------
+        1. expanded : int (Expanded Nodes).
+        2. generated : int (Nodes pushed into Opened for the first time).
+        3. reopened : int (Decrease-Keys of Nodes already in Opened).
+        4. counter_h : int (Heuristic Evaluations, one per Node).
+        5. goals_found : int (Reached Goals).
+        6. peak_opened : int (Max Size of Opened).
+        7. peak_closed : int (Max Size of Closed).
+        8. time_run : float (Total Search Time).
+        9. time_queue : float (Time in Opened's push() and pop()).
+        10. time_h : float (Time in Heuristic Evaluations).
+        11. time_expand : float (The rest of time_run).
+        12. strategies : dict (Strategy's Name -> Number of Runs, for the
+                            Engines that choose one, e.g. KAStar).
+    ===========================================================================
+     Notes:
+    ---------------------------------------------------------------------------
+        1. The Engines take stats=None (the default) and then skip all the
+            Bookkeeping, so disabled Stats cost one None-check per Step.
+        2. Timers run only with timing=True (perf_counter calls are not
+            free). The Counters are always kept.
+        3. on_expand(idd, g) is called after the Node's Children were
+            generated, on_goal_found(idd, g) when a Goal is closed.
+        4. One Stats can be passed to several Runs, its Values accumulate.
+    ===========================================================================
+    """
+
+
+    def __init__(self, timing=False, on_expand=None, on_goal_found=None):
+        """
+        =======================================================================
+         Description: Constructor. Init the Attributes.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. timing : bool (Measure the Time Split).
+            2. on_expand : callable (idd, g) (Called on every Expansion).
+            3. on_goal_found : callable (idd, g) (Called on every Goal).
+        =======================================================================
+        """
+        self.timing = timing
+        self.on_expand = on_expand
+        self.on_goal_found = on_goal_found
+        self.expanded = 0
+        self.generated = 0
+        self.reopened = 0
+        self.counter_h = 0
+        self.goals_found = 0
+        self.peak_opened = 0
+        self.peak_closed = 0
+        self.time_run = 0.0
+        self.time_queue = 0.0
+        self.time_h = 0.0
+        self.strategies = dict()
+
+
+    @property
+    def time_expand(self):
+        return self.time_run - self.time_queue - self.time_h
+
+
+    def expand(self, idd, g, len_opened, len_closed):
+        """
+        =======================================================================
+         Description: Count an Expansion (after its Children were generated).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Expanded Node's Id).
+            2. g : float (Expanded Node's g).
+            3. len_opened : int (Size of Opened after the Expansion).
+            4. len_closed : int (Size of Closed after the Expansion).
+        =======================================================================
+        """
+        self.expanded += 1
+        if len_opened > self.peak_opened:
+            self.peak_opened = len_opened
+        if len_closed > self.peak_closed:
+            self.peak_closed = len_closed
+        if self.on_expand is not None:
+            self.on_expand(idd, g)
+
+
+    def goal_found(self, idd, g):
+        """
+        =======================================================================
+         Description: Count a reached (closed) Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Goal's Id).
+            2. g : float (Goal's g, the Path's Cost).
+        =======================================================================
+        """
+        self.goals_found += 1
+        if self.on_goal_found is not None:
+            self.on_goal_found(idd, g)
+
+
+    def strategy(self, name):
+        """
+        =======================================================================
+         Description: Count a Run by the Strategy its Engine chose.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. name : str (Strategy's Name, e.g. 'astar' or 'dijkstra').
+        =======================================================================
+        """
+        self.strategies[name] = self.strategies.get(name, 0) + 1
+
+
+    def clock(self):
+        """
+        =======================================================================
+         Description: Return the Current Time (0 when Timing is disabled).
+        =======================================================================
+         Return: float.
+        =======================================================================
+        """
+        if self.timing:
+            return time.perf_counter()
+        return 0.0
+
+
+    def get_type_opened(self, type_opened):
+        """
+        =======================================================================
+         Description: Return Queue Type whose push() and pop() are timed
+                        into time_queue (type_opened itself without Timing).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. type_opened : class (Opened, Opened_Buckets, Heap, ...).
+        =======================================================================
+         Return: callable () -> Queue.
+        =======================================================================
+        """
+        if not self.timing:
+            return type_opened
+        return functools.partial(_get_type_timed(type_opened), self)
+
+
+    def to_dict(self):
+        """
+        =======================================================================
+         Description: Return the Counters and Timers.
+        =======================================================================
+         Return: dict (str -> int or float).
+        =======================================================================
+        """
+        keys = ['expanded', 'generated', 'reopened', 'counter_h',
+                'goals_found', 'peak_opened', 'peak_closed', 'time_run',
+                'time_queue', 'time_h', 'time_expand']
+        counters = {key: getattr(self, key) for key in keys}
+        counters['strategies'] = dict(self.strategies)
+        return counters
+
+
+    def __str__(self):
+        return ', '.join('{0}={1}'.format(key, value)
+                         for key, value in self.to_dict().items())
+
+
+_types_timed = dict()
+
+
+def _get_type_timed(type_opened):
+    """
+    ===========================================================================
+     Description: Return (Cached) Subclass of the Queue Type with timed
+                    push() and pop().
+    ===========================================================================
+    """
+    type_timed = _types_timed.get(type_opened)
+    if type_timed is not None:
+        return type_timed
+
+    class Timed(type_opened):
+
+        def __init__(self, stats):
+            super().__init__()
+            self.stats = stats
+
+        def push(self, *args):
+            t = time.perf_counter()
+            super().push(*args)
+            self.stats.time_queue += time.perf_counter() - t
+
+        def pop(self):
+            t = time.perf_counter()
+            item = super().pop()
+            self.stats.time_queue += time.perf_counter() - t
+            return item
+
+    Timed.__name__ = type_opened.__name__ + '_Timed'
+    _types_timed[type_opened] = Timed
+    return Timed
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+
+
+    def tester_expand():
+
+        expanded = list()
+        stats = Stats(on_expand=lambda idd, g: expanded.append((idd, g)))
+        stats.expand(3, 0, 4, 1)
+        stats.expand(5, 1, 2, 2)
+        p0 = stats.expanded == 2 and expanded == [(3, 0), (5, 1)]
+        p1 = stats.peak_opened == 4 and stats.peak_closed == 2
+
+        u_tester.run([p0,p1])
+
+
+    def tester_goal_found():
+
+        goals = list()
+        stats = Stats(on_goal_found=lambda idd, g: goals.append(idd))
+        stats.goal_found(7, 3)
+        p0 = stats.goals_found == 1 and goals == [7]
+
+        u_tester.run([p0])
+
+
+    def tester_strategy():
+
+        stats = Stats()
+        stats.strategy('astar')
+        stats.strategy('dijkstra')
+        stats.strategy('astar')
+        p0 = stats.strategies == {'astar': 2, 'dijkstra': 1}
+        p1 = stats.to_dict()['strategies'] == stats.strategies
+        p1 = p1 and stats.to_dict()['strategies'] is not stats.strategies
+
+        u_tester.run([p0,p1])
+
+
+    def tester_get_type_opened():
+
+        from c_opened import Opened
+        from c_node import Node
+
+        stats = Stats()
+        p0 = stats.get_type_opened(Opened) is Opened and stats.clock() == 0
+
+        stats = Stats(timing=True)
+        opened = stats.get_type_opened(Opened)()
+        opened.push(Node(1))
+        p1 = isinstance(opened, Opened) and opened.pop().idd == 1
+        p2 = stats.time_queue > 0
+        p3 = type(opened) is type(stats.get_type_opened(Opened)())
+
+        u_tester.run([p0,p1,p2,p3])
+
+
+    u_tester.print_start(__file__)
+    tester_expand()
+    tester_goal_found()
+    tester_strategy()
+    tester_get_type_opened()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -4,40 +4,46 @@ path_parent = str(Path(Path(Path(__file__).parent).parent))
 import sys
 sys.path.append(path_parent + '\\f_utils')
 sys.path.append(path_parent + '\\f_grid')
-import u_grid
-import u_lists
-import u_map
+import u_movingai
+import u_parallel
 
 from c_kastar import KAStar
 from c_kastar_h import KAStar_H
+import c_components
 
 import random
 
 path_map = 'D:\\MyPy\\f_astar\\ost000a.map'
 path_results = 'D:\\MyPy\\f_astar\\results.csv'
+seed = 0
 
-lists = u_lists.to_lists_mask(path_map,'.')
-grid = u_grid.lists_to_grid(lists)
-grid = u_grid.canonize(grid)
-idds = u_grid.get_valid_idds(grid)
-
-file = open(path_results,'w')
-for k in [2,5,10,20,50,100]:
-    counter = 0
-    while counter < 100:
-        count_kastar = 0
-        count_kastar_h = 0
-        random.shuffle(idds)
-        start = idds[0]
-        goals = idds[1:k+1]
-        kastar = KAStar(grid, start, goals)
-        kastar.run()
-        kastar_h = KAStar_H(grid, start, goals)
-        kastar_h.run()
-        if not kastar_h.has_solution:
-            continue
-        counter += 1
-        if counter % 10 == 0:
-            print('{0}, {1}%'.format(k, counter))
-        file.write('{0},{1},{2},{3}\n'.format(k,counter,count_kastar,count_kastar_h))
-file.close()
\ No newline at end of file
+
+def run_query(grid, task):
+    k, counter = task
+    # Start and Goals are drawn from one Component, so all are reachable
+    components = c_components.get_components(grid, path_map)
+    rand = random.Random(u_parallel.get_seed(seed, k, counter))
+    sample = components.sample(k+1, rand)
+    # No Component holds k+1 Cells: the Row is kept, marked by -1 Counters
+    if not sample:
+        yield (k,counter,-1,-1)
+        return
+    start = sample[0]
+    goals = sample[1:]
+    kastar = KAStar(grid, start, goals, components=components)
+    kastar.run()
+    kastar_h = KAStar_H(grid, start, goals, components=components)
+    kastar_h.run()
+    count_kastar = kastar.counter_h
+    count_kastar_h = kastar_h.counter_h
+    yield (k,counter,count_kastar,count_kastar_h)
+
+
+if __name__ == '__main__':
+    grid = u_movingai.load_grid(path_map,'.')
+    # Label once here, the Workers load the Sidecar next to the Map
+    c_components.get_components(grid, path_map)
+    tasks = [(k, counter) for k in [2,5,10,20,50,100]
+             for counter in range(1,101)]
+    n = u_parallel.run(run_query, tasks, grid, path_results)
+    print('{0} queries'.format(n))
\ No newline at end of file
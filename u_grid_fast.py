@@ -0,0 +1,246 @@
+"""
+===============================================================================
+ Description: Vectorized (NumPy) Helpers over a Canonized Grid.
+===============================================================================
+ Notes:
+-------------------------------------------------------------------------------
+    1. Idd = row * width + col (as in u_grid).
+    2. Passable Cells have non-negative values, Obstacles are negative.
+===============================================================================
+"""
+import hashlib
+
+import numpy as np
+
+
+SQRT_2 = 2 ** 0.5
+
+
+def get_mask(grid):
+    """
+    ===========================================================================
+     Description: Return Passability Mask of the Grid.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+    ===========================================================================
+     Return: np.ndarray of bool (True on Passable Cell).
+    ===========================================================================
+    """
+    return np.asarray(grid) >= 0
+
+
+def get_digest(grid):
+    """
+    ===========================================================================
+     Description: Return Digest of the Grid's Passability (Cache Key).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+    ===========================================================================
+     Return: str (Hex Digest).
+    ===========================================================================
+    """
+    mask = get_mask(grid)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(mask.shape).encode())
+    digest.update(np.packbits(mask).tobytes())
+    return digest.hexdigest()
+
+
+def to_rows_cols(grid, idds):
+    """
+    ===========================================================================
+     Description: Return Rows and Cols of the Idds.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. idds : iterable of int (Nodes' Ids).
+    ===========================================================================
+     Return: tuple of np.ndarray of int (Rows, Cols).
+    ===========================================================================
+    """
+    idds = np.fromiter(idds, dtype=np.int64)
+    return np.divmod(idds, np.asarray(grid).shape[1])
+
+
+def octile_distance(grid, idd_1, idd_2):
+    """
+    ===========================================================================
+     Description: Return Octile Distance between two Nodes (8-Connected
+                    with sqrt(2) Diagonal Costs).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. idd_1 : int (Node's Id).
+        3. idd_2 : int (Node's Id).
+    ===========================================================================
+     Return: float (Octile Distance).
+    ===========================================================================
+    """
+    width = grid.shape[1]
+    row_1, col_1 = divmod(idd_1, width)
+    row_2, col_2 = divmod(idd_2, width)
+    d_row = abs(row_1 - row_2)
+    d_col = abs(col_1 - col_2)
+    return max(d_row, d_col) + (SQRT_2 - 1) * min(d_row, d_col)
+
+
+def get_path_cost(grid, path, octile=False):
+    """
+    ===========================================================================
+     Description: Return the Cost of a Path of adjacent Nodes.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid.
+        2. path : list of int (Nodes' Ids).
+        3. octile : bool (sqrt(2) Diagonal Costs, Unit Costs otherwise).
+    ===========================================================================
+     Return: float (Path's Cost, Infinity on Empty Path).
+    ===========================================================================
+    """
+    if not path:
+        return float('Infinity')
+    if not octile:
+        return len(path) - 1
+    return sum(octile_distance(grid, idd_1, idd_2)
+               for idd_1, idd_2 in zip(path, path[1:]))
+
+
+def get_distances(rows, cols, rows_goals, cols_goals, octile=False):
+    """
+    ===========================================================================
+     Description: Return Distances of each Node to each Goal.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. rows : np.ndarray of int (Nodes' Rows).
+        2. cols : np.ndarray of int (Nodes' Cols).
+        3. rows_goals : np.ndarray of int (Goals' Rows).
+        4. cols_goals : np.ndarray of int (Goals' Cols).
+        5. octile : bool (Octile Distance, Manhattan otherwise).
+    ===========================================================================
+     Return: np.ndarray (Nodes, Goals) of Distances.
+    ===========================================================================
+    """
+    d_rows = np.abs(rows[:, None] - rows_goals[None, :])
+    d_cols = np.abs(cols[:, None] - cols_goals[None, :])
+    if not octile:
+        return d_rows + d_cols
+    distances = np.maximum(d_rows, d_cols)
+    return distances + (SQRT_2 - 1) * np.minimum(d_rows, d_cols)
+
+
+def get_nearest(distances):
+    """
+    ===========================================================================
+     Description: Return Min Distance of each Node and the Index of the
+                    Nearest Goal.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. distances : np.ndarray (Nodes, Goals) of Distances.
+    ===========================================================================
+     Return: tuple of np.ndarray (Min Distances, Nearest Indexes).
+    ===========================================================================
+    """
+    nearest = distances.argmin(axis=1)
+    return distances[np.arange(len(nearest)), nearest], nearest
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+
+
+    def tester_get_mask():
+
+        grid = u_grid.gen_symmetric_grid(3)
+        grid[1][1] = -1
+        mask = get_mask(grid)
+        p0 = mask.sum() == 8 and not mask[1][1]
+
+        u_tester.run([p0])
+
+
+    def tester_get_digest():
+
+        grid = u_grid.gen_symmetric_grid(3)
+        digest_1 = get_digest(grid)
+        grid[1][1] = -1
+        digest_2 = get_digest(grid)
+        p0 = digest_1 != digest_2
+        p1 = digest_2 == get_digest(grid.copy())
+
+        u_tester.run([p0,p1])
+
+
+    def tester_get_nearest():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        idds = [0, 7, 24]
+        goals = [4, 20, 12]
+        rows, cols = to_rows_cols(grid, idds)
+        rows_goals, cols_goals = to_rows_cols(grid, goals)
+        distances = get_distances(rows, cols, rows_goals, cols_goals)
+        p0 = distances.tolist() == [[u_grid.manhattan_distance(grid, idd, goal)
+                                     for goal in goals] for idd in idds]
+        h_true = [min(u_grid.manhattan_distance(grid, idd, goal)
+                      for goal in goals) for idd in idds]
+        h_test, nearest = get_nearest(distances)
+        p1 = list(h_test) == h_true
+        p2 = list(nearest) == [0, 2, 0]
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_octile():
+
+        grid = u_grid.gen_symmetric_grid(5)
+        p0 = np.isclose(octile_distance(grid, 0, 24), 4 * SQRT_2)
+        p1 = octile_distance(grid, 0, 4) == 4
+        p2 = np.isclose(octile_distance(grid, 0, 13), 1 + 2 * SQRT_2)
+
+        idds = [0, 7, 24]
+        goals = [4, 20, 13]
+        rows, cols = to_rows_cols(grid, idds)
+        rows_goals, cols_goals = to_rows_cols(grid, goals)
+        h_test, nearest = get_nearest(get_distances(rows, cols, rows_goals,
+                                                    cols_goals, octile=True))
+        h_true = [min(octile_distance(grid, idd, goal) for goal in goals)
+                  for idd in idds]
+        p3 = np.allclose(h_test, h_true)
+        p4 = list(nearest) == [2, 2, 2]
+        p5 = np.isclose(get_path_cost(grid, [0, 6, 7, 13], True),
+                        1 + 2 * SQRT_2)
+        p6 = get_path_cost(grid, [0, 1, 2], False) == 2
+
+        u_tester.run([p0,p1,p2,p3,p4,p5,p6])
+
+
+    u_tester.print_start(__file__)
+    tester_get_mask()
+    tester_get_digest()
+    tester_get_nearest()
+    tester_octile()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
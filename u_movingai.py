@@ -0,0 +1,256 @@
+"""
+===============================================================================
+ Description: Fast Loader of MovingAI Maps (.map) with Binary Grid Cache.
+===============================================================================
+ Notes:
+-------------------------------------------------------------------------------
+    1. The Map is parsed straight into a NumPy uint8 Passability Mask
+        (1 on Passable Cell), without Python Lists of Lists.
+    2. The Mask is cached in a Sidecar File next to the Map,
+        <map>.<digest>.npy, keyed by the Hash of the Map's Content (and the
+        Passable Chars). Later Loads memory-map it without parsing.
+    3. A Load that writes a new Mask removes the Stale ones, i.e. exactly
+        <map>.<16 hex>.npy (other Sidecars, like <map>.<digest>.cc.npy of
+        c_components, are kept).
+===============================================================================
+"""
+import glob
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def read_header(path):
+    """
+    ===========================================================================
+     Description: Return the Header of the Map (type, height, width).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .map File).
+    ===========================================================================
+     Return: dict (type : str, height : int, width : int).
+    ===========================================================================
+    """
+    with open(path, 'rb') as file:
+        header, _ = _split(file.read(), path)
+    return header
+
+
+def load_mask(path, passable='.', cache=True):
+    """
+    ===========================================================================
+     Description: Load the Map as Passability Mask.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .map File).
+        2. passable : str (Chars of Passable Cells).
+        3. cache : bool (Use and Write the Sidecar Cache File).
+    ===========================================================================
+     Return: np.ndarray of uint8 (height, width) (1 on Passable Cell).
+    ===========================================================================
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if not cache:
+        return _parse(data, path, passable)
+
+    digest = hashlib.blake2b(data, digest_size=8)
+    digest.update(passable.encode())
+    path_cache = '{0}.{1}.npy'.format(path, digest.hexdigest())
+    if os.path.exists(path_cache):
+        try:
+            return np.load(path_cache, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+
+    mask = _parse(data, path, passable)
+    try:
+        folder, name = os.path.split(path)
+        pattern = re.compile(re.escape(name) + r'\.[0-9a-f]{16}\.npy')
+        for name_stale in os.listdir(folder or '.'):
+            if pattern.fullmatch(name_stale):
+                os.remove(os.path.join(folder, name_stale))
+        np.save(path_cache, mask)
+    except OSError:
+        pass
+    return mask
+
+
+def load_grid(path, passable='.', cache=True):
+    """
+    ===========================================================================
+     Description: Load the Map as Canonized Grid (0 on Passable Cell, -1 on
+                    Obstacle).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .map File).
+        2. passable : str (Chars of Passable Cells).
+        3. cache : bool (Use and Write the Sidecar Cache File).
+    ===========================================================================
+     Return: np.ndarray of int8 (height, width).
+    ===========================================================================
+    """
+    return load_mask(path, passable, cache).astype(np.int8) - 1
+
+
+def load_grids(paths, passable='.', cache=True, workers=None):
+    """
+    ===========================================================================
+     Description: Load a Batch of Maps as Canonized Grids (in Parallel).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. paths : iterable of str (Paths to .map Files).
+        2. passable : str (Chars of Passable Cells).
+        3. cache : bool (Use and Write the Sidecar Cache Files).
+        4. workers : int (Number of Threads, Default on None).
+    ===========================================================================
+     Return: dict (str -> np.ndarray) (Path -> Grid).
+    ===========================================================================
+    """
+    paths = list(paths)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        grids = executor.map(lambda path: load_grid(path, passable, cache),
+                             paths)
+        return dict(zip(paths, grids))
+
+
+def _split(data, path):
+    """
+    ===========================================================================
+     Description: Split the Map's Content into Header and Body.
+    ===========================================================================
+     Return: tuple (dict (Header), bytes (Body)).
+    ===========================================================================
+    """
+    header = dict()
+    pos = 0
+    while True:
+        end = data.find(b'\n', pos)
+        if end < 0:
+            raise ValueError('{0}: missing "map" line'.format(path))
+        line = data[pos:end].strip()
+        pos = end + 1
+        if line == b'map':
+            break
+        if not line:
+            continue
+        key, _, value = line.decode().partition(' ')
+        header[key] = value.strip()
+    try:
+        header['height'] = int(header['height'])
+        header['width'] = int(header['width'])
+    except (KeyError, ValueError):
+        raise ValueError('{0}: bad height/width header'.format(path))
+    return header, data[pos:]
+
+
+def _parse(data, path, passable):
+    """
+    ===========================================================================
+     Description: Parse the Map's Content into Passability Mask.
+    ===========================================================================
+    """
+    header, body = _split(data, path)
+    height, width = header['height'], header['width']
+    chars = np.frombuffer(body, dtype=np.uint8)
+    chars = chars[(chars != ord('\n')) & (chars != ord('\r'))]
+    if len(chars) < height * width:
+        raise ValueError('{0}: expected {1}x{2} cells, got {3}'.format(
+                                        path, height, width, len(chars)))
+    chars = chars[:height * width].reshape(height, width)
+    codes = np.frombuffer(passable.encode(), dtype=np.uint8)
+    return np.isin(chars, codes).astype(np.uint8)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import tempfile
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+
+
+    def write_map(folder, name, lines):
+
+        path = os.path.join(folder, name)
+        with open(path, 'w') as file:
+            file.write('type octile\n')
+            file.write('height {0}\n'.format(len(lines)))
+            file.write('width {0}\n'.format(len(lines[0])))
+            file.write('map\n')
+            for line in lines:
+                file.write(line + '\n')
+        return path
+
+
+    def tester_load_mask():
+
+        folder = tempfile.mkdtemp()
+        path = write_map(folder, 'a.map', ['..@', 'T..'])
+        header = read_header(path)
+        p0 = header == {'type': 'octile', 'height': 2, 'width': 3}
+        mask = load_mask(path)
+        p1 = mask.tolist() == [[1,1,0],[0,1,1]]
+        p2 = len(glob.glob(path + '.*.npy')) == 1
+        path_cc = path + '.0123456789abcdef.cc.npy'
+        np.save(path_cc, mask)
+        # Second Load comes from the Cache
+        mask = load_mask(path)
+        p3 = isinstance(mask, np.memmap) and mask.tolist() == [[1,1,0],[0,1,1]]
+        # Edited Map -> new Digest (Stale Cache is removed)
+        path = write_map(folder, 'a.map', ['...', 'T..'])
+        mask = load_mask(path)
+        p4 = mask.tolist() == [[1,1,1],[0,1,1]]
+        p5 = len(glob.glob(path + '.*.npy')) == 2 and os.path.exists(path_cc)
+
+        u_tester.run([p0,p1,p2,p3,p4,p5])
+
+
+    def tester_load_grid():
+
+        folder = tempfile.mkdtemp()
+        path = write_map(folder, 'a.map', ['..@', 'T..'])
+        grid = load_grid(path, cache=False)
+        p0 = grid.tolist() == [[0,0,-1],[-1,0,0]]
+        grid = load_grid(path, passable='.T', cache=False)
+        p1 = grid.tolist() == [[0,0,-1],[0,0,0]]
+        p2 = not glob.glob(path + '.*.npy')
+
+        u_tester.run([p0,p1,p2])
+
+
+    def tester_load_grids():
+
+        folder = tempfile.mkdtemp()
+        paths = [write_map(folder, '{0}.map'.format(i), ['.' * i, '@' * i])
+                 for i in range(1, 5)]
+        grids = load_grids(paths)
+        p0 = all(grids[path].shape == (2, i+1)
+                 for i, path in enumerate(paths))
+
+        u_tester.run([p0])
+
+
+    u_tester.print_start(__file__)
+    tester_load_mask()
+    tester_load_grid()
+    tester_load_grids()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,283 @@
+"""
+===============================================================================
+ Description: Process-Parallel Runner of Search Queries over a Shared Grid.
+===============================================================================
+ Notes:
+-------------------------------------------------------------------------------
+    1. The Grid, its Neighbors Tables and its Components' Labels are placed
+        once in Shared Memory. The Workers attach them zero-copy and
+        register them by c_neighbors.put() / c_components.put(), so the
+        Engines pick them up as usual (no Worker builds or loads them).
+    2. Each Query gets its Seed from get_seed() (a Hash of its Keys), so
+        the Results do not depend on the Workers' Scheduling.
+    3. The Rows are written to the CSV as the Queries finish (unordered),
+        so every Row must carry the Query's Keys.
+===============================================================================
+"""
+import csv
+import hashlib
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import c_components
+import c_neighbors
+import u_grid_fast
+
+
+# Worker's State (set by _init_worker)
+_worker = dict()
+
+
+def get_seed(*keys):
+    """
+    ===========================================================================
+     Description: Return a Deterministic Seed of the Keys.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. keys : hashable (repr-stable) Values (Base Seed, Query's Keys).
+    ===========================================================================
+     Return: int (64-bit Seed).
+    ===========================================================================
+    """
+    digest = hashlib.blake2b(repr(keys).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), 'little')
+
+
+def share(array):
+    """
+    ===========================================================================
+     Description: Copy the Array into a new Shared Memory Block.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. array : np.ndarray or buffer (array.array).
+    ===========================================================================
+     Return: tuple (SharedMemory, tuple (Spec for attach())).
+    ===========================================================================
+    """
+    array = np.asarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    del view
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def attach(spec):
+    """
+    ===========================================================================
+     Description: Attach a Shared Array (zero-copy).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. spec : tuple (Spec from share()).
+    ===========================================================================
+     Return: tuple (SharedMemory, np.ndarray).
+    ===========================================================================
+    """
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def run(func, tasks, grid, path_csv, header=None, octiles=(False,),
+        processes=None):
+    """
+    ===========================================================================
+     Description: Run the Queries on a Process Pool and stream their Rows
+                    into the CSV File.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. func : callable (grid, task) -> iterable of Rows (Module-Level,
+                    so the Workers can import it).
+        2. tasks : iterable of picklable Tasks (Query's Keys).
+        3. grid : Grid.
+        4. path_csv : str (Path to the Results File).
+        5. header : list of str (CSV Header, None for no Header).
+        6. octiles : iterable of bool (Neighbors Tables to share).
+        7. processes : int (Number of Workers, CPU Count on None).
+    ===========================================================================
+     Return: int (Number of written Rows).
+    ===========================================================================
+    """
+    shms = list()
+    try:
+        shm, spec_grid = share(grid)
+        shms.append(shm)
+        shm, spec_labels = share(c_components.get_components(grid).labels)
+        shms.append(shm)
+        specs_tables = list()
+        for octile in octiles:
+            neighbors = c_neighbors.get_neighbors(grid, octile)
+            arrays = [neighbors.offsets, neighbors.idds]
+            if neighbors.costs is not None:
+                arrays.append(neighbors.costs)
+            specs = list()
+            for array in arrays:
+                shm, spec = share(array)
+                shms.append(shm)
+                specs.append(spec)
+            specs_tables.append((octile, specs))
+
+        counter = 0
+        with open(path_csv, 'w', newline='') as file:
+            writer = csv.writer(file)
+            if header:
+                writer.writerow(header)
+            with multiprocessing.Pool(processes, _init_worker,
+                                      (func, spec_grid, spec_labels,
+                                       specs_tables)) as pool:
+                for rows in pool.imap_unordered(_run_task, tasks):
+                    for row in rows:
+                        writer.writerow(row)
+                        counter += 1
+                    file.flush()
+        return counter
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+def _init_worker(func, spec_grid, spec_labels, specs_tables):
+    """
+    ===========================================================================
+     Description: Attach the Shared Grid, Labels and Tables in the Worker.
+    ===========================================================================
+    """
+    shms = list()
+    shm, grid = attach(spec_grid)
+    shms.append(shm)
+    grid.flags.writeable = False
+    digest = u_grid_fast.get_digest(grid)
+    shm, labels = attach(spec_labels)
+    shms.append(shm)
+    labels.flags.writeable = False
+    c_components.put(digest, c_components.Components(labels=labels))
+    for octile, specs in specs_tables:
+        arrays = list()
+        for spec in specs:
+            shm, array = attach(spec)
+            shms.append(shm)
+            arrays.append(memoryview(array))
+        neighbors = c_neighbors.Neighbors()
+        neighbors.offsets, neighbors.idds = arrays[0], arrays[1]
+        if len(arrays) > 2:
+            neighbors.costs = arrays[2]
+        c_neighbors.put(digest, octile, neighbors)
+    _worker.update(func=func, grid=grid, shms=shms)
+
+
+def _run_task(task):
+    """
+    ===========================================================================
+     Description: Run the Query in the Worker and return its Rows.
+    ===========================================================================
+    """
+    return list(_worker['func'](_worker['grid'], task))
+
+
+def _tester_query(grid, task):
+    """
+    ===========================================================================
+     Description: Query of the Tester (Module-Level to be picklable).
+    ===========================================================================
+    """
+    import random
+    from c_astar import AStar
+
+    i, octile = task
+    idds = np.flatnonzero(grid >= 0).tolist()
+    start, goal = random.Random(get_seed(0, i)).sample(idds, 2)
+    path = AStar(grid, start, goal, octile=octile).get_path()
+    yield (i, int(octile), start, goal, len(path))
+
+
+def _tester_shared(grid, task):
+    """
+    ===========================================================================
+     Description: Report whether the Worker uses the Shared Labels and
+                    Tables (Module-Level to be picklable).
+    ===========================================================================
+    """
+    labels = c_components.get_components(grid).labels
+    neighbors = c_neighbors.get_neighbors(grid, task)
+    yield (int(not labels.flags.writeable),
+           int(isinstance(neighbors.idds, memoryview)))
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import os
+    import sys
+    import tempfile
+    sys.path.append('D:\\MyPy\\f_utils')
+    sys.path.append('D:\\MyPy\\f_grid')
+    import u_tester
+    import u_grid
+
+
+    def tester_get_seed():
+
+        p0 = get_seed(1, 5, 2) == get_seed(1, 5, 2)
+        p1 = get_seed(1, 5, 2) != get_seed(1, 2, 5)
+
+        u_tester.run([p0,p1])
+
+
+    def tester_share():
+
+        grid = u_grid.gen_obstacles_grid(10, 30)
+        shm, spec = share(grid)
+        shm_2, view = attach(spec)
+        p0 = (view == grid).all()
+        del view
+        shm_2.close()
+        shm.close()
+        shm.unlink()
+
+        u_tester.run([p0])
+
+
+    def tester_run():
+
+        grid = u_grid.gen_obstacles_grid(20, 20)
+        tasks = [(i, octile) for i in range(20) for octile in (False, True)]
+        rows_true = sorted(row for task in tasks
+                           for row in _tester_query(grid, task))
+        path_csv = os.path.join(tempfile.mkdtemp(), 'results.csv')
+        n = run(_tester_query, tasks, grid, path_csv, ['i','octile'],
+                octiles=(False, True), processes=2)
+        with open(path_csv) as file:
+            lines = list(csv.reader(file))
+        rows_test = sorted(tuple(int(x) for x in line) for line in lines[1:])
+        p0 = n == len(tasks) and lines[0] == ['i','octile']
+        p1 = rows_test == rows_true
+        run(_tester_shared, [False, True] * 4, grid, path_csv,
+            octiles=(False, True), processes=2)
+        with open(path_csv) as file:
+            p2 = all(line == ['1', '1'] for line in csv.reader(file))
+
+        u_tester.run([p0,p1,p2])
+
+
+    u_tester.print_start(__file__)
+    tester_get_seed()
+    tester_share()
+    tester_run()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()
@@ -0,0 +1,140 @@
+"""
+===============================================================================
+ Description: Reader of MovingAI Scenario Files (.scen).
+===============================================================================
+ Notes:
+-------------------------------------------------------------------------------
+    1. Format (version 1): a "version" Line, then one Line per Scenario:
+        bucket, map, width, height, start x, start y, goal x, goal y,
+        optimal length (Tab-separated).
+    2. x is the Col and y is the Row, so Idd = y * width + x (as in u_grid).
+    3. The Optimal Length is for 8-Connected Moves with sqrt(2) Diagonal
+        Costs and no Corner-Cutting (octile=True in the Engines).
+===============================================================================
+"""
+import collections
+import os
+
+
+Scenario = collections.namedtuple('Scenario', ['bucket', 'map', 'width',
+                                               'height', 'start', 'goal',
+                                               'optimal'])
+
+
+def get_path_scen(path_map):
+    """
+    ===========================================================================
+     Description: Return the Path to the Scenario File of the Map
+                    (<map>.scen next to it).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to .map File).
+    ===========================================================================
+     Return: str (Path to .scen File).
+    ===========================================================================
+    """
+    return path_map + '.scen'
+
+
+def read_scen(path):
+    """
+    ===========================================================================
+     Description: Read the Scenarios of the .scen File.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to .scen File).
+    ===========================================================================
+     Return: list of Scenario (start / goal are Idds).
+    ===========================================================================
+    """
+    scenarios = list()
+    with open(path) as file:
+        for line in file:
+            fields = line.split('\t') if '\t' in line else line.split()
+            if len(fields) < 9 or fields[0] == 'version':
+                continue
+            bucket, width, height = (int(x) for x in
+                                     (fields[0], fields[2], fields[3]))
+            x_start, y_start, x_goal, y_goal = (int(x) for x in fields[4:8])
+            scenarios.append(Scenario(bucket=bucket,
+                                      map=fields[1].strip(),
+                                      width=width,
+                                      height=height,
+                                      start=y_start * width + x_start,
+                                      goal=y_goal * width + x_goal,
+                                      optimal=float(fields[8])))
+    return scenarios
+
+
+def get_buckets(scenarios):
+    """
+    ===========================================================================
+     Description: Group the Scenarios by Bucket.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. scenarios : list of Scenario.
+    ===========================================================================
+     Return: dict (int -> list of Scenario) (Bucket -> Scenarios), ordered
+                by Bucket.
+    ===========================================================================
+    """
+    buckets = dict()
+    for scenario in sorted(scenarios, key=lambda scenario: scenario.bucket):
+        buckets.setdefault(scenario.bucket, list()).append(scenario)
+    return buckets
+
+
+def get_path_map(path_scen, scenario):
+    """
+    ===========================================================================
+     Description: Return the Path to the Scenario's Map (next to the .scen).
+    ===========================================================================
+    """
+    folder = os.path.dirname(os.path.abspath(path_scen))
+    return os.path.join(folder, os.path.basename(scenario.map))
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import tempfile
+    sys.path.append('D:\\MyPy\\f_utils')
+    import u_tester
+
+
+    def tester_read_scen():
+
+        path = os.path.join(tempfile.mkdtemp(), 'a.map.scen')
+        with open(path, 'w') as file:
+            file.write('version 1\n')
+            file.write('1\tmaps/a.map\t5\t4\t1\t2\t3\t0\t3.41421356\n')
+            file.write('0\tmaps/a.map\t5\t4\t0\t0\t4\t3\t5.24264069\n')
+        scenarios = read_scen(path)
+        p0 = len(scenarios) == 2
+        p1 = scenarios[0].start == 11 and scenarios[0].goal == 3
+        p2 = scenarios[0].optimal == 3.41421356
+        buckets = get_buckets(scenarios)
+        p3 = list(buckets) == [0, 1] and buckets[0][0].goal == 19
+        p4 = get_path_map(path, scenarios[0]) == path[:-len('.scen')]
+        p5 = get_path_scen('a.map') == 'a.map.scen'
+
+        u_tester.run([p0,p1,p2,p3,p4,p5])
+
+
+    u_tester.print_start(__file__)
+    tester_read_scen()
+    u_tester.print_finish(__file__)
+
+
+if __name__ == '__main__':
+    tester()